@@ -1,10 +1,13 @@
 from django.contrib import admin
 from django.contrib.auth.models import User
+from django.db import transaction
 from django.urls import path
 from django.shortcuts import redirect
 from django.utils.html import format_html
 from .models import ResumeReport
 from .models import PasswordResetRequest
+from .models import AnalysisJob
+from . import stats
 
 
 @admin.register(ResumeReport)
@@ -24,7 +27,9 @@ class ResumeReportAdmin(admin.ModelAdmin):
     list_filter = ("analysis_status", "analyzed_date")
     search_fields = ("name", "user__first_name", "user__email")
     ordering = ("-analyzed_date",)
-    readonly_fields = ("analyzed_date",)
+    # Score / status / owner feed UserReportStats; they only change through
+    # the analysis pipeline, which keeps the counters in step
+    readonly_fields = ("user", "score", "analysis_status", "analyzed_date")
     list_select_related = ("user",)
 
     # ---------- USER INFO ----------
@@ -59,6 +64,24 @@ class ResumeReportAdmin(admin.ModelAdmin):
         )
     reset_password_button.short_description = "🔑 Reset Password"
 
+    # ---------- STATS-AWARE WRITES ----------
+    # Deletes go through analyzer.stats so counters, "best" and the version
+    # (reports API cache / ETags) stay in step with the rows
+    def has_add_permission(self, request):
+        return False
+
+    def save_model(self, request, obj, form, change):
+        with transaction.atomic():
+            stats.bump_version(obj.user_id)
+            super().save_model(request, obj, form, change)
+
+    def delete_model(self, request, obj):
+        stats.delete_reports(obj.user_id, ResumeReport.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        for user_id in set(queryset.values_list("user_id", flat=True)):
+            stats.delete_reports(user_id, queryset.filter(user_id=user_id))
+
     # ---------- CUSTOM URL ----------
     def get_urls(self):
         urls = super().get_urls()
@@ -89,4 +112,13 @@ class PasswordResetRequestAdmin(admin.ModelAdmin):
     list_display = ("user", "requested_at", "is_processed")
     list_filter = ("is_processed", "requested_at")
     search_fields = ("user__username", "user__email")
-    ordering = ("-requested_at",)
\ No newline at end of file
+    ordering = ("-requested_at",)
+
+@admin.register(AnalysisJob)
+class AnalysisJobAdmin(admin.ModelAdmin):
+    list_display = ("report", "status", "attempts", "created_at", "finished_at")
+    list_filter = ("status", "created_at")
+    search_fields = ("report__name", "report__user__email")
+    ordering = ("-created_at",)
+    readonly_fields = ("created_at", "started_at", "finished_at")
+    list_select_related = ("report",)
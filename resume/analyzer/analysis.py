@@ -0,0 +1,153 @@
+import logging
+import time
+
+from asgiref.sync import sync_to_async
+
+from . import instrumentation, openrouter, prompting, result_cache, scoring, strategies
+from .openrouter import OPENROUTER_MODELS
+
+
+# =============================
+# LOCAL ATS (FALLBACK – ALWAYS WORKS)
+# =============================
+
+def local_ats_analysis(resume_text, job_description):
+    return scoring.score_resume(resume_text, job_description)
+
+
+# =============================
+# AI ANALYSIS (WITH BACKUPS)
+# =============================
+
+def cached_ai_result(resume_text, job_description):
+    # Same resume + JD + model → reuse the stored result, no network call
+    for model in OPENROUTER_MODELS:
+        cached = result_cache.get(resume_text, job_description, model)
+        if cached:
+            instrumentation.event("ai_result_cached", model=model)
+            instrumentation.count("ai_cache_hit", model=model)
+            return cached
+    return None
+
+
+def analyze_resume_text(resume_text, job_description):
+    cached = cached_ai_result(resume_text, job_description)
+    if cached:
+        return cached
+
+    if not openrouter.OPENROUTER_API_KEY:
+        return None
+
+    def attempt(model):
+        instrumentation.event("ai_attempt", logging.DEBUG, model=model)
+        # Trimmed to this model's token budget
+        prompt = prompting.build_prompt(model, resume_text, job_description)
+        return openrouter.request_model(model, prompt)
+
+    model, result = strategies.run_strategy(OPENROUTER_MODELS, attempt)
+
+    if result:
+        instrumentation.event("ai_result_accepted", model=model, ats_score=result["ats_score"])
+        result_cache.set(resume_text, job_description, model, result)
+        return result
+
+    instrumentation.event("ai_unavailable", logging.WARNING, fallback="local")
+    return None
+
+
+async def aanalyze_resume_text(resume_text, job_description):
+    cached = await sync_to_async(cached_ai_result)(resume_text, job_description)
+    if cached:
+        return cached
+
+    if not openrouter.OPENROUTER_API_KEY:
+        return None
+
+    async def attempt(model):
+        instrumentation.event("ai_attempt", logging.DEBUG, model=model)
+        prompt = prompting.build_prompt(model, resume_text, job_description)
+        return await openrouter.arequest_model(model, prompt)
+
+    model, result = await strategies.arun_strategy(OPENROUTER_MODELS, attempt)
+
+    if result:
+        instrumentation.event("ai_result_accepted", model=model, ats_score=result["ats_score"])
+        await sync_to_async(result_cache.set)(resume_text, job_description, model, result)
+        return result
+
+    instrumentation.event("ai_unavailable", logging.WARNING, fallback="local")
+    return None
+
+
+# =============================
+# STREAMING PIPELINE
+# =============================
+# Yields (event, data): the instant local result, progress while models
+# are tried in order over stream: true, then ("ai", result or None).
+# Models are tried one after another here, since only one stream can
+# feed the progress events.
+
+STREAM_PROGRESS_INTERVAL = 0.5
+
+
+def stream_analysis(resume_text, job_description):
+    with instrumentation.stage("local", op="stream"):
+        local = local_ats_analysis(resume_text, job_description)
+    yield "local", local
+
+    cached = cached_ai_result(resume_text, job_description)
+    if cached or not openrouter.OPENROUTER_API_KEY:
+        yield "ai", cached
+        return
+
+    for number, model in enumerate(OPENROUTER_MODELS, start=1):
+        yield "progress", {"stage": "ai_attempt", "model": model, "attempt": number}
+        prompt = prompting.build_prompt(model, resume_text, job_description)
+
+        result = None
+        received = 0
+        reported = time.monotonic()
+        try:
+            for kind, value in openrouter.stream_model(model, prompt):
+                if kind == "result":
+                    result = value
+                    continue
+                received += len(value)
+                if time.monotonic() - reported >= STREAM_PROGRESS_INTERVAL:
+                    reported = time.monotonic()
+                    yield "progress", {"stage": "ai_streaming", "model": model, "chars": received}
+        except Exception as e:
+            instrumentation.event("ai_stream_failed", logging.WARNING, model=model, error=str(e))
+
+        if result:
+            instrumentation.event("ai_result_accepted", model=model, ats_score=result["ats_score"])
+            result_cache.set(resume_text, job_description, model, result)
+            yield "ai", result
+            return
+
+    instrumentation.event("ai_unavailable", logging.WARNING, fallback="local")
+    yield "ai", None
+
+
+# =============================
+# AI → LOCAL PIPELINE
+# =============================
+
+def run_analysis(resume_text, job_description):
+    with instrumentation.stage("ai") as stage:
+        result = analyze_resume_text(resume_text, job_description)
+        stage.set(outcome="ok" if result else "unavailable")
+    if not result:
+        with instrumentation.stage("local_fallback"):
+            result = local_ats_analysis(resume_text, job_description)
+    return result
+
+
+async def arun_analysis(resume_text, job_description):
+    with instrumentation.stage("ai") as stage:
+        result = await aanalyze_resume_text(resume_text, job_description)
+        stage.set(outcome="ok" if result else "unavailable")
+    if not result:
+        with instrumentation.stage("local_fallback"):
+            result = local_ats_analysis(resume_text, job_description)
+    return result
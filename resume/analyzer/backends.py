@@ -1,14 +1,63 @@
+from django.conf import settings
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db.models import Q
+from django.db.models.functions import Lower
+
+
+# 0 = no caching (the default with the per-process locmem cache)
+USER_CACHE_TTL = getattr(settings, "USER_CACHE_TTL", 0)
+
+
+def user_cache_key(user_id):
+    return f"auth-user:{user_id}"
+
+
+def find_user(identifier):
+    # One query over the LOWER(username) / LOWER(email) indexes (migration 0010)
+    identifier = (identifier or "").strip().lower()
+    if not identifier:
+        return None
+
+    return (
+        User.objects
+        .annotate(username_lower=Lower("username"), email_lower=Lower("email"))
+        .filter(Q(username_lower=identifier) | Q(email_lower=identifier))
+        .order_by("id")
+        .first()
+    )
 
 
 class EmailBackend(ModelBackend):
+    # Username or email, case-insensitive, resolved in a single query
     def authenticate(self, request, username=None, password=None, **kwargs):
-        email = username
+        if username is None or password is None:
+            return None
+
+        user = find_user(username)
 
-        # Use filter().first() instead of get()
-        user = User.objects.filter(email=email).order_by('id').first()
+        if user is None:
+            # Hash anyway so a miss takes as long as a wrong password
+            User().set_password(password)
+            return None
 
-        if user and user.check_password(password):
+        if user.check_password(password) and self.user_can_authenticate(user):
             return user
         return None
+
+    def get_user(self, user_id):
+        # Runs on every authenticated request; analyzer.signals drops the
+        # entry whenever the User row is saved or deleted
+        if USER_CACHE_TTL <= 0:
+            return super().get_user(user_id)
+
+        key = user_cache_key(user_id)
+        user = cache.get(key)
+        if user is None:
+            try:
+                user = User._default_manager.get(pk=user_id)
+            except User.DoesNotExist:
+                return None
+            cache.set(key, user, USER_CACHE_TTL)
+        return user if self.user_can_authenticate(user) else None
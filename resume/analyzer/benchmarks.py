@@ -0,0 +1,311 @@
+import io
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connections
+
+
+# =============================
+# GENERATED CORPUS
+# =============================
+
+SKILLS = (
+    "python django flask fastapi sql postgresql mysql redis docker kubernetes aws "
+    "azure terraform linux git rest graphql react javascript typescript html css "
+    "celery kafka spark pandas numpy testing pytest ci cd microservices agile scrum "
+    "leadership communication mentoring architecture security monitoring"
+).split()
+
+FILLER = (
+    "developed maintained designed implemented delivered improved managed led built "
+    "services applications platform customers features performance reliability data "
+    "pipelines reports dashboards projects stakeholders product requirements"
+).split()
+
+# Pages per generated resume
+CORPUS_SIZES = {"small": 1, "medium": 5, "large": 20}
+WORDS_PER_PAGE = 350
+WORDS_PER_LINE = 12
+LINES_PER_PAGE = 45
+
+
+def make_text(rng, words):
+    return " ".join(
+        rng.choice(SKILLS) if rng.random() < 0.3 else rng.choice(FILLER)
+        for _ in range(words)
+    )
+
+
+def _lines(text):
+    words = text.split()
+    return [" ".join(words[i:i + WORDS_PER_LINE]) for i in range(0, len(words), WORDS_PER_LINE)]
+
+
+def make_pdf(pages):
+    # Minimal text-only PDF (Helvetica, one content stream per page)
+    objects = [b"<< /Type /Catalog /Pages 2 0 R >>", None,
+               b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+
+    for index, text in enumerate(pages):
+        page_id = 4 + 2 * index
+        kids.append(f"{page_id} 0 R")
+        lines = [
+            line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+            for line in _lines(text)[:LINES_PER_PAGE]
+        ]
+        stream = ("BT /F1 10 Tf 40 760 Td 14 TL " + " ".join(f"({line}) '" for line in lines) + " ET").encode("latin-1")
+        objects.append(
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {page_id + 1} 0 R >>".encode()
+        )
+        objects.append(b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream")
+
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(pages)} >>".encode()
+
+    out = bytearray(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(len(out))
+        out += f"{number} 0 obj\n".encode() + body + b"\nendobj\n"
+
+    xref = len(out)
+    out += f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode()
+    for offset in offsets:
+        out += f"{offset:010d} 00000 n \n".encode()
+    out += f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode()
+    return bytes(out)
+
+
+def make_docx(pages):
+    import docx
+
+    document = docx.Document()
+    for text in pages:
+        for line in _lines(text):
+            document.add_paragraph(line)
+    buffer = io.BytesIO()
+    document.save(buffer)
+    return buffer.getvalue()
+
+
+def build_corpus(seed=7, sizes=None):
+    rng = random.Random(seed)
+    corpus = {}
+    for size, page_count in (sizes or CORPUS_SIZES).items():
+        pages = [make_text(rng, WORDS_PER_PAGE) for _ in range(page_count)]
+        corpus[size] = {
+            "pages": page_count,
+            "text": "\n".join(pages),
+            "pdf": make_pdf(pages),
+            "docx": make_docx(pages),
+        }
+    return corpus
+
+
+# =============================
+# MEASUREMENT
+# =============================
+
+def summarize(latencies, elapsed, errors=0):
+    latencies = sorted(latencies)
+
+    def percentile(q):
+        if not latencies:
+            return None
+        return round(latencies[min(len(latencies) - 1, int(q * len(latencies)))] * 1000, 3)
+
+    return {
+        "n": len(latencies),
+        "errors": errors,
+        "ops_per_sec": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": percentile(0.50),
+        "p95_ms": percentile(0.95),
+        "p99_ms": percentile(0.99),
+    }
+
+
+def run_micro(func, seconds=1.0, min_runs=5):
+    # Calls func() repeatedly for `seconds` (at least min_runs times),
+    # after one untimed warm-up call (pool spawn, imports, lru caches)
+    func()
+    latencies = []
+    started = time.perf_counter()
+    while len(latencies) < min_runs or time.perf_counter() - started < seconds:
+        call_started = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - call_started)
+    return summarize(latencies, time.perf_counter() - started)
+
+
+def run_load(func, total, concurrency):
+    # func(i) → True on success; spread over `concurrency` threads
+    from concurrent.futures import ThreadPoolExecutor
+
+    latencies = []
+    errors = []
+
+    def one(i):
+        call_started = time.perf_counter()
+        try:
+            ok = func(i)
+        except Exception as e:
+            errors.append(repr(e))
+            return
+        if ok:
+            latencies.append(time.perf_counter() - call_started)
+        else:
+            errors.append("failed")
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(concurrency) as pool:
+        list(pool.map(one, range(total)))
+    result = summarize(latencies, time.perf_counter() - started, len(errors))
+    if errors:
+        result["first_error"] = errors[0]
+    return result
+
+
+# =============================
+# THROWAWAY DATABASE & SERVER
+# =============================
+# Load tests create users, reports and jobs: they run against a fresh,
+# migrated test database (test_<NAME>; a temporary file for SQLite, so a
+# server process can open it too), dropped afterwards. The server under
+# test is a separate `runserver` process configured through its
+# environment, the way a deployment is, rather than by patching modules.
+
+@contextmanager
+def test_database():
+    connection = connections["default"]
+    test = connection.settings_dict["TEST"]
+    saved, old_name = test.get("NAME"), connection.settings_dict["NAME"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if connection.vendor == "sqlite" and not saved:
+            test["NAME"] = os.path.join(tmp, "benchmark.sqlite3")
+        try:
+            name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+            try:
+                yield name
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+        finally:
+            test["NAME"] = saved
+
+
+def database_env(name):
+    # Points a child process's settings.py at database `name`
+    if connections["default"].vendor == "sqlite":
+        return {"SQLITE_PATH": str(name)}
+    return {"POSTGRES_DB": name}
+
+
+class ServerProcess:
+    def __init__(self, env=None, host="127.0.0.1", port=0, timeout=30):
+        self.env = env or {}
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.process = None
+        self.log = None
+
+    @property
+    def url(self):
+        return f"http://{self.host}:{self.port}"
+
+    def start(self):
+        if not self.port:
+            with socket.socket() as sock:
+                sock.bind((self.host, 0))
+                self.port = sock.getsockname()[1]
+
+        self.log = tempfile.TemporaryFile()
+        self.process = subprocess.Popen(
+            [sys.executable, "manage.py", "runserver", "--noreload", f"{self.host}:{self.port}"],
+            cwd=settings.BASE_DIR, env={**os.environ, **self.env},
+            stdout=self.log, stderr=subprocess.STDOUT,
+        )
+
+        deadline = time.monotonic() + self.timeout
+        while True:
+            if self.process.poll() is not None or time.monotonic() > deadline:
+                self.stop()
+                raise RuntimeError(f"Server did not start:\n{self.output()[-2000:]}")
+            try:
+                socket.create_connection((self.host, self.port), timeout=0.5).close()
+                return self
+            except OSError:
+                time.sleep(0.1)
+
+    def output(self):
+        self.log.seek(0)
+        return self.log.read().decode("utf-8", "replace")
+
+    def stop(self):
+        if self.process is not None and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+                self.process.wait()
+        if self.log is not None:
+            self.log.close()
+            self.log = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+# =============================
+# RESULTS & REGRESSIONS
+# =============================
+# Baseline file: a previous --output, optionally with
+# {"thresholds": {"<benchmark>": 0.5}} overriding the default tolerance.
+# p95 is only compared once both runs have enough samples for it to be
+# more than the single slowest call.
+
+MIN_P95_SAMPLES = 20
+
+def compare(results, baseline, tolerance):
+    regressions = []
+    thresholds = baseline.get("thresholds", {})
+
+    for name, current in results.items():
+        previous = baseline.get("results", {}).get(name)
+        if not previous:
+            continue
+        allowed = thresholds.get(name, tolerance)
+
+        if previous.get("ops_per_sec") and current["ops_per_sec"] < previous["ops_per_sec"] * (1 - allowed):
+            regressions.append(
+                f"{name}: {current['ops_per_sec']} ops/s vs baseline {previous['ops_per_sec']} "
+                f"(-{(1 - current['ops_per_sec'] / previous['ops_per_sec']) * 100:.0f}%, allowed {allowed * 100:.0f}%)"
+            )
+        enough = min(current["n"], previous.get("n", 0)) >= MIN_P95_SAMPLES
+        if enough and previous.get("p95_ms") and current["p95_ms"] > previous["p95_ms"] * (1 + allowed):
+            regressions.append(
+                f"{name}: p95 {current['p95_ms']}ms vs baseline {previous['p95_ms']}ms "
+                f"(+{(current['p95_ms'] / previous['p95_ms'] - 1) * 100:.0f}%, allowed {allowed * 100:.0f}%)"
+            )
+        if current.get("errors") and not previous.get("errors"):
+            regressions.append(f"{name}: {current['errors']} errors (baseline had none)")
+
+    return regressions
+
+
+def load_baseline(path):
+    with open(path) as f:
+        return json.load(f)
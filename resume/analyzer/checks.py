@@ -0,0 +1,16 @@
+import importlib.util
+
+from django.conf import settings
+from django.core.checks import Warning, register
+
+
+@register()
+def password_hasher_check(app_configs, **kwargs):
+    # settings.py falls back to scrypt; say so once, not on every import
+    if getattr(settings, "PASSWORD_HASHER", "") == "argon2" and importlib.util.find_spec("argon2") is None:
+        return [Warning(
+            "PASSWORD_HASHER is argon2 but argon2-cffi is not installed; using scrypt instead.",
+            hint="pip install argon2-cffi",
+            id="analyzer.W001",
+        )]
+    return []
@@ -0,0 +1,81 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+from . import instrumentation
+
+
+# =============================
+# CIRCUIT BREAKER CONFIG
+# =============================
+# State lives in the Django cache, so every worker sharing the cache
+# backend sees the same open/closed circuits.
+
+FAILURE_THRESHOLD = getattr(settings, "OPENROUTER_CIRCUIT_THRESHOLD", 3)
+COOLDOWN = getattr(settings, "OPENROUTER_CIRCUIT_COOLDOWN", 30)
+
+# How long a half-open probe may run before another worker may try
+PROBE_TIMEOUT = 30
+
+STATE_TTL = 24 * 3600
+
+
+def _keys(model):
+    prefix = f"ai-circuit:{model}"
+    return f"{prefix}:failures", f"{prefix}:open-until", f"{prefix}:probe"
+
+
+# =============================
+# STATE TRANSITIONS
+# =============================
+
+def allow(model):
+    _, open_key, probe_key = _keys(model)
+    open_until = cache.get(open_key)
+
+    if open_until is None:
+        return True                     # closed
+
+    if time.time() < open_until:
+        return False                    # open
+
+    # half-open: exactly one caller gets to probe the model
+    return cache.add(probe_key, True, timeout=PROBE_TIMEOUT)
+
+
+def record_success(model):
+    cache.delete_many(_keys(model))
+
+
+def record_failure(model):
+    failures_key, open_key, probe_key = _keys(model)
+
+    cache.add(failures_key, 0, timeout=STATE_TTL)
+    try:
+        failures = cache.incr(failures_key)
+    except ValueError:
+        failures = 1
+        cache.set(failures_key, failures, timeout=STATE_TTL)
+
+    half_open = cache.get(open_key) is not None
+    if half_open or failures >= FAILURE_THRESHOLD:
+        instrumentation.event("circuit_opened", logging.WARNING, model=model, failures=failures)
+        instrumentation.count("circuit_opened", model=model)
+        cache.set(open_key, time.time() + COOLDOWN, timeout=STATE_TTL)
+        cache.delete_many([failures_key, probe_key])
+
+
+def state(model):
+    failures_key, open_key, _ = _keys(model)
+    open_until = cache.get(open_key)
+
+    if open_until is None:
+        status = "closed"
+    elif time.time() < open_until:
+        status = "open"
+    else:
+        status = "half-open"
+
+    return {"state": status, "failures": cache.get(failures_key, 0)}
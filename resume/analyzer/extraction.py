@@ -0,0 +1,244 @@
+import io
+import mmap
+import multiprocessing
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+
+
+# =============================
+# EXTRACTION LIMITS
+# =============================
+
+MAX_PAGES = getattr(settings, "EXTRACTION_MAX_PAGES", 50)
+MAX_CHARS = getattr(settings, "EXTRACTION_MAX_CHARS", 100_000)
+
+# Wall-clock seconds per document; 0 parses inline without a subprocess.
+TIME_BUDGET = getattr(settings, "EXTRACTION_TIME_BUDGET", 15)
+START_METHOD = getattr(settings, "EXTRACTION_START_METHOD", None)
+
+
+class ExtractionError(Exception):
+    pass
+
+
+class ExtractionTimeout(ExtractionError):
+    pass
+
+
+# =============================
+# DOCUMENT SOURCES
+# =============================
+# In-memory uploads reach the parsers as bytes. Uploads Django spooled to
+# disk travel as their path (a few bytes to pickle) and are memory-mapped
+# where they are parsed, so no copy of the file lands on the heap.
+
+class SpooledFile(str):
+    pass
+
+
+class _MappedFile(mmap.mmap):
+    # zipfile (python-docx) checks seekable(), which mmap does not define
+    def seekable(self):
+        return True
+
+
+@contextmanager
+def open_source(data):
+    if not isinstance(data, SpooledFile):
+        yield io.BytesIO(data)
+        return
+
+    with open(data, "rb") as f:
+        try:
+            mapped = _MappedFile(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            # Empty files cannot be mapped
+            yield io.BytesIO(b"")
+            return
+        try:
+            yield mapped
+        finally:
+            mapped.close()
+
+
+# =============================
+# LAZY PAGE ITERATORS
+# =============================
+
+# PyPDF2 / python-docx are imported on first parse (parser workers import
+# them up front in parsing._init_worker), not by every process loading views
+
+def iter_pdf_pages(file):
+    import PyPDF2
+
+    reader = PyPDF2.PdfReader(file)
+    for page in reader.pages:
+        yield page.extract_text() or ""
+
+
+def iter_docx_paragraphs(file):
+    import docx
+
+    for paragraph in docx.Document(file).paragraphs:
+        yield paragraph.text
+
+
+ITERATORS = {
+    # Newline keeps page boundaries, so running headers / footers stay on
+    # their own lines (analyzer/prompting.py drops them)
+    "pdf": (iter_pdf_pages, "\n"),
+    "docx": (iter_docx_paragraphs, "\n"),
+}
+
+# Kinds whose chunks are pages. DOCX yields paragraphs: a resume easily has
+# more than MAX_PAGES of them, so only max_chars bounds it and no page
+# count is reported.
+PAGED = {"pdf"}
+
+
+# =============================
+# KILLABLE SUBPROCESS
+# =============================
+
+def _stream_child(conn, kind, data):
+    iterate, _ = ITERATORS[kind]
+    try:
+        with open_source(data) as source:
+            for chunk in iterate(source):
+                conn.send(("chunk", chunk))
+        conn.send(("done", None))
+    except Exception as e:
+        conn.send(("error", f"{type(e).__name__}: {e}"))
+    finally:
+        conn.close()
+
+
+def iter_in_subprocess(kind, data, budget):
+    ctx = multiprocessing.get_context(START_METHOD)
+    parent, child = ctx.Pipe(duplex=False)
+    proc = ctx.Process(target=_stream_child, args=(child, kind, data), daemon=True)
+    proc.start()
+    child.close()
+
+    deadline = time.monotonic() + budget
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not parent.poll(remaining):
+                raise ExtractionTimeout(f"Extraction exceeded {budget}s")
+
+            try:
+                tag, payload = parent.recv()
+            except EOFError:
+                raise ExtractionError("Extraction process exited unexpectedly")
+
+            if tag == "done":
+                return
+            if tag == "error":
+                raise ExtractionError(payload)
+            yield payload
+    finally:
+        # Also runs when the consumer stops early because a budget was hit
+        if proc.is_alive():
+            proc.kill()
+        proc.join()
+        parent.close()
+
+
+def iter_inline(kind, data):
+    iterate, _ = ITERATORS[kind]
+    try:
+        with open_source(data) as source:
+            yield from iterate(source)
+    except Exception as e:
+        raise ExtractionError(f"{type(e).__name__}: {e}") from e
+
+
+# =============================
+# BOUNDED COLLECTION
+# =============================
+
+def collect(chunks, separator, max_pages, max_chars, deadline=None):
+    # max_pages=None: no limit on the number of chunks
+    parts = []
+    pages = 0
+    chars = 0   # text so far plus the separator before the next chunk
+    truncated = False
+    timed_out = False
+
+    try:
+        for chunk in chunks:
+            room = max_chars - chars
+            if room <= 0 or (max_pages is not None and pages >= max_pages):
+                truncated = True
+                break
+
+            pages += 1
+            if len(chunk) > room:
+                parts.append(chunk[:room])
+                truncated = True
+                break
+
+            parts.append(chunk)
+            chars += len(chunk) + len(separator)
+
+            # Soft budget for in-process parsing, checked between pages
+            if deadline is not None and time.monotonic() > deadline:
+                truncated = timed_out = True
+                break
+    except ExtractionTimeout:
+        # Keep whatever arrived before the budget ran out
+        if not parts:
+            raise
+        truncated = timed_out = True
+    finally:
+        close = getattr(chunks, "close", None)
+        if close:
+            close()
+
+    return {
+        "text": separator.join(parts),
+        "pages": pages,
+        "truncated": truncated,
+        "timed_out": timed_out,
+    }
+
+
+def read_upload(file):
+    # Spooled uploads by path (see open_source), in-memory ones as bytes
+    temporary_path = getattr(file, "temporary_file_path", None)
+    if temporary_path is not None:
+        return SpooledFile(temporary_path())
+    file.seek(0)
+    return file.read()
+
+
+def extract_document(kind, file, max_pages=None, max_chars=None, budget=None):
+    return extract_data(kind, read_upload(file), max_pages, max_chars, budget)
+
+
+def extract_data(kind, data, max_pages=None, max_chars=None, budget=None):
+    # data: bytes or a SpooledFile, as returned by read_upload
+    max_pages = MAX_PAGES if max_pages is None else max_pages
+    max_chars = MAX_CHARS if max_chars is None else max_chars
+    budget = TIME_BUDGET if budget is None else budget
+
+    if budget > 0:
+        chunks = iter_in_subprocess(kind, data, budget)
+    else:
+        chunks = iter_inline(kind, data)
+
+    return collect_document(kind, chunks, max_pages, max_chars)
+
+
+def collect_document(kind, chunks, max_pages, max_chars, deadline=None):
+    # collect() with the page cap and page count only where chunks are pages
+    _, separator = ITERATORS[kind]
+    if kind not in PAGED:
+        extraction = collect(chunks, separator, None, max_chars, deadline)
+        extraction["pages"] = None
+        return extraction
+    return collect(chunks, separator, max_pages, max_chars, deadline)
+
@@ -0,0 +1,158 @@
+import json
+import os
+import tempfile
+import threading
+import zlib
+from pathlib import Path
+
+from django.conf import settings
+
+from . import instrumentation
+
+
+# =============================
+# CACHE CONFIG
+# =============================
+
+CACHE_DIR = Path(getattr(settings, "EXTRACTION_CACHE_DIR", settings.BASE_DIR / ".cache" / "extraction"))
+MAX_BYTES = getattr(settings, "EXTRACTION_CACHE_MAX_BYTES", 200 * 1024 * 1024)
+
+# Bump when extraction output changes so old blobs are never served.
+EXTRACTOR_VERSION = 3
+
+PRUNE_EVERY = 20
+
+_lock = threading.Lock()
+_counters = {"hits": 0, "misses": 0, "writes": 0, "errors": 0}
+_writes_since_prune = 0
+
+
+# =============================
+# BLOB PATHS
+# =============================
+
+def blob_path(digest, kind):
+    return CACHE_DIR / digest[:2] / f"{digest}-{kind}-v{EXTRACTOR_VERSION}.z"
+
+
+def read(digest, kind):
+    path = blob_path(digest, kind)
+    try:
+        extraction = json.loads(zlib.decompress(path.read_bytes()))
+    except FileNotFoundError:
+        _bump("misses")
+        return None
+    except (OSError, zlib.error, ValueError):
+        _bump("errors")
+        return None
+
+    # mtime doubles as "last used" for pruning
+    try:
+        os.utime(path)
+    except OSError:
+        pass
+
+    _bump("hits")
+    return extraction
+
+
+def write(digest, kind, extraction):
+    global _writes_since_prune
+
+    path = blob_path(digest, kind)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as f:
+            f.write(zlib.compress(json.dumps(extraction).encode("utf-8"), 6))
+        os.replace(tmp, path)
+    except OSError:
+        _bump("errors")
+        return
+
+    _bump("writes")
+
+    with _lock:
+        _writes_since_prune += 1
+        due = _writes_since_prune >= PRUNE_EVERY
+        if due:
+            _writes_since_prune = 0
+
+    if due:
+        prune()
+
+
+def get_or_extract(digest, kind, extract):
+    extraction = read(digest, kind)
+    if extraction is None:
+        extraction = extract()
+        # A timed-out parse may succeed next time, so don't pin it
+        if not extraction.get("timed_out"):
+            write(digest, kind, extraction)
+    return extraction
+
+
+def _bump(counter):
+    # stats() for this process; /metrics (analyzer_cache_events_total) too
+    with _lock:
+        _counters[counter] += 1
+    instrumentation.cache_event("extraction", counter)
+
+
+# =============================
+# EVICTION & STATS
+# =============================
+
+def _blobs():
+    if not CACHE_DIR.exists():
+        return []
+
+    blobs = []
+    for shard in os.scandir(CACHE_DIR):
+        if not shard.is_dir():
+            continue
+        for entry in os.scandir(shard.path):
+            if entry.is_file():
+                st = entry.stat()
+                blobs.append((st.st_mtime, st.st_size, entry.path))
+    return blobs
+
+
+def prune(max_bytes=None):
+    max_bytes = MAX_BYTES if max_bytes is None else max_bytes
+    blobs = sorted(_blobs())
+    total = sum(size for _, size, _ in blobs)
+
+    removed = 0
+    for _, size, path in blobs:
+        if total <= max_bytes:
+            break
+        try:
+            os.remove(path)
+        except OSError:
+            continue
+        total -= size
+        removed += 1
+
+    return removed
+
+
+def clear():
+    return prune(0)
+
+
+def usage():
+    blobs = _blobs()
+    return {
+        "entries": len(blobs),
+        "bytes": sum(size for _, size, _ in blobs),
+        "max_bytes": MAX_BYTES,
+    }
+
+
+def stats():
+    # Hit / miss counters are per process
+    with _lock:
+        counters = dict(_counters)
+    counters.update(usage())
+    return counters
@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+)
+
+
+# =============================
+# COST-TUNABLE HASHERS
+# =============================
+# Same algorithm names as Django's hashers, so existing hashes keep
+# verifying. When the configured cost differs from a stored hash,
+# must_update() is true and check_password() re-hashes it on the next
+# successful login.
+
+class TunedPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    iterations = getattr(settings, "PASSWORD_PBKDF2_ITERATIONS", PBKDF2PasswordHasher.iterations)
+
+
+class TunedScryptPasswordHasher(ScryptPasswordHasher):
+    work_factor = getattr(settings, "PASSWORD_SCRYPT_WORK_FACTOR", ScryptPasswordHasher.work_factor)
+    block_size = getattr(settings, "PASSWORD_SCRYPT_BLOCK_SIZE", ScryptPasswordHasher.block_size)
+    parallelism = getattr(settings, "PASSWORD_SCRYPT_PARALLELISM", ScryptPasswordHasher.parallelism)
+
+
+class TunedArgon2PasswordHasher(Argon2PasswordHasher):
+    time_cost = getattr(settings, "PASSWORD_ARGON2_TIME_COST", Argon2PasswordHasher.time_cost)
+    memory_cost = getattr(settings, "PASSWORD_ARGON2_MEMORY_COST", Argon2PasswordHasher.memory_cost)
+    parallelism = getattr(settings, "PASSWORD_ARGON2_PARALLELISM", Argon2PasswordHasher.parallelism)
+
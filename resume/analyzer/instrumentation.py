@@ -0,0 +1,257 @@
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+
+from django.conf import settings
+
+
+# =============================
+# INSTRUMENTATION CONFIG
+# =============================
+
+# False turns every stage() into a shared no-op: no clock reads, no locks
+ENABLED = getattr(settings, "ANALYZER_METRICS_ENABLED", True)
+
+SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 60)
+BYTES_BUCKETS = (10_000, 50_000, 100_000, 500_000, 1_000_000, 5_000_000, 10_000_000)
+COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 500)
+
+logger = logging.getLogger("analyzer")
+
+
+# =============================
+# STRUCTURED LOGS
+# =============================
+
+def event(name, level=logging.INFO, exc_info=False, **fields):
+    if logger.isEnabledFor(level):
+        logger.log(level, name, exc_info=exc_info, extra={"event": name, "fields": fields})
+
+
+class JsonFormatter(logging.Formatter):
+    # One JSON object per line: {"ts", "level", "logger", "event", ...fields}
+    def format(self, record):
+        data = {
+            "ts": round(record.created, 3),
+            "level": record.levelname.lower(),
+            "logger": record.name,
+            "event": getattr(record, "event", record.getMessage()),
+        }
+        data.update(getattr(record, "fields", {}))
+        if record.exc_info:
+            data["exc"] = self.formatException(record.exc_info)
+        return json.dumps(data, default=str)
+
+
+class KeyValueFormatter(logging.Formatter):
+    # Human-readable variant for local runs: "event key=value ..."
+    def format(self, record):
+        fields = getattr(record, "fields", {})
+        line = " ".join(
+            [f"[{record.levelname.lower()}] {getattr(record, 'event', record.getMessage())}"]
+            + [f"{key}={value}" for key, value in fields.items()]
+        )
+        if record.exc_info:
+            line += "\n" + self.formatException(record.exc_info)
+        return line
+
+
+# =============================
+# METRIC REGISTRY
+# =============================
+
+class Histogram:
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help = help_text
+        self.buckets = tuple(buckets)
+        self.series = {}   # labels tuple → [bucket counts..., +Inf], sum
+
+    def observe(self, value, labels):
+        series = self.series.get(labels)
+        if series is None:
+            series = self.series[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        series[0][bisect_left(self.buckets, value)] += 1
+        series[1] += value
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for labels, (counts, total) in sorted(self.series.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets + ("+Inf",), counts):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(labels, le=bound)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(labels)} {total:.6f}")
+            lines.append(f"{self.name}_count{_labels(labels)} {cumulative}")
+        return lines
+
+
+class Counter:
+    def __init__(self, name, help_text):
+        self.name = name
+        self.help = help_text
+        self.series = {}
+
+    def inc(self, labels, amount=1):
+        self.series[labels] = self.series.get(labels, 0) + amount
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for labels, value in sorted(self.series.items()):
+            lines.append(f"{self.name}{_labels(labels)} {value}")
+        return lines
+
+
+def _labels(labels, **extra):
+    pairs = list(labels) + list(extra.items())
+    if not pairs:
+        return ""
+    escaped = (str(v).replace("\\", "\\\\").replace('"', '\\"') for _, v in pairs)
+    return "{" + ",".join(f'{k}="{v}"' for (k, _), v in zip(pairs, escaped)) + "}"
+
+
+class Registry:
+    # Per process: each worker serves its own /metrics
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def histogram(self, name, help_text, buckets=SECONDS_BUCKETS):
+        with self._lock:
+            return self._metrics.setdefault(name, Histogram(name, help_text, buckets))
+
+    def counter(self, name, help_text):
+        with self._lock:
+            return self._metrics.setdefault(name, Counter(name, help_text))
+
+    def observe(self, metric, value, labels):
+        with self._lock:
+            metric.observe(value, labels)
+
+    def inc(self, metric, labels, amount=1):
+        with self._lock:
+            metric.inc(labels, amount)
+
+    def render(self):
+        with self._lock:
+            lines = []
+            for metric in self._metrics.values():
+                lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+
+STAGE_SECONDS = REGISTRY.histogram(
+    "analyzer_stage_duration_seconds", "Wall time per analyze pipeline stage."
+)
+STAGE_BYTES = REGISTRY.histogram(
+    "analyzer_stage_bytes", "Bytes handled per pipeline stage.", BYTES_BUCKETS
+)
+STAGE_PAGES = REGISTRY.histogram(
+    "analyzer_stage_pages", "Document pages handled per pipeline stage.", COUNT_BUCKETS
+)
+EVENTS = REGISTRY.counter("analyzer_events_total", "Discrete pipeline events.")
+PROMPT_TOKENS = REGISTRY.counter(
+    "analyzer_prompt_tokens_total", "Approximate prompt tokens sent to / saved from each model."
+)
+CACHE_EVENTS = REGISTRY.counter(
+    "analyzer_cache_events_total", "Hits, misses, stores and evictions per cache (analysis, extraction)."
+)
+
+
+# =============================
+# STAGES
+# =============================
+# with stage("extraction", kind="pdf") as s:
+#     ...
+#     s.set(pages=3, outcome="cached")
+# Records duration (+ bytes / pages when set) under {stage, outcome[, model]}
+# and writes one structured log line.
+
+LABEL_FIELDS = ("model", "op", "kind")
+
+
+class _Stage:
+    __slots__ = ("name", "fields", "started")
+
+    def __init__(self, name, fields):
+        self.name = name
+        self.fields = fields
+
+    def set(self, **fields):
+        self.fields.update(fields)
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        elapsed = time.perf_counter() - self.started
+        fields = self.fields
+        outcome = fields.pop("outcome", None) or ("error" if exc_type else "ok")
+
+        labels = (("stage", self.name), ("outcome", outcome)) + tuple(
+            (key, fields[key]) for key in LABEL_FIELDS if key in fields
+        )
+        REGISTRY.observe(STAGE_SECONDS, elapsed, labels)
+        if "bytes" in fields:
+            REGISTRY.observe(STAGE_BYTES, fields["bytes"], labels[:1])
+        if fields.get("pages") is not None:
+            REGISTRY.observe(STAGE_PAGES, fields["pages"], labels[:1])
+
+        if exc_type is not None:
+            fields["error"] = repr(exc)
+        event(
+            "stage",
+            level=logging.WARNING if exc_type else logging.INFO,
+            stage=self.name,
+            outcome=outcome,
+            ms=round(elapsed * 1000, 2),
+            **fields
+        )
+        return False
+
+
+class _NoopStage:
+    __slots__ = ()
+
+    def set(self, **fields):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+NOOP_STAGE = _NoopStage()
+
+
+def stage(name, **fields):
+    if not ENABLED:
+        return NOOP_STAGE
+    return _Stage(name, fields)
+
+
+def count(name, **labels):
+    if ENABLED:
+        REGISTRY.inc(EVENTS, (("event", name),) + tuple(labels.items()))
+
+
+def prompt_tokens(model, sent, saved):
+    if ENABLED:
+        REGISTRY.inc(PROMPT_TOKENS, (("model", model), ("kind", "sent")), sent)
+        REGISTRY.inc(PROMPT_TOKENS, (("model", model), ("kind", "saved")), saved)
+
+
+def cache_event(cache, result, amount=1):
+    if ENABLED and amount:
+        REGISTRY.inc(CACHE_EVENTS, (("cache", cache), ("result", result)), amount)
+
+
+def render_metrics():
+    return REGISTRY.render()
@@ -0,0 +1,300 @@
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from . import instrumentation, report_results, stats
+from .analysis import run_analysis
+from .models import AnalysisJob, ResumeReport
+
+
+# =============================
+# QUEUE CONFIG
+# =============================
+
+# Threads inside the web process that pick up jobs right after commit.
+# Set to 0 when a separate `run_analysis_worker` process drains the queue.
+LOCAL_WORKERS = getattr(settings, "ANALYSIS_LOCAL_WORKERS", 2)
+
+# A "Running" job older than this is assumed to belong to a dead worker.
+STALE_AFTER = getattr(settings, "ANALYSIS_JOB_STALE_AFTER", 300)
+MAX_ATTEMPTS = getattr(settings, "ANALYSIS_JOB_MAX_ATTEMPTS", 3)
+
+# Every SWEEP_INTERVAL seconds stale "Running" jobs are requeued, and the
+# web process resubmits "Pending" jobs older than ORPHAN_AFTER that none of
+# its threads holds (their on_commit submit died with a restarted process).
+SWEEP_INTERVAL = getattr(settings, "ANALYSIS_JOB_SWEEP_INTERVAL", 60)
+ORPHAN_AFTER = getattr(settings, "ANALYSIS_JOB_ORPHAN_AFTER", 60)
+SWEEP_BATCH = 100
+
+_executor = None
+_executor_lock = threading.Lock()
+_queued = set()
+_sweeper = None
+
+
+# =============================
+# ENQUEUE
+# =============================
+
+def enqueue_analysis(user, name, resume_text, job_description, extraction=None):
+    with instrumentation.stage("persist", op="enqueue"), transaction.atomic():
+        stats.record_created(user.id)
+        report = ResumeReport.objects.create(
+            user=user,
+            name=name,
+            analysis_status="Pending"
+        )
+        job = AnalysisJob.objects.create(
+            report=report,
+            resume_text=resume_text,
+            job_description=job_description or "",
+            extraction=extraction or {}
+        )
+        transaction.on_commit(lambda: submit_local(job.id))
+
+    return report
+
+
+def record_analysis(user, name, resume_text, job_description, result, extraction=None):
+    # Analysis already ran in the request (async view): store it as a finished job
+    extraction = extraction or {}
+    result["extraction_truncated"] = extraction.get("truncated", False)
+    now = timezone.now()
+
+    with instrumentation.stage("persist", op="record"), transaction.atomic():
+        stats.record_completed(user.id, [result["ats_score"]], created=True)
+        report = ResumeReport.objects.create(
+            user=user,
+            name=name,
+            score=result["ats_score"],
+            analysis_status="Completed"
+        )
+        AnalysisJob.objects.create(
+            report=report,
+            resume_text=resume_text,
+            job_description=job_description or "",
+            extraction=extraction,
+            status="Completed",
+            attempts=1,
+            started_at=now,
+            finished_at=now
+        )
+        report_results.store(report, result)
+
+    return report
+
+
+def submit_local(job_id):
+    if LOCAL_WORKERS <= 0:
+        return
+
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=LOCAL_WORKERS,
+                thread_name_prefix="analysis-job"
+            )
+        # Already waiting for a thread here (the sweep found it Pending)
+        if job_id in _queued:
+            return
+        _queued.add(job_id)
+
+    start_sweeper()
+    _executor.submit(_run_in_thread, job_id)
+
+
+def _run_in_thread(job_id):
+    close_old_connections()
+    try:
+        process_job(job_id)
+    except Exception:
+        # Nobody reads the future: log here or the error is lost
+        instrumentation.event("analysis_job_crashed", logging.ERROR, job_id=job_id, exc_info=True)
+    finally:
+        with _executor_lock:
+            _queued.discard(job_id)
+        close_old_connections()
+
+
+# =============================
+# CLAIM & RUN
+# =============================
+
+def claim_job(job_id):
+    # Conditional UPDATE: only one worker can move a job out of "Pending".
+    return AnalysisJob.objects.filter(pk=job_id, status="Pending").update(
+        status="Running",
+        started_at=timezone.now(),
+        attempts=F("attempts") + 1
+    ) == 1
+
+
+def claim_next():
+    pending = (
+        AnalysisJob.objects
+        .filter(status="Pending")
+        .order_by("created_at")
+        .values_list("id", flat=True)[:10]
+    )
+    for job_id in pending:
+        if claim_job(job_id):
+            return job_id
+    return None
+
+
+def process_job(job_id):
+    if claim_job(job_id):
+        run_job(job_id)
+
+
+class _ReportDeleted(Exception):
+    pass
+
+
+def run_job(job_id):
+    # The user may delete the report (and with it the job) at any point
+    try:
+        job = AnalysisJob.objects.select_related("report").get(pk=job_id)
+    except AnalysisJob.DoesNotExist:
+        instrumentation.event("analysis_job_dropped", job_id=job_id)
+        return
+    report = job.report
+
+    try:
+        result = run_analysis(job.resume_text, job.job_description)
+    except Exception as e:
+        instrumentation.event("analysis_job_failed", logging.ERROR, job_id=job_id, error=str(e), exc_info=True)
+        job.status = "Failed"
+        job.error = str(e)
+        report.analysis_status = "Failed"
+    else:
+        result["extraction_truncated"] = job.extraction.get("truncated", False)
+        job.status = "Completed"
+        report.score = result["ats_score"]
+        report.analysis_status = "Completed"
+
+    job.finished_at = timezone.now()
+
+    try:
+        with instrumentation.stage("persist", op="job_result"), transaction.atomic():
+            # Conditional writes: zero rows means the report went away meanwhile
+            saved = AnalysisJob.objects.filter(pk=job.pk).update(
+                status=job.status, error=job.error, finished_at=job.finished_at
+            ) and ResumeReport.objects.filter(pk=report.pk).update(
+                score=report.score, analysis_status=report.analysis_status
+            )
+            if not saved:
+                raise _ReportDeleted()
+
+            if report.analysis_status == "Completed":
+                stats.record_completed(report.user_id, [report.score])
+                report_results.store(report, result)
+            else:
+                stats.bump_version(report.user_id)
+    except _ReportDeleted:
+        instrumentation.event("analysis_job_dropped", job_id=job_id)
+
+
+def requeue_stale():
+    cutoff = timezone.now() - timedelta(seconds=STALE_AFTER)
+    stale = AnalysisJob.objects.filter(status="Running", started_at__lt=cutoff)
+
+    requeued = stale.filter(attempts__lt=MAX_ATTEMPTS).update(status="Pending")
+
+    for job in stale.select_related("report"):
+        job.status = "Failed"
+        job.error = "Worker did not finish the job in time."
+        job.finished_at = timezone.now()
+        with transaction.atomic():
+            stats.bump_version(job.report.user_id)
+            job.save(update_fields=["status", "error", "finished_at"])
+            ResumeReport.objects.filter(pk=job.report_id).update(analysis_status="Failed")
+
+    return requeued
+
+
+# =============================
+# RECOVERY SWEEP
+# =============================
+
+def sweep(submit=True):
+    # Stale Running → Pending (or Failed); with submit, old Pending jobs go
+    # to this process's threads. claim_job keeps a job from running twice
+    # when several processes sweep the same rows.
+    requeued = requeue_stale()
+
+    if submit and LOCAL_WORKERS > 0:
+        cutoff = timezone.now() - timedelta(seconds=ORPHAN_AFTER)
+        orphans = (
+            AnalysisJob.objects
+            .filter(status="Pending", created_at__lt=cutoff)
+            .order_by("created_at")
+            .values_list("id", flat=True)[:SWEEP_BATCH]
+        )
+        for job_id in orphans:
+            submit_local(job_id)
+
+    return requeued
+
+
+def sweep_loop(stop_event, interval=None, submit=True):
+    interval = SWEEP_INTERVAL if interval is None else interval
+    while not stop_event.wait(interval):
+        close_old_connections()
+        try:
+            requeued = sweep(submit)
+        except Exception:
+            instrumentation.event("analysis_sweep_failed", logging.ERROR, exc_info=True)
+        else:
+            if requeued:
+                instrumentation.event("analysis_jobs_requeued", count=requeued)
+        finally:
+            close_old_connections()
+
+
+def start_sweeper():
+    # Web process: started on the first request (signals.py) or submit
+    global _sweeper
+    if LOCAL_WORKERS <= 0 or SWEEP_INTERVAL <= 0 or _sweeper is not None:
+        return
+    with _executor_lock:
+        if _sweeper is None:
+            _sweeper = threading.Thread(
+                target=sweep_loop, args=(threading.Event(),), name="analysis-sweep", daemon=True
+            )
+            _sweeper.start()
+
+
+# =============================
+# WORKER LOOP
+# =============================
+
+def worker_loop(stop_event, poll_interval=1.0, once=False):
+    while not stop_event.is_set():
+        close_old_connections()
+        job_id = claim_next()
+
+        if job_id is None:
+            if once:
+                break
+            stop_event.wait(poll_interval)
+            continue
+
+        started = time.monotonic()
+        try:
+            run_job(job_id)
+        except Exception:
+            # One bad job must not take the worker thread down with it
+            instrumentation.event("analysis_job_crashed", logging.ERROR, job_id=job_id, exc_info=True)
+            continue
+        instrumentation.event("analysis_job_done", job_id=job_id, seconds=round(time.monotonic() - started, 3))
+
+    close_old_connections()
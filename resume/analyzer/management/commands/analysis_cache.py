@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from django.db.models import Count, Sum
+
+from analyzer import result_cache
+from analyzer.models import AnalysisCacheEntry
+
+
+class Command(BaseCommand):
+    help = "Show, prune or clear the AI analysis result cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--prune", action="store_true", help="Drop expired and overflow entries.")
+        parser.add_argument("--max-entries", type=int, default=None)
+        parser.add_argument("--clear", action="store_true", help="Drop every cached result.")
+
+    def handle(self, *args, **options):
+        if options["clear"]:
+            result_cache.clear()
+            self.stdout.write(self.style.SUCCESS("Analysis cache cleared."))
+        elif options["prune"]:
+            removed = result_cache.prune(options["max_entries"])
+            self.stdout.write(self.style.SUCCESS(f"Pruned {removed} cache entries."))
+
+        totals = AnalysisCacheEntry.objects.aggregate(entries=Count("key"), hits=Sum("hits"))
+        self.stdout.write(f"Entries: {totals['entries']}")
+        self.stdout.write(f"Lifetime hits: {totals['hits'] or 0}")
+
+        for row in AnalysisCacheEntry.objects.values("model").annotate(entries=Count("key")).order_by("model"):
+            self.stdout.write(f"  {row['model']}: {row['entries']}")
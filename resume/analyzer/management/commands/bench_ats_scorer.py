@@ -0,0 +1,65 @@
+import random
+import re
+import time
+
+from django.core.management.base import BaseCommand
+
+from analyzer import scoring
+from analyzer.benchmarks import make_text
+
+
+def legacy_local_ats_analysis(resume_text, job_description):
+    # Set-intersection scorer this engine replaced, kept as the baseline
+    resume_words = set(re.findall(r"\b[a-zA-Z]{3,}\b", resume_text.lower()))
+    jd_words = set(re.findall(r"\b[a-zA-Z]{3,}\b", job_description.lower()))
+
+    matched = sorted(resume_words & jd_words)
+    missing = sorted(jd_words - resume_words)
+
+    match_percentage = int((len(matched) / len(jd_words)) * 100) if jd_words else 0
+    return {
+        "ats_score": min(match_percentage, 95),
+        "keyword_match_percentage": match_percentage,
+        "matched_keywords": matched[:15],
+        "missing_keywords": missing[:15],
+    }
+
+
+class Command(BaseCommand):
+    help = "Compare local ATS scorer throughput against the previous set-based scorer."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--resumes", type=int, default=500)
+        parser.add_argument("--words", type=int, default=600)
+        parser.add_argument("--jd-words", type=int, default=150)
+        parser.add_argument("--seed", type=int, default=7)
+        parser.add_argument("--repeat", type=int, default=5)
+
+    def handle(self, *args, **options):
+        rng = random.Random(options["seed"])
+        job_description = make_text(rng, options["jd_words"])
+        resumes = [make_text(rng, options["words"]) for _ in range(options["resumes"])]
+        self.repeat = max(options["repeat"], 1)
+
+        self.run("legacy set scorer", lambda: [
+            legacy_local_ats_analysis(text, job_description) for text in resumes
+        ], len(resumes))
+
+        scoring.vectorize_job_description.cache_clear()
+        self.run("scoring.score_resume", lambda: [
+            scoring.score_resume(text, job_description) for text in resumes
+        ], len(resumes))
+
+        scoring.vectorize_job_description.cache_clear()
+        self.run("scoring.score_resumes (batch)", lambda: scoring.score_resumes(
+            job_description, resumes
+        ), len(resumes))
+
+    def run(self, label, func, count):
+        # Best of --repeat runs; the first one also warms the stem cache
+        elapsed = float("inf")
+        for _ in range(self.repeat):
+            started = time.perf_counter()
+            func()
+            elapsed = min(elapsed, time.perf_counter() - started)
+        self.stdout.write(f"{label:32} {count / elapsed:10.1f} resumes/s")
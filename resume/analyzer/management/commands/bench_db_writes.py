@@ -0,0 +1,108 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import OperationalError, connection, connections, transaction
+
+from analyzer import benchmarks, stats
+from analyzer.models import AnalysisJob, ResumeReport
+from analyzer.reports import report_page
+
+
+BENCH_USER = "bench-db-writes"
+
+
+class Command(BaseCommand):
+    help = "Measure concurrent report write throughput on a test copy of the configured database."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--writers", type=int, default=8)
+        parser.add_argument("--writes", type=int, default=50, help="Writes per writer thread.")
+        parser.add_argument("--readers", type=int, default=2, help="Threads paging the report list meanwhile.")
+        parser.add_argument(
+            "--compare", action="store_true",
+            help="SQLite only: also run with Django's default connection options."
+        )
+
+    def handle(self, *args, **options):
+        # A throwaway copy of the configured backend: same engine and
+        # options, none of the real rows (and --compare may change its journal)
+        with benchmarks.test_database():
+            self.stdout.write(f"Backend: {connection.vendor} (test database {connection.settings_dict['NAME']})")
+            user = User.objects.create_user(BENCH_USER, f"{BENCH_USER}@example.invalid")
+
+            try:
+                if options["compare"] and connection.vendor == "sqlite":
+                    tuned = connections.settings["default"]["OPTIONS"]
+                    connections.settings["default"]["OPTIONS"] = {}
+                    # journal_mode=WAL persists in the file; undo it for a fair baseline
+                    self.run("sqlite defaults", user, options, journal="DELETE")
+                    connections.settings["default"]["OPTIONS"] = tuned
+                self.run(f"{connection.vendor} configured", user, options)
+            finally:
+                connection.close()
+
+    def run(self, label, user, options, journal=None):
+        connection.close()
+        if connection.vendor == "sqlite":
+            with connection.cursor() as cursor:
+                cursor.execute(f"PRAGMA journal_mode={journal}" if journal else "PRAGMA journal_mode")
+                journal = cursor.fetchone()[0]
+            label = f"{label} [journal={journal}]"
+
+        stop = threading.Event()
+        latencies = []
+        errors = []
+
+        def write(index):
+            started = time.perf_counter()
+            try:
+                with transaction.atomic():
+                    stats.record_created(user.id)
+                    report = ResumeReport.objects.create(user=user, name=f"bench-{index}")
+                    AnalysisJob.objects.create(report=report, resume_text="x" * 2000, job_description="y" * 500)
+            except OperationalError as e:
+                errors.append(str(e))
+            else:
+                latencies.append(time.perf_counter() - started)
+
+        def writer(offset):
+            try:
+                for i in range(options["writes"]):
+                    write(offset * options["writes"] + i)
+            finally:
+                connection.close()
+
+        def reader(_):
+            reads = 0
+            try:
+                while not stop.is_set():
+                    report_page(user, limit=20)
+                    reads += 1
+            except OperationalError as e:
+                errors.append(str(e))
+            finally:
+                connection.close()
+            return reads
+
+        with ThreadPoolExecutor(options["writers"] + options["readers"]) as pool:
+            readers = [pool.submit(reader, i) for i in range(options["readers"])]
+            started = time.perf_counter()
+            list(pool.map(writer, range(options["writers"])))
+            elapsed = time.perf_counter() - started
+            stop.set()
+            reads = sum(f.result() for f in readers)
+
+        latencies.sort()
+        p50 = latencies[len(latencies) // 2] * 1000 if latencies else 0
+        p95 = latencies[int(len(latencies) * 0.95)] * 1000 if latencies else 0
+
+        self.stdout.write(
+            f"{label:40} {len(latencies) / elapsed:8.1f} writes/s  "
+            f"p50 {p50:6.1f}ms  p95 {p95:6.1f}ms  "
+            f"{reads / elapsed:8.1f} reads/s  errors {len(errors)}"
+        )
+        if errors:
+            self.stdout.write(f"  first error: {errors[0]}")
@@ -0,0 +1,87 @@
+import random
+import time
+
+from django.contrib.auth import authenticate
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.db.models import Q
+from django.test.utils import CaptureQueriesContext, override_settings
+
+from analyzer import benchmarks
+
+PREFIX = "bench-login-"
+PASSWORD = "bench-password"
+
+# Isolates the lookup cost; the real hasher would dominate every timing
+FAST_HASHERS = ["django.contrib.auth.hashers.MD5PasswordHasher"]
+
+
+def legacy_login(identifier, password):
+    # Previous login_view → EmailBackend → ModelBackend chain, kept as the baseline
+    user_obj = User.objects.filter(
+        Q(username__iexact=identifier) | Q(email__iexact=identifier)
+    ).first()
+    if not user_obj:
+        return None
+
+    user = User.objects.filter(email=user_obj.username).order_by("id").first()
+    if user and user.check_password(password):
+        return user
+    return ModelBackend().authenticate(None, username=user_obj.username, password=password)
+
+
+def single_query_login(identifier, password):
+    return authenticate(None, username=identifier, password=password)
+
+
+class Command(BaseCommand):
+    help = "Compare login lookup throughput: legacy multi-query chain vs the single-query backend."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=5000)
+        parser.add_argument("--logins", type=int, default=2000)
+        parser.add_argument("--real-hasher", action="store_true", help="Use PASSWORD_HASHERS as configured.")
+        parser.add_argument("--seed", type=int, default=7)
+
+    def handle(self, *args, **options):
+        # Thousands of users: create them in a throwaway test database
+        with benchmarks.test_database():
+            if options["real_hasher"]:
+                self.run(options)
+            else:
+                with override_settings(PASSWORD_HASHERS=FAST_HASHERS):
+                    self.run(options)
+
+    def run(self, options):
+        rng = random.Random(options["seed"])
+        password = make_password(PASSWORD)
+
+        # Half sign up with username == email (signup_view), half have a
+        # distinct username, which used to fall through to ModelBackend
+        User.objects.bulk_create([
+            User(
+                username=f"{PREFIX}{i}@example.com" if i % 2 else f"{PREFIX}user{i}",
+                email=f"{PREFIX}{i}@example.com",
+                password=password,
+            )
+            for i in range(options["users"])
+        ], batch_size=500)
+
+        identifiers = []
+        for _ in range(options["logins"]):
+            i = rng.randrange(options["users"])
+            identifiers.append(f"{PREFIX}{i}@Example.com" if rng.random() < 0.5 else f"{PREFIX}{i}@example.com")
+
+        for label, login in (("legacy chain", legacy_login), ("single-query backend", single_query_login)):
+            with CaptureQueriesContext(connection) as queries:
+                started = time.perf_counter()
+                ok = sum(login(identifier, PASSWORD) is not None for identifier in identifiers)
+                elapsed = time.perf_counter() - started
+
+            self.stdout.write(
+                f"{label:22} {len(identifiers) / elapsed:9.1f} logins/s  "
+                f"{len(queries) / len(identifiers):4.2f} queries/login  ({ok}/{len(identifiers)} ok)"
+            )
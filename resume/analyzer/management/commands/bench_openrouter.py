@@ -0,0 +1,67 @@
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand
+
+from analyzer import openrouter
+from analyzer.openrouter_stub import StubOpenRouter
+
+
+class Command(BaseCommand):
+    help = "Compare per-call, pooled sync and pooled async OpenRouter clients against the local stub."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=200)
+        parser.add_argument("--concurrency", type=int, default=20)
+        parser.add_argument("--latency", type=float, default=0.05)
+
+    def handle(self, *args, **options):
+        total = options["requests"]
+        concurrency = options["concurrency"]
+        model = next(iter(openrouter.OPENROUTER_MODELS))
+        prompt = openrouter.build_prompt("Python developer with Django and SQL", "Python Django SQL")
+
+        with StubOpenRouter(latency=options["latency"]) as stub:
+            openrouter.OPENROUTER_URL = stub.url
+            openrouter.OPENROUTER_API_KEY = "stub-key"
+
+            def fresh_connection(_):
+                # Previous behaviour: new connection (and TLS handshake) per call
+                response = requests.post(
+                    stub.url,
+                    headers=openrouter.build_headers(),
+                    json=openrouter.build_payload(model, prompt),
+                    timeout=openrouter.REQUEST_TIMEOUT
+                )
+                return response.status_code == 200
+
+            def pooled_sync(_):
+                return openrouter.request_model(model, prompt) is not None
+
+            async def pooled_async():
+                semaphore = asyncio.Semaphore(concurrency)
+
+                async def one():
+                    async with semaphore:
+                        return await openrouter.arequest_model(model, prompt) is not None
+
+                try:
+                    return await asyncio.gather(*(one() for _ in range(total)))
+                finally:
+                    await openrouter.close_async_client()
+
+            self.report("requests.post per call", total, lambda: self.threaded(fresh_connection, total, concurrency))
+            self.report("pooled requests.Session", total, lambda: self.threaded(pooled_sync, total, concurrency))
+            self.report("pooled httpx.AsyncClient", total, lambda: asyncio.run(pooled_async()))
+
+    def threaded(self, func, total, concurrency):
+        with ThreadPoolExecutor(concurrency) as pool:
+            return list(pool.map(func, range(total)))
+
+    def report(self, label, total, run):
+        started = time.perf_counter()
+        ok = sum(run())
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f"{label:28} {total / elapsed:8.1f} req/s  ({ok}/{total} ok, {elapsed:.2f}s)")
@@ -0,0 +1,86 @@
+import importlib.util
+import time
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    Argon2PasswordHasher,
+    PBKDF2PasswordHasher,
+    ScryptPasswordHasher,
+    check_password,
+    get_hasher,
+    make_password,
+)
+from django.core.management.base import BaseCommand
+from django.test import RequestFactory
+
+from analyzer import throttling
+
+PASSWORD = "bench-password"
+
+
+def variant(base, **costs):
+    return type(base.__name__, (base,), costs)()
+
+
+class Command(BaseCommand):
+    help = "Logins/sec per core for each password hasher setting, plus the throttle's rejection cost."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--seconds", type=float, default=2.0, help="Time budget per hasher.")
+        parser.add_argument(
+            "--pbkdf2-iterations", type=int, nargs="*",
+            default=[1_000_000, 600_000, 260_000],
+        )
+
+    def handle(self, *args, **options):
+        hashers = [
+            (f"pbkdf2 {n:,} iterations", variant(PBKDF2PasswordHasher, iterations=n))
+            for n in options["pbkdf2_iterations"]
+        ]
+        hashers += [
+            ("scrypt n=2^14 r=8 p=5 (Django)", variant(ScryptPasswordHasher)),
+            ("scrypt n=2^14 r=8 p=1", variant(ScryptPasswordHasher, parallelism=1)),
+        ]
+        if importlib.util.find_spec("argon2"):
+            hashers += [
+                ("argon2 t=2 m=100MiB p=8 (Django)", variant(Argon2PasswordHasher)),
+                ("argon2 t=2 m=19MiB p=1", variant(Argon2PasswordHasher, memory_cost=19456, parallelism=1)),
+            ]
+        else:
+            self.stdout.write("argon2-cffi not installed: skipping argon2")
+
+        preferred = get_hasher()
+        self.stdout.write(f"Configured: {settings.PASSWORD_HASHER} → {preferred.algorithm}\n")
+
+        for label, hasher in hashers:
+            encoded = hasher.encode(PASSWORD, hasher.salt())
+            count = 0
+            started = time.perf_counter()
+            while time.perf_counter() - started < options["seconds"] or count < 3:
+                hasher.verify(PASSWORD, encoded)
+                count += 1
+            elapsed = time.perf_counter() - started
+            self.stdout.write(f"{label:34} {count / elapsed:8.1f} logins/s/core  ({elapsed / count * 1000:7.1f} ms)")
+
+        self.throttle_cost()
+        self.rehash_demo()
+
+    def throttle_cost(self):
+        request = RequestFactory().post("/login/", REMOTE_ADDR="203.0.113.7")
+        rejected = 0
+        started = time.perf_counter()
+        for _ in range(5000):
+            rejected += bool(throttling.check_login(request, "flood@example.com"))
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f"\n{'throttle check (flood)':34} {5000 / elapsed:8.1f} checks/s      "
+            f"({rejected}/5000 rejected before hashing)"
+        )
+
+    def rehash_demo(self):
+        # A hash made at an old cost is upgraded on the next successful check
+        stale = make_password(PASSWORD, hasher=variant(PBKDF2PasswordHasher, iterations=100_000))
+        upgraded = []
+        check_password(PASSWORD, stale, setter=lambda raw: upgraded.append(make_password(raw)))
+        new = upgraded[0].split("$", 2)[:2] if upgraded else ["-"]
+        self.stdout.write(f"Rehash on login: {'$'.join(stale.split('$', 2)[:2])} → {'$'.join(new)}")
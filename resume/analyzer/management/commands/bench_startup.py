@@ -0,0 +1,109 @@
+import json
+import os
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from analyzer import benchmarks
+
+# Modules a login page should never need
+HEAVY_MODULES = ("PyPDF2", "docx", "requests", "httpx", "numpy")
+
+# Runs in a fresh interpreter: what a WSGI worker does before and during
+# its first request (resume/wsgi.py, URLconf + views import, GET /login/)
+WORKER_BOOT = """
+import io, json, logging, sys, time
+started = time.perf_counter()
+from resume.wsgi import application
+booted = time.perf_counter()
+from django.urls import get_resolver
+get_resolver().url_patterns
+routed = time.perf_counter()
+logging.disable(logging.CRITICAL)
+
+from wsgiref.util import setup_testing_defaults
+environ = {"PATH_INFO": "/login/", "REQUEST_METHOD": "GET", "wsgi.input": io.BytesIO()}
+setup_testing_defaults(environ)
+status = []
+body = b"".join(application(environ, lambda s, h, e=None: status.append(s)))
+finished = time.perf_counter()
+
+print(json.dumps({
+    "setup_ms": (booted - started) * 1000,
+    "urls_ms": (routed - booted) * 1000,
+    "first_request_ms": (finished - routed) * 1000,
+    "status": status[0],
+    "heavy": [name for name in %r if name in sys.modules],
+}))
+""" % (HEAVY_MODULES,)
+
+
+class Command(BaseCommand):
+    help = (
+        "Startup cost: wall time of `manage.py check` and of a cold WSGI worker "
+        "(interpreter + Django setup + URLconf + first GET /login/). Writes JSON "
+        "results and fails on regressions against a baseline, like `benchmark`."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--runs", type=int, default=5, help="Fresh processes per measurement.")
+        parser.add_argument("--output", help="Write results as JSON to this path.")
+        parser.add_argument("--baseline", help="Earlier --output to compare against.")
+        parser.add_argument("--tolerance", type=float, default=0.25)
+
+    def handle(self, *args, **options):
+        runs = options["runs"]
+        results = {}
+
+        check = [self.spawn([sys.executable, "manage.py", "check"])[0] for _ in range(runs)]
+        results["startup/manage_check"] = self.report("startup/manage_check", check)
+
+        boots = [self.spawn([sys.executable, "-c", WORKER_BOOT]) for _ in range(runs)]
+        worker = [wall for wall, _ in boots]
+        details = [json.loads(out.strip().splitlines()[-1]) for _, out in boots]
+        results["startup/worker_cold_start"] = self.report("startup/worker_cold_start", worker)
+        for field in ("setup_ms", "urls_ms", "first_request_ms"):
+            name = f"startup/worker_{field[:-3]}"
+            results[name] = self.report(name, [d[field] / 1000 for d in details])
+
+        if details[0]["status"] != "200 OK":
+            raise CommandError(f"GET /login/ returned {details[0]['status']}")
+        heavy = details[0]["heavy"]
+        self.stdout.write(f"Heavy modules loaded by a cold worker: {', '.join(heavy) or 'none'}")
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump({
+                    "meta": {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "runs": runs, "heavy_modules": heavy},
+                    "results": results,
+                }, f, indent=2)
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if options["baseline"]:
+            regressions = benchmarks.compare(
+                results, benchmarks.load_baseline(options["baseline"]), options["tolerance"]
+            )
+            if regressions:
+                for line in regressions:
+                    self.stderr.write(f"REGRESSION {line}")
+                raise CommandError(f"{len(regressions)} regression(s) against {options['baseline']}")
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {options['baseline']}"))
+
+    def spawn(self, command):
+        env = {**os.environ, "DJANGO_SETTINGS_MODULE": os.environ.get("DJANGO_SETTINGS_MODULE", "resume.settings")}
+        started = time.perf_counter()
+        process = subprocess.run(command, cwd=settings.BASE_DIR, env=env, capture_output=True, text=True)
+        elapsed = time.perf_counter() - started
+        if process.returncode != 0:
+            raise CommandError(f"{' '.join(command[:2])} failed:\n{process.stderr[-2000:]}")
+        return elapsed, process.stdout
+
+    def report(self, name, seconds):
+        result = benchmarks.summarize(seconds, sum(seconds))
+        self.stdout.write(
+            f"{name:32} p50 {result['p50_ms']:8.1f} ms  p95 {result['p95_ms']:8.1f} ms  ({result['n']} runs)"
+        )
+        return result
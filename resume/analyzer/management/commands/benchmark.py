@@ -0,0 +1,275 @@
+import io
+import json
+import logging
+import platform
+import random
+import tempfile
+import time
+import uuid
+
+import django
+import requests
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from analyzer import benchmarks, jobs, openrouter, parsing, prompting
+from analyzer.analysis import local_ats_analysis
+from analyzer.models import ResumeReport
+from analyzer.openrouter import safe_json_parse
+from analyzer.openrouter_stub import StubOpenRouter
+
+PASSWORD = "bench-password"
+
+AI_REPLY = json.dumps({
+    "ats_score": 78,
+    "keyword_match_percentage": 71,
+    "matched_keywords": ["python", "django", "sql"],
+    "missing_keywords": ["kubernetes"],
+    "improvement_suggestions": ["Mention cloud deployment experience."],
+})
+
+# safe_json_parse inputs, as models actually return them
+AI_REPLIES = {
+    "plain": AI_REPLY,
+    "fenced": f"```json\n{AI_REPLY}\n```",
+    "prose": f"Here is the analysis you asked for:\n\n{AI_REPLY}\n\nLet me know if you need more.",
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Microbenchmarks for the scorer, prompt building, JSON parsing and document extraction, plus "
+        "end-to-end load tests of analyze/, api/reports/ and login/ against a server "
+        "process on a throwaway test database and the OpenRouter stub. Writes JSON "
+        "results and fails on regressions against a baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--only", choices=["micro", "e2e"], help="Run one suite only.")
+        parser.add_argument("--quick", action="store_true", help="Short runs (CI smoke).")
+        parser.add_argument("--seconds", type=float, default=2.0, help="Time budget per microbenchmark.")
+        parser.add_argument("--requests", type=int, default=60, help="Requests per load test.")
+        parser.add_argument("--concurrency", type=int, default=4)
+        parser.add_argument("--ai-latency", type=float, default=0.2, help="Stub latency per AI call (s).")
+        parser.add_argument("--ai-failure-rate", type=float, default=0.2, help="Share of stub calls that 503.")
+        parser.add_argument("--seed", type=int, default=7)
+        parser.add_argument("--output", help="Write results as JSON to this path.")
+        parser.add_argument("--baseline", help="Earlier --output to compare against.")
+        parser.add_argument(
+            "--tolerance", type=float, default=0.25,
+            help="Allowed throughput drop / p95 rise vs the baseline (0.25 = 25%%).",
+        )
+
+    def handle(self, *args, **options):
+        if options["quick"]:
+            options["seconds"] = min(options["seconds"], 0.3)
+            options["requests"] = min(options["requests"], 12)
+
+        # Per-stage log lines would dominate the console and the timings
+        if options["verbosity"] < 2:
+            logging.getLogger("analyzer").setLevel(logging.WARNING)
+
+        corpus = benchmarks.build_corpus(options["seed"])
+        results = {}
+
+        if options["only"] in (None, "micro"):
+            results.update(self.micro(corpus, options))
+        if options["only"] in (None, "e2e"):
+            results.update(self.e2e(options))
+
+        output = {
+            "meta": {
+                "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "machine": platform.machine(),
+                "quick": options["quick"],
+                "ai_latency": options["ai_latency"],
+                "ai_failure_rate": options["ai_failure_rate"],
+                "concurrency": options["concurrency"],
+            },
+            "results": results,
+        }
+
+        if options["output"]:
+            with open(options["output"], "w") as f:
+                json.dump(output, f, indent=2)
+            self.stdout.write(f"\nResults written to {options['output']}")
+
+        if options["baseline"]:
+            regressions = benchmarks.compare(
+                results, benchmarks.load_baseline(options["baseline"]), options["tolerance"]
+            )
+            if regressions:
+                for line in regressions:
+                    self.stderr.write(f"REGRESSION {line}")
+                raise CommandError(f"{len(regressions)} regression(s) against {options['baseline']}")
+            self.stdout.write(self.style.SUCCESS(f"No regressions against {options['baseline']}"))
+
+    def report(self, name, result):
+        self.stdout.write(
+            f"{name:36} {result['ops_per_sec']:9.1f} ops/s  "
+            f"p50 {result['p50_ms'] or 0:8.2f} ms  p95 {result['p95_ms'] or 0:8.2f} ms  "
+            f"({result['n']} ok, {result['errors']} errors)"
+        )
+        return result
+
+    # =============================
+    # MICROBENCHMARKS
+    # =============================
+
+    def micro(self, corpus, options):
+        seconds = options["seconds"]
+        job_description = benchmarks.make_text(random.Random(options["seed"]), 150)
+        results = {}
+        self.stdout.write("Microbenchmarks")
+
+        for size, doc in corpus.items():
+            name = f"local_ats_analysis/{size}"
+            results[name] = self.report(name, benchmarks.run_micro(
+                lambda: local_ats_analysis(doc["text"], job_description), seconds
+            ))
+
+        model = next(iter(openrouter.OPENROUTER_MODELS))
+        for size, doc in corpus.items():
+            name = f"build_prompt/{size}"
+            results[name] = self.report(name, benchmarks.run_micro(
+                lambda: (prompting.prepare.cache_clear(), prompting.build_prompt(model, doc["text"], job_description)),
+                seconds
+            ))
+
+        for label, reply in AI_REPLIES.items():
+            name = f"safe_json_parse/{label}"
+            results[name] = self.report(name, benchmarks.run_micro(
+                lambda: safe_json_parse(reply), seconds
+            ))
+
+        parsing.get_pool()   # spawn workers outside the measurement
+        for kind, extractor in (("pdf", parsing.extract_text_from_pdf), ("docx", parsing.extract_text_from_docx)):
+            for size, doc in corpus.items():
+                name = f"extract_text_from_{kind}/{size}"
+                results[name] = self.report(name, benchmarks.run_micro(
+                    lambda: extractor(io.BytesIO(doc[kind])), seconds
+                ))
+
+        return results
+
+    # =============================
+    # END-TO-END LOAD TESTS
+    # =============================
+
+    def e2e(self, options):
+        total = options["requests"]
+        concurrency = options["concurrency"]
+        rng = random.Random(options["seed"])
+        results = {}
+
+        stub = StubOpenRouter(
+            latency=options["ai_latency"], jitter=options["ai_latency"] / 4,
+            failure_rate=options["ai_failure_rate"],
+        )
+        username = f"bench-{uuid.uuid4().hex[:10]}"
+        with stub, benchmarks.test_database() as database, tempfile.TemporaryDirectory() as extraction_cache:
+            user = User.objects.create_user(username, f"{username}@example.com", PASSWORD)
+
+            # The load would trip the login throttle. Every analyze request gets
+            # its own resume + JD and the server gets empty caches, so neither
+            # the extraction nor the result cache answers it. Jobs run in the
+            # server's own threads.
+            env = {
+                **benchmarks.database_env(database),
+                "OPENROUTER_URL": stub.url,
+                "OPENROUTER_API_KEY": "stub-key",
+                "LOGIN_RATE_LIMIT": "0",
+                "LOGIN_IP_RATE_LIMIT": "0",
+                "ANALYSIS_LOCAL_WORKERS": str(max(jobs.LOCAL_WORKERS, 1)),
+                "CACHE_KEY_PREFIX": username,
+                "EXTRACTION_CACHE_DIR": extraction_cache,
+            }
+            with benchmarks.ServerProcess(env) as server:
+                self.stdout.write(
+                    f"\nLoad tests against {server.url} "
+                    f"(AI stub {options['ai_latency'] * 1000:.0f} ms, {options['ai_failure_rate']:.0%} failures)"
+                )
+
+                results["e2e/login"] = self.report("e2e/login", benchmarks.run_load(
+                    lambda i: self.login(server, username) is not None, total, concurrency
+                ))
+
+                sessions = [self.login(server, username) for _ in range(concurrency)]
+                if None in sessions:
+                    raise CommandError("Benchmark user could not log in")
+
+                documents = [
+                    (f"resume-{i}.pdf", benchmarks.make_pdf([benchmarks.make_text(rng, benchmarks.WORDS_PER_PAGE)]),
+                     f"{benchmarks.make_text(rng, 150)} {username}")
+                    for i in range(2 * total)
+                ]
+                results["e2e/analyze"] = self.report("e2e/analyze", benchmarks.run_load(
+                    lambda i: self.analyze(server, sessions[i % concurrency], *documents[i]), total, concurrency
+                ))
+                results["e2e/analyze_completed"] = self.report("e2e/analyze_completed", benchmarks.run_load(
+                    lambda i: self.analyze(server, sessions[i % concurrency], *documents[total + i], wait=True),
+                    total, concurrency
+                ))
+
+                results["e2e/reports_api"] = self.report("e2e/reports_api", benchmarks.run_load(
+                    lambda i: sessions[i % concurrency].get(f"{server.url}/api/reports/").status_code == 200,
+                    total * 5, concurrency
+                ))
+                etag = sessions[0].get(f"{server.url}/api/reports/").headers.get("ETag")
+                results["e2e/reports_api_304"] = self.report("e2e/reports_api_304", benchmarks.run_load(
+                    lambda i: sessions[i % concurrency].get(
+                        f"{server.url}/api/reports/", headers={"If-None-Match": etag}
+                    ).status_code == 304,
+                    total * 5, concurrency
+                ))
+
+                self.wait_for_jobs(user)
+                self.stdout.write(f"AI stub calls: {dict(sorted(stub.calls.items()))}")
+
+        return results
+
+    def login(self, server, username):
+        session = requests.Session()
+        session.get(f"{server.url}/login/")
+        response = session.post(
+            f"{server.url}/login/",
+            data={"username": username, "password": PASSWORD},
+            headers={"X-CSRFToken": session.cookies.get("csrftoken", "")},
+            allow_redirects=False,
+        )
+        if response.status_code == 302 and "/dashboard/" in response.headers.get("Location", ""):
+            return session
+        return None
+
+    def analyze(self, server, session, name, data, job_description, wait=False):
+        response = session.post(
+            f"{server.url}/analyze/",
+            files={"resume": (name, data, "application/pdf")},
+            data={"job_description": job_description},
+            headers={"X-CSRFToken": session.cookies.get("csrftoken", "")},
+            allow_redirects=False,
+        )
+        location = response.headers.get("Location", "").rstrip("/")
+        if response.status_code != 302 or not location.split("/")[-1].isdigit():
+            return False
+        if not wait:
+            return True
+
+        # Time to a finished report: poll the status endpoint like the result page does
+        report_id = location.split("/")[-1]
+        deadline = time.monotonic() + 60
+        while time.monotonic() < deadline:
+            status = session.get(f"{server.url}/api/reports/{report_id}/status/").json()["status"]
+            if status != "Pending":
+                return status == "Completed"
+            time.sleep(0.02)
+        return False
+
+    def wait_for_jobs(self, user, timeout=60):
+        deadline = time.monotonic() + timeout
+        while ResumeReport.objects.filter(user=user, analysis_status="Pending").exists():
+            if time.monotonic() > deadline:
+                break
+            time.sleep(0.1)
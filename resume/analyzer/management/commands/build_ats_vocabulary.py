@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from analyzer import scoring
+from analyzer.models import AnalysisJob
+
+
+class Command(BaseCommand):
+    help = "Rebuild the local ATS scorer's vocabulary / IDF table from stored analyses."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--output", default=None, help="Defaults to ATS_VOCABULARY_PATH.")
+        parser.add_argument("--limit", type=int, default=20000, help="Most recent analyses to read.")
+
+    def handle(self, *args, **options):
+        rows = (
+            AnalysisJob.objects
+            .order_by("-created_at")
+            .values_list("resume_text", "job_description")[:options["limit"]]
+        )
+
+        def documents():
+            for resume_text, job_description in rows.iterator(chunk_size=500):
+                yield resume_text
+                if job_description:
+                    yield job_description
+
+        vocabulary = scoring.Vocabulary.build(documents())
+        vocabulary.save(options["output"])
+
+        self.stdout.write(self.style.SUCCESS(
+            f"Vocabulary built from {vocabulary.doc_count} documents "
+            f"({len(vocabulary.df)} terms) → {options['output'] or scoring.VOCABULARY_PATH}"
+        ))
@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from analyzer.openrouter_stub import StubOpenRouter
+
+
+class Command(BaseCommand):
+    help = "Run a local OpenRouter stand-in for development, tests and benchmarks."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--host", default="127.0.0.1")
+        parser.add_argument("--port", type=int, default=8765)
+        parser.add_argument("--latency", type=float, default=0.5, help="Seconds per completion.")
+        parser.add_argument("--jitter", type=float, default=0.0)
+        parser.add_argument("--failure-rate", type=float, default=0.0, help="Share of requests answered with 503.")
+        parser.add_argument("--score", type=int, default=78)
+
+    def handle(self, *args, **options):
+        stub = StubOpenRouter(
+            host=options["host"],
+            port=options["port"],
+            latency=options["latency"],
+            jitter=options["jitter"],
+            failure_rate=options["failure_rate"],
+            score=options["score"],
+            verbose=True,
+        )
+
+        self.stdout.write(f"Stub OpenRouter listening on {stub.url}")
+        self.stdout.write("Point the app at it with OPENROUTER_URL and any OPENROUTER_API_KEY.")
+
+        try:
+            stub.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            stub.stop()
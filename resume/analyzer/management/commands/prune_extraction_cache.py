@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from analyzer import extraction_cache
+
+
+class Command(BaseCommand):
+    help = "Trim the on-disk resume text extraction cache."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--max-bytes",
+            type=int,
+            default=None,
+            help="Size to trim down to (defaults to EXTRACTION_CACHE_MAX_BYTES)."
+        )
+        parser.add_argument("--clear", action="store_true", help="Remove every cached blob.")
+        parser.add_argument("--stats", action="store_true", help="Only print the cache size.")
+
+    def handle(self, *args, **options):
+        if not options["stats"]:
+            if options["clear"]:
+                removed = extraction_cache.clear()
+            else:
+                removed = extraction_cache.prune(options["max_bytes"])
+            self.stdout.write(self.style.SUCCESS(f"Removed {removed} cached extraction(s)."))
+
+        # Disk figures only: hit / miss counts live in each serving process
+        # (analyzer_cache_events_total on /metrics), not in this one
+        usage = extraction_cache.usage()
+        self.stdout.write(f"Cache dir: {extraction_cache.CACHE_DIR}")
+        self.stdout.write(f"Entries: {usage['entries']}")
+        self.stdout.write(f"Size: {usage['bytes']} / {usage['max_bytes']} bytes")
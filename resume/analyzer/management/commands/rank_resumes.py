@@ -0,0 +1,50 @@
+import json
+from pathlib import Path
+
+from django.contrib.auth.models import User
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+
+from analyzer.ranking import RankingError, iter_documents, rank_resumes
+
+
+class Command(BaseCommand):
+    help = "Rank PDF/DOCX resumes (or zip archives of them) against one job description."
+
+    def add_arguments(self, parser):
+        parser.add_argument("paths", nargs="+", help="Resume files, zip archives or directories.")
+        parser.add_argument("--jd", required=True, help="Path to a text file with the job description.")
+        parser.add_argument("--user", required=True, help="Username or email that owns the saved reports.")
+        parser.add_argument("--json", action="store_true", help="Print the full ranking as JSON.")
+
+    def handle(self, *args, **options):
+        user = User.objects.filter(username=options["user"]).first() \
+            or User.objects.filter(email=options["user"]).first()
+        if not user:
+            raise CommandError(f"User not found: {options['user']}")
+
+        job_description = Path(options["jd"]).read_text()
+
+        paths = []
+        for raw in options["paths"]:
+            path = Path(raw)
+            paths.extend(sorted(p for p in path.iterdir() if p.is_file()) if path.is_dir() else [path])
+
+        handles = [path.open("rb") for path in paths]
+        try:
+            documents = iter_documents((path.name, File(f)) for path, f in zip(paths, handles))
+            ranking = rank_resumes(user, job_description, documents)
+        except RankingError as e:
+            raise CommandError(str(e))
+        finally:
+            for f in handles:
+                f.close()
+
+        if options["json"]:
+            self.stdout.write(json.dumps(ranking, indent=2))
+            return
+
+        for row in ranking["ranked"]:
+            self.stdout.write(f"{row['rank']:>4}. {row['ats_score']:>3}%  {row['name']}")
+        for row in ranking["failed"]:
+            self.stdout.write(self.style.WARNING(f"   ✗ {row['name']}: {row['error']}"))
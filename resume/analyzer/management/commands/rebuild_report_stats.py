@@ -0,0 +1,27 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from analyzer import stats
+
+
+class Command(BaseCommand):
+    help = "Recompute the materialized per-user report statistics from ResumeReport."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--user", action="append", default=[], help="Username or email (repeatable).")
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options["user"]:
+            user_ids = []
+            for identifier in options["user"]:
+                user = (
+                    User.objects.filter(username=identifier).first()
+                    or User.objects.filter(email=identifier).first()
+                )
+                if not user:
+                    raise CommandError(f"No user matches {identifier!r}.")
+                user_ids.append(user.id)
+
+        rebuilt = stats.rebuild(user_ids)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt report stats for {rebuilt} user(s)."))
@@ -0,0 +1,58 @@
+import signal
+import threading
+
+from django.core.management.base import BaseCommand
+
+from analyzer.jobs import requeue_stale, sweep_loop, worker_loop
+
+
+class Command(BaseCommand):
+    help = "Process queued resume analysis jobs."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=4)
+        parser.add_argument("--poll-interval", type=float, default=1.0)
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain the queue and exit instead of polling forever."
+        )
+
+    def handle(self, *args, **options):
+        stop_event = threading.Event()
+
+        def shutdown(signum, frame):
+            self.stdout.write("Stopping worker after current jobs...")
+            stop_event.set()
+
+        signal.signal(signal.SIGINT, shutdown)
+        signal.signal(signal.SIGTERM, shutdown)
+
+        requeued = requeue_stale()
+        if requeued:
+            self.stdout.write(f"Requeued {requeued} stale job(s).")
+
+        threads = [
+            threading.Thread(
+                target=worker_loop,
+                args=(stop_event, options["poll_interval"], options["once"]),
+                name=f"analysis-worker-{i}",
+            )
+            for i in range(max(options["threads"], 1))
+        ]
+
+        # Jobs of workers that die while this one runs are requeued too
+        sweeper = threading.Thread(
+            target=sweep_loop, args=(stop_event,), kwargs={"submit": False},
+            name="analysis-sweep", daemon=True,
+        )
+
+        self.stdout.write(f"Analysis worker started with {len(threads)} thread(s).")
+
+        for t in threads:
+            t.start()
+        sweeper.start()
+        for t in threads:
+            t.join()
+
+        self.stdout.write(self.style.SUCCESS("Analysis worker stopped."))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0005_analysiscacheentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='analysisjob',
+            name='extraction',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
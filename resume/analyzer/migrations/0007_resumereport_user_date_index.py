@@ -0,0 +1,19 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:07
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0006_analysisjob_extraction'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='resumereport',
+            index=models.Index(fields=['user', '-analyzed_date', '-id'], name='report_user_date_idx'),
+        ),
+    ]
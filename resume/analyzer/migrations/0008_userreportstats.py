@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:07
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, Max, Q, Sum
+
+
+def backfill_stats(apps, schema_editor):
+    ResumeReport = apps.get_model('analyzer', 'ResumeReport')
+    UserReportStats = apps.get_model('analyzer', 'UserReportStats')
+
+    completed = Q(analysis_status='Completed')
+    rows = ResumeReport.objects.values('user_id').annotate(
+        total=Count('id'),
+        completed=Count('id', filter=completed),
+        score_sum=Sum('score', filter=completed),
+        best=Max('score', filter=completed),
+        excellent=Count('id', filter=completed & Q(score__gte=85)),
+        good=Count('id', filter=completed & Q(score__gte=70, score__lt=85)),
+        average=Count('id', filter=completed & Q(score__gte=50, score__lt=70)),
+        poor=Count('id', filter=completed & Q(score__lt=50)),
+    )
+    UserReportStats.objects.bulk_create([
+        UserReportStats(
+            user_id=row['user_id'],
+            total=row['total'],
+            completed=row['completed'],
+            score_sum=row['score_sum'] or 0,
+            best=row['best'] or 0,
+            excellent=row['excellent'],
+            good=row['good'],
+            average=row['average'],
+            poor=row['poor'],
+        )
+        for row in rows
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0007_resumereport_user_date_index'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserReportStats',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='report_stats', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('completed', models.PositiveIntegerField(default=0)),
+                ('score_sum', models.BigIntegerField(default=0)),
+                ('best', models.IntegerField(default=0)),
+                ('excellent', models.PositiveIntegerField(default=0)),
+                ('good', models.PositiveIntegerField(default=0)),
+                ('average', models.PositiveIntegerField(default=0)),
+                ('poor', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(backfill_stats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0008_userreportstats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='userreportstats',
+            name='version',
+            field=models.PositiveIntegerField(default=0),
+        ),
+    ]
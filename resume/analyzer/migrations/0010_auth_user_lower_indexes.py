@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Case-insensitive username / email lookups at login (analyzer.backends.find_user)
+
+    dependencies = [
+        ('analyzer', '0009_userreportstats_version'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            'CREATE INDEX auth_user_username_lower_idx ON auth_user (LOWER("username"));',
+            'DROP INDEX auth_user_username_lower_idx;',
+        ),
+        migrations.RunSQL(
+            'CREATE INDEX auth_user_email_lower_idx ON auth_user (LOWER("email"));',
+            'DROP INDEX auth_user_email_lower_idx;',
+        ),
+    ]
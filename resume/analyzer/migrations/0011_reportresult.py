@@ -0,0 +1,62 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:23
+
+import json
+import zlib
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+# Same encoding as analyzer.report_results.pack at the time of writing
+COMPRESS_MIN_BYTES = 512
+BATCH_SIZE = 500
+
+
+def move_job_results(apps, schema_editor):
+    AnalysisJob = apps.get_model('analyzer', 'AnalysisJob')
+    ReportResult = apps.get_model('analyzer', 'ReportResult')
+
+    jobs = AnalysisJob.objects.filter(status='Completed', result__isnull=False)
+    rows = []
+    for report_id, result in jobs.values_list('report_id', 'result').iterator(chunk_size=BATCH_SIZE):
+        raw = json.dumps(result, separators=(',', ':')).encode('utf-8')
+        compressed = len(raw) >= COMPRESS_MIN_BYTES
+        rows.append(ReportResult(
+            report_id=report_id,
+            data=zlib.compress(raw, 6) if compressed else raw,
+            compressed=compressed,
+            size=len(raw),
+        ))
+    ReportResult.objects.bulk_create(rows, batch_size=BATCH_SIZE)
+    jobs.update(result=None)
+
+
+def restore_job_results(apps, schema_editor):
+    AnalysisJob = apps.get_model('analyzer', 'AnalysisJob')
+    ReportResult = apps.get_model('analyzer', 'ReportResult')
+
+    for row in ReportResult.objects.iterator(chunk_size=BATCH_SIZE):
+        raw = bytes(row.data)
+        result = json.loads(zlib.decompress(raw) if row.compressed else raw)
+        AnalysisJob.objects.filter(report_id=row.report_id).update(result=result)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0010_auth_user_lower_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReportResult',
+            fields=[
+                ('report', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='stored_result', serialize=False, to='analyzer.resumereport')),
+                ('data', models.BinaryField()),
+                ('compressed', models.BooleanField(default=False)),
+                ('size', models.PositiveIntegerField(default=0)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.RunPython(move_job_results, restore_job_results),
+    ]
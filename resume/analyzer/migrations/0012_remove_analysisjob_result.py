@@ -0,0 +1,17 @@
+# Generated by Django 5.2.18 on 2026-10-18 04:59
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('analyzer', '0011_reportresult'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='analysisjob',
+            name='result',
+        ),
+    ]
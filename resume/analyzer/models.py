@@ -22,6 +22,15 @@ class ResumeReport(models.Model):
 
     analyzed_date = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of a user's history: (user, analyzed_date, id)
+            models.Index(
+                fields=["user", "-analyzed_date", "-id"],
+                name="report_user_date_idx"
+            ),
+        ]
+
     def ats_rating(self):
         if self.analysis_status != "Completed":
             return "Pending"
@@ -37,6 +46,115 @@ class ResumeReport(models.Model):
         return f"{self.name} | {self.analysis_status} | {self.score}%"
 
 
+class ReportResult(models.Model):
+    # Full analysis result, kept out of resume_report so history listings
+    # never read it. JSON, zlib-compressed above a size threshold
+    # (see analyzer/report_results.py).
+    report = models.OneToOneField(
+        ResumeReport,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="stored_result"
+    )
+
+    data = models.BinaryField()
+    compressed = models.BooleanField(default=False)
+    # Uncompressed JSON size in bytes
+    size = models.PositiveIntegerField(default=0)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"Result for report #{self.report_id} | {self.size} bytes"
+
+
+class UserReportStats(models.Model):
+    # Running totals kept in step with ResumeReport writes (see analyzer/stats.py)
+    user = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="report_stats"
+    )
+
+    total = models.PositiveIntegerField(default=0)
+    completed = models.PositiveIntegerField(default=0)
+    score_sum = models.BigIntegerField(default=0)
+    best = models.IntegerField(default=0)
+
+    # Same buckets as ResumeReport.ats_rating()
+    excellent = models.PositiveIntegerField(default=0)
+    good = models.PositiveIntegerField(default=0)
+    average = models.PositiveIntegerField(default=0)
+    poor = models.PositiveIntegerField(default=0)
+
+    # Bumped on every change to the user's report list; drives API ETags
+    version = models.PositiveIntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def average_score(self):
+        return round(self.score_sum / self.completed, 1) if self.completed else 0
+
+    def __str__(self):
+        return f"{self.user.username} | {self.total} reports | avg {self.average_score()}%"
+
+
+class AnalysisJob(models.Model):
+    STATUS_CHOICES = [
+        ("Pending", "Pending"),
+        ("Running", "Running"),
+        ("Completed", "Completed"),
+        ("Failed", "Failed"),
+    ]
+
+    report = models.OneToOneField(
+        ResumeReport,
+        on_delete=models.CASCADE,
+        related_name="job"
+    )
+
+    resume_text = models.TextField()
+    job_description = models.TextField()
+    # {"pages": int, "truncated": bool} from the extraction step
+    extraction = models.JSONField(default=dict, blank=True)
+
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default="Pending"
+    )
+    attempts = models.PositiveSmallIntegerField(default=0)
+
+    error = models.TextField(blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=["status", "created_at"]),
+        ]
+
+    def __str__(self):
+        return f"Job #{self.pk} | {self.report.name} | {self.status}"
+
+
+class AnalysisCacheEntry(models.Model):
+    # sha256 of normalized resume text + job description + model name
+    key = models.CharField(max_length=64, primary_key=True)
+    model = models.CharField(max_length=100)
+    result = models.JSONField()
+
+    hits = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return f"{self.model} | {self.key[:12]} | {self.hits} hits"
+
+
 class PasswordResetRequest(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     requested_at = models.DateTimeField(auto_now_add=True)
@@ -0,0 +1,371 @@
+import asyncio
+import json
+import logging
+import threading
+import time
+import weakref
+from collections import deque
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from . import circuit, instrumentation
+
+
+# =============================
+# OPENROUTER CONFIG
+# =============================
+
+# Read once from settings; requests / httpx are only imported on first use
+OPENROUTER_API_KEY = getattr(settings, "OPENROUTER_API_KEY", None)
+OPENROUTER_URL = getattr(settings, "OPENROUTER_URL", "https://openrouter.ai/api/v1/chat/completions")
+
+# Model → prompt budget in approximate tokens (analyzer/prompting.py).
+# Iteration order is the fallback order.
+OPENROUTER_MODELS = getattr(settings, "OPENROUTER_MODELS", {
+    "openai/gpt-4o-mini": 6000,
+    "mistralai/mistral-7b-instruct": 3000,
+})
+
+REQUEST_TIMEOUT = 25
+
+# Per-model timeout = p99 latency × multiplier, clamped to [MIN, MAX]
+TIMEOUT_MIN = getattr(settings, "OPENROUTER_TIMEOUT_MIN", 5)
+TIMEOUT_MAX = getattr(settings, "OPENROUTER_TIMEOUT_MAX", REQUEST_TIMEOUT)
+TIMEOUT_MULTIPLIER = 2.0
+
+# Connection pool shared by every request in this process
+MAX_CONNECTIONS = getattr(settings, "OPENROUTER_MAX_CONNECTIONS", 20)
+MAX_KEEPALIVE = getattr(settings, "OPENROUTER_MAX_KEEPALIVE", 10)
+KEEPALIVE_EXPIRY = getattr(settings, "OPENROUTER_KEEPALIVE_EXPIRY", 30)
+HTTP2 = getattr(settings, "OPENROUTER_HTTP2", True)
+
+
+# =============================
+# REQUEST BUILDING
+# =============================
+
+def build_headers():
+    return {
+        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
+        "Content-Type": "application/json",
+        "Referer": "http://localhost:8000",   # ✅ REQUIRED
+        "X-Title": "AI Resume Analyzer"
+    }
+
+
+def build_prompt(resume_text, job_description):
+    return f"""
+Return ONLY valid JSON.
+
+{{
+  "ats_score": 0-100,
+  "keyword_match_percentage": 0-100,
+  "matched_keywords": [],
+  "missing_keywords": [],
+  "improvement_suggestions": []
+}}
+
+RESUME:
+{resume_text}
+
+JOB DESCRIPTION:
+{job_description}
+"""
+
+
+def build_payload(model, prompt):
+    return {
+        "model": model,
+        "messages": [
+            {"role": "system", "content": "Return valid JSON only"},
+            {"role": "user", "content": prompt}
+        ],
+        "temperature": 0.1
+    }
+
+
+# =============================
+# RESPONSE PARSING
+# =============================
+
+def safe_json_parse(text):
+    try:
+        text = text.replace("```json", "").replace("```", "").strip()
+        start = text.find("{")
+        end = text.rfind("}") + 1
+        if start == -1 or end == -1:
+            return None
+        return json.loads(text[start:end])
+    except Exception:
+        return None
+
+
+def accept_result(content):
+    result = safe_json_parse(content)
+
+    if (
+        result
+        and isinstance(result.get("ats_score"), (int, float))
+        and result["ats_score"] > 0
+        ):
+        result["evaluation_mode"] = "ai"
+        result["analysis_status"] = "Completed"
+        result["explanation"] = "ATS score calculated using AI-based resume analysis."
+        return result
+
+    return None
+
+
+def _completion_content(status_code, body, text):
+    if status_code != 200:
+        instrumentation.event("openrouter_error", logging.WARNING, status=status_code, body=text[:500])
+        return None
+    return body()["choices"][0]["message"]["content"]
+
+
+# =============================
+# OBSERVED LATENCY
+# =============================
+
+LATENCY_WINDOW = 200
+
+_latencies = {}
+_latency_lock = threading.Lock()
+
+
+def record_latency(model, seconds):
+    with _latency_lock:
+        _latencies.setdefault(model, deque(maxlen=LATENCY_WINDOW)).append(seconds)
+
+
+def latency_percentile(model, q, min_samples=20):
+    with _latency_lock:
+        samples = sorted(_latencies.get(model, ()))
+    if len(samples) < min_samples:
+        return None
+    index = min(len(samples) - 1, int(round(q * (len(samples) - 1))))
+    return samples[index]
+
+
+def adaptive_timeout(model):
+    p99 = latency_percentile(model, 0.99)
+    if p99 is None:
+        return TIMEOUT_MAX
+    return min(TIMEOUT_MAX, max(TIMEOUT_MIN, p99 * TIMEOUT_MULTIPLIER))
+
+
+def _circuit_open(model):
+    if circuit.allow(model):
+        return False
+    instrumentation.event("circuit_open_skip", model=model)
+    return True
+
+
+def _record_outcome(model, status_code, started):
+    if status_code == 200:
+        record_latency(model, time.monotonic() - started)
+        circuit.record_success(model)
+    else:
+        circuit.record_failure(model)
+
+
+# =============================
+# SYNC CLIENT (POOLED SESSION)
+# =============================
+
+_local = threading.local()
+
+
+def get_session():
+    session = getattr(_local, "session", None)
+    if session is None:
+        import requests
+        from requests.adapters import HTTPAdapter
+
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=MAX_KEEPALIVE)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        _local.session = session
+    return session
+
+
+def _finish(stage, status_code, size, body, text):
+    stage.set(status=status_code, bytes=size)
+    content = _completion_content(status_code, body, text)
+    if content is None:
+        stage.set(outcome="http_error")
+        return None
+    result = accept_result(content)
+    stage.set(outcome="accepted" if result else "rejected")
+    return result
+
+
+def request_model(model, prompt):
+    with instrumentation.stage("ai_attempt", model=model) as stage:
+        if _circuit_open(model):
+            stage.set(outcome="circuit_open")
+            return None
+
+        started = time.monotonic()
+        try:
+            response = get_session().post(
+                OPENROUTER_URL,
+                headers=build_headers(),
+                json=build_payload(model, prompt),
+                timeout=adaptive_timeout(model)
+            )
+        except Exception:
+            circuit.record_failure(model)
+            raise
+        _record_outcome(model, response.status_code, started)
+
+        return _finish(stage, response.status_code, len(response.content), response.json, response.text)
+
+
+# =============================
+# STREAMING (stream: true)
+# =============================
+# OpenRouter answers with SSE: "data: {chunk}" lines carrying
+# choices[0].delta.content, ": OPENROUTER PROCESSING" keep-alive comments
+# and a final "data: [DONE]".
+
+def iter_stream_content(lines):
+    for line in lines:
+        if not line.startswith("data:"):
+            continue
+        data = line[5:].strip()
+        if data == "[DONE]":
+            return
+        try:
+            chunk = json.loads(data)
+        except ValueError:
+            continue
+        if "error" in chunk:
+            raise RuntimeError(f"OpenRouter stream error: {chunk['error']}")
+        choices = chunk.get("choices") or [{}]
+        content = (choices[0].get("delta") or {}).get("content")
+        if content:
+            yield content
+
+
+def stream_model(model, prompt):
+    # Yields ("delta", text) as tokens arrive, then ("result", accepted or None)
+    with instrumentation.stage("ai_attempt", model=model, op="stream") as stage:
+        if _circuit_open(model):
+            stage.set(outcome="circuit_open")
+            yield "result", None
+            return
+
+        started = time.monotonic()
+        try:
+            response = get_session().post(
+                OPENROUTER_URL,
+                headers=build_headers(),
+                json={**build_payload(model, prompt), "stream": True},
+                timeout=adaptive_timeout(model),
+                stream=True
+            )
+        except Exception:
+            circuit.record_failure(model)
+            raise
+
+        try:
+            if response.status_code != 200:
+                _record_outcome(model, response.status_code, started)
+                yield "result", _finish(stage, response.status_code, len(response.content), response.json, response.text)
+                return
+
+            parts = []
+            # chunk_size=None: hand over each HTTP chunk as soon as it arrives
+            lines = (line.decode("utf-8", "replace") for line in response.iter_lines(chunk_size=None))
+            try:
+                for content in iter_stream_content(lines):
+                    if not parts:
+                        stage.set(first_token_ms=round((time.monotonic() - started) * 1000))
+                    parts.append(content)
+                    yield "delta", content
+            except GeneratorExit:
+                # Browser went away mid-stream: not the model's fault
+                stage.set(outcome="cancelled")
+                raise
+            except Exception:
+                circuit.record_failure(model)
+                raise
+
+            _record_outcome(model, 200, started)
+            content = "".join(parts)
+            result = accept_result(content)
+            stage.set(status=200, bytes=len(content), outcome="accepted" if result else "rejected")
+            yield "result", result
+        finally:
+            response.close()
+
+
+# =============================
+# ASYNC CLIENT (ONE PER EVENT LOOP)
+# =============================
+
+_async_clients = weakref.WeakKeyDictionary()
+
+
+def _http2_available():
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        return False
+    return True
+
+
+def get_async_client():
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+
+    if client is None or client.is_closed:
+        import httpx
+
+        client = httpx.AsyncClient(
+            http2=HTTP2 and _http2_available(),
+            timeout=REQUEST_TIMEOUT,
+            limits=httpx.Limits(
+                max_connections=MAX_CONNECTIONS,
+                max_keepalive_connections=MAX_KEEPALIVE,
+                keepalive_expiry=KEEPALIVE_EXPIRY,
+            ),
+        )
+        _async_clients[loop] = client
+
+    return client
+
+
+async def close_async_client():
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def arequest_model(model, prompt):
+    with instrumentation.stage("ai_attempt", model=model) as stage:
+        if await sync_to_async(_circuit_open)(model):
+            stage.set(outcome="circuit_open")
+            return None
+
+        started = time.monotonic()
+        try:
+            response = await get_async_client().post(
+                OPENROUTER_URL,
+                headers=build_headers(),
+                json=build_payload(model, prompt),
+                timeout=adaptive_timeout(model),
+            )
+        except asyncio.CancelledError:
+            # Lost a race / hedge: not the model's fault
+            stage.set(outcome="cancelled")
+            raise
+        except Exception:
+            await sync_to_async(circuit.record_failure)(model)
+            raise
+        await sync_to_async(_record_outcome)(model, response.status_code, started)
+
+        return _finish(stage, response.status_code, len(response.content), response.json, response.text)
@@ -0,0 +1,147 @@
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+# =============================
+# LOCAL OPENROUTER STAND-IN
+# =============================
+# Speaks just enough of /api/v1/chat/completions (plain and stream: true)
+# for tests and benchmarks:
+# OPENROUTER_URL=http://127.0.0.1:<port>/api/v1/chat/completions
+
+STREAM_CHUNKS = 8
+
+
+class StubOpenRouterHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"   # keep-alive, like the real API
+    disable_nagle_algorithm = True
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length") or 0)
+        payload = json.loads(self.rfile.read(length) or b"{}")
+        stub = self.server.stub
+
+        model = payload.get("model", "")
+        stub.record(model)
+
+        latency = stub.latency_for(model)
+        streaming = bool(payload.get("stream"))
+        if latency and not streaming:
+            time.sleep(latency)
+
+        if random.random() < stub.failure_rate:
+            self._send(503, {"error": {"message": "stub: upstream unavailable"}})
+            return
+
+        content = json.dumps({
+            "ats_score": stub.score,
+            "keyword_match_percentage": stub.score,
+            "matched_keywords": ["python", "django"],
+            "missing_keywords": ["kubernetes"],
+            "improvement_suggestions": ["Mention cloud deployment experience."],
+        })
+        if streaming:
+            try:
+                self._stream(model, content, latency)
+            except (BrokenPipeError, ConnectionResetError):
+                # Client stopped reading mid-stream
+                self.close_connection = True
+            return
+
+        self._send(200, {
+            "id": "stub-completion",
+            "model": model,
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content}}],
+        })
+
+    def _stream(self, model, content, latency):
+        # stream: true → SSE over chunked encoding. First token after a
+        # quarter of the latency, the rest spread over the remainder.
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        self._chunk(": OPENROUTER PROCESSING\n\n")
+
+        step = -(-len(content) // STREAM_CHUNKS)
+        pieces = [content[i:i + step] for i in range(0, len(content), step)]
+        time.sleep(latency / 4)
+        for index, piece in enumerate(pieces):
+            if index:
+                time.sleep(latency * 3 / 4 / max(len(pieces) - 1, 1))
+            self._chunk("data: " + json.dumps({
+                "id": "stub-completion",
+                "model": model,
+                "choices": [{"index": 0, "delta": {"content": piece}}],
+            }) + "\n\n")
+        self._chunk("data: [DONE]\n\n")
+        self.wfile.write(b"0\r\n\r\n")
+
+    def _chunk(self, text):
+        data = text.encode("utf-8")
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(data), data))
+        self.wfile.flush()
+
+    def _send(self, status, body):
+        data = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format, *args):
+        if self.server.stub.verbose:
+            super().log_message(format, *args)
+
+
+class StubOpenRouter:
+    def __init__(self, host="127.0.0.1", port=0, latency=0.0, jitter=0.0,
+                 failure_rate=0.0, score=78, model_latency=None, verbose=False):
+        self.latency = latency
+        self.jitter = jitter
+        self.failure_rate = failure_rate
+        self.score = score
+        self.model_latency = model_latency or {}
+        self.verbose = verbose
+        self.calls = {}
+
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer((host, port), StubOpenRouterHandler)
+        self._server.daemon_threads = True
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/api/v1/chat/completions"
+
+    def latency_for(self, model):
+        base = self.model_latency.get(model, self.latency)
+        return max(0.0, base + random.uniform(-self.jitter, self.jitter))
+
+    def record(self, model):
+        with self._lock:
+            self.calls[model] = self.calls.get(model, 0) + 1
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,311 @@
+import asyncio
+import itertools
+import multiprocessing
+import os
+import signal
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from django.conf import settings
+
+from .extraction import (
+    MAX_CHARS,
+    MAX_PAGES,
+    START_METHOD,
+    TIME_BUDGET,
+    ExtractionError,
+    ExtractionTimeout,
+    collect_document,
+    extract_data,
+    extract_document,
+    iter_inline,
+    read_upload,
+)
+
+
+# =============================
+# POOL CONFIG
+# =============================
+
+# 0 disables the pool: each document gets its own short-lived subprocess.
+POOL_SIZE = getattr(settings, "PARSER_POOL_SIZE", min(4, os.cpu_count() or 1))
+
+# Recycle a worker after this many documents to cap parser memory growth.
+MAX_TASKS_PER_CHILD = getattr(settings, "PARSER_MAX_TASKS_PER_CHILD", 100)
+
+# Extra seconds past the soft budget before a stuck worker is killed.
+HARD_TIMEOUT_GRACE = getattr(settings, "PARSER_HARD_TIMEOUT_GRACE", 5)
+
+# How often the monitor looks for overdue or dead workers
+MONITOR_INTERVAL = 0.25
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class PoolClosed(Exception):
+    # The pool was shut down under this task; it is safe to resubmit
+    pass
+
+
+# =============================
+# WORKER SIDE
+# =============================
+
+_started = None
+
+
+def _init_worker(started):
+    global _started
+    _started = started
+    # Pay for the parser imports here, not on the first real document
+    import PyPDF2  # noqa: F401
+    import docx  # noqa: F401
+
+
+def _parse_in_worker(task_id, kind, data, max_pages, max_chars, budget):
+    # One small write (< PIPE_BUF) is atomic, so workers share the pipe
+    # without a lock that a killed worker could leave held
+    _started.send((task_id, os.getpid()))
+    deadline = time.monotonic() + budget if budget > 0 else None
+    return collect_document(kind, iter_inline(kind, data), max_pages, max_chars, deadline)
+
+
+# =============================
+# POOL
+# =============================
+# multiprocessing.Pool replaces a worker that dies and keeps running every
+# other task, where ProcessPoolExecutor marks itself broken and fails them
+# all. So a document past its hard timeout costs one worker, not the pool.
+#
+# Tasks are handed to the pool only when a worker is free, and each worker
+# reports (task id, pid) as it starts one. The monitor thread can then time
+# a document from its real start and kill exactly the process running it.
+
+class _Task:
+    __slots__ = ("id", "args", "future", "pid", "started", "lost", "finished")
+
+    def __init__(self, task_id, args):
+        self.id = task_id
+        self.args = args
+        self.future = Future()
+        self.pid = None
+        self.started = None
+        self.lost = None
+        self.finished = False
+
+
+class ParserPool:
+    def __init__(self, size, hard_timeout):
+        ctx = multiprocessing.get_context(START_METHOD)
+        self.size = size
+        self.hard_timeout = hard_timeout
+        # The writer stays open here: replacement workers inherit it too
+        self._reader, self._writer = ctx.Pipe(duplex=False)
+        self._pool = ctx.Pool(
+            size,
+            initializer=_init_worker,
+            initargs=(self._writer,),
+            maxtasksperchild=MAX_TASKS_PER_CHILD,
+        )
+
+        self._lock = threading.Lock()
+        self._ids = itertools.count()
+        self._waiting = []
+        self._running = {}
+        self._closed = False
+        self._monitor = threading.Thread(target=self._watch, name="parser-pool-monitor", daemon=True)
+        self._monitor.start()
+
+    def submit(self, kind, data):
+        task = _Task(next(self._ids), (kind, data, MAX_PAGES, MAX_CHARS, TIME_BUDGET))
+        with self._lock:
+            if self._closed:
+                task.future.set_exception(PoolClosed())
+                return task.future
+            self._waiting.append(task)
+            self._dispatch()
+        return task.future
+
+    def _dispatch(self):
+        # Caller holds the lock
+        while self._waiting and len(self._running) < self.size:
+            task = self._waiting.pop(0)
+            self._running[task.id] = task
+            self._pool.apply_async(
+                _parse_in_worker, (task.id,) + task.args,
+                callback=lambda result, task=task: self._finish(task, result=result),
+                error_callback=lambda error, task=task: self._finish(task, error=error),
+            )
+
+    def _finish(self, task, result=None, error=None, kill=False):
+        # Runs on the pool's result thread or the monitor; first call wins
+        with self._lock:
+            if task.finished:
+                return
+            task.finished = True
+            self._running.pop(task.id, None)
+            if kill and task.pid:
+                try:
+                    os.kill(task.pid, signal.SIGKILL)
+                except ProcessLookupError:
+                    pass
+            if not self._closed:
+                self._dispatch()
+
+        if error is not None:
+            if not isinstance(error, (ExtractionError, PoolClosed)):
+                error = ExtractionError(f"{type(error).__name__}: {error}")
+            task.future.set_exception(error)
+        else:
+            task.future.set_result(result)
+
+    def _watch(self):
+        while not self._closed:
+            try:
+                ready = self._reader.poll(MONITOR_INTERVAL)
+                while ready:
+                    self._started(*self._reader.recv())
+                    ready = self._reader.poll(0)
+            except (EOFError, OSError):
+                return
+            self._check()
+
+    def _started(self, task_id, pid):
+        with self._lock:
+            task = self._running.get(task_id)
+            if task is not None:
+                task.pid = pid
+                task.started = time.monotonic()
+
+    def _check(self):
+        now = time.monotonic()
+        alive = {proc.pid for proc in list(self._pool._pool) if proc.is_alive()}
+        with self._lock:
+            running = [task for task in self._running.values() if task.pid]
+
+        for task in running:
+            if self.hard_timeout and now - task.started > self.hard_timeout:
+                self._finish(task, error=ExtractionTimeout(f"Extraction exceeded {self.hard_timeout}s"), kill=True)
+            elif task.pid not in alive:
+                # A worker recycled by maxtasksperchild exits right after
+                # sending its result; give the result thread time to land it
+                if task.lost is None:
+                    task.lost = now
+                elif now - task.lost > 4 * MONITOR_INTERVAL:
+                    self._finish(task, error=ExtractionError("Parser process exited unexpectedly"))
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+            pending = self._waiting + list(self._running.values())
+            self._waiting = []
+        for task in pending:
+            self._finish(task, error=PoolClosed())
+        self._pool.terminate()
+        self._reader.close()
+        self._writer.close()
+
+
+def _hard_timeout():
+    return TIME_BUDGET + HARD_TIMEOUT_GRACE if TIME_BUDGET > 0 else None
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ParserPool(POOL_SIZE, _hard_timeout())
+        return _pool
+
+
+def shutdown():
+    global _pool
+    with _pool_lock:
+        pool, _pool = _pool, None
+    if pool is not None:
+        pool.close()
+
+
+# =============================
+# PUBLIC API
+# =============================
+
+def _result(future):
+    try:
+        return future.result()
+    except ExtractionError as e:
+        return e
+
+
+def parse_document(kind, file):
+    if POOL_SIZE <= 0:
+        return extract_document(kind, file)
+
+    data = read_upload(file)
+    try:
+        return get_pool().submit(kind, data).result()
+    except PoolClosed:
+        # Torn down under us (shutdown); the document itself is fine
+        return get_pool().submit(kind, data).result()
+
+
+async def aparse_document(kind, file):
+    if POOL_SIZE <= 0:
+        return await asyncio.to_thread(extract_document, kind, file)
+
+    data = read_upload(file)
+    try:
+        return await asyncio.wrap_future(get_pool().submit(kind, data))
+    except PoolClosed:
+        return await asyncio.wrap_future(get_pool().submit(kind, data))
+
+
+def parse_stream(documents, window=None):
+    # documents: iterable of (key, kind, data), read lazily → yields
+    # (key, extraction dict or ExtractionError) in the same order. At most
+    # `window` documents are submitted and unresolved at once, so a large
+    # batch never sits in memory (or in the pool's queue) all together.
+    threads = ThreadPoolExecutor(max_workers=4) if POOL_SIZE <= 0 else None
+    window = window or (4 if threads else POOL_SIZE) * 2
+
+    def submit(kind, data):
+        if threads:
+            return threads.submit(extract_data, kind, data)
+        return get_pool().submit(kind, data)
+
+    def resolve(key, kind, data, future):
+        try:
+            return key, _result(future)
+        except PoolClosed:
+            return key, _result(get_pool().submit(kind, data))
+
+    in_flight = deque()
+    try:
+        for key, kind, data in documents:
+            in_flight.append((key, kind, data, submit(kind, data)))
+            if len(in_flight) >= window:
+                yield resolve(*in_flight.popleft())
+        while in_flight:
+            yield resolve(*in_flight.popleft())
+    finally:
+        if threads:
+            threads.shutdown(cancel_futures=True)
+
+
+def parse_many(documents):
+    # documents: [(kind, bytes)] → [extraction dict or ExtractionError], same order
+    return [
+        extraction
+        for _, extraction in parse_stream((None, kind, data) for kind, data in documents)
+    ]
+
+
+def extract_text_from_pdf(file):
+    return parse_document("pdf", file)
+
+
+def extract_text_from_docx(file):
+    return parse_document("docx", file)
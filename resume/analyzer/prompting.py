@@ -0,0 +1,231 @@
+import re
+from functools import lru_cache
+
+from django.conf import settings
+
+from . import instrumentation, openrouter, scoring
+
+
+# =============================
+# PROMPT BUDGET CONFIG
+# =============================
+
+# Used for models without a budget in openrouter.OPENROUTER_MODELS; 0 = no trimming
+DEFAULT_BUDGET = getattr(settings, "OPENROUTER_PROMPT_BUDGET", 4000)
+
+# Job description never takes more than this share of the budget
+JD_SHARE = 0.3
+
+# Below this many tokens left, a section is dropped rather than cut
+MIN_PARTIAL_TOKENS = 40
+
+# A short line seen this often is a running header / footer
+REPEAT_MIN = 3
+REPEAT_MAX_CHARS = 100
+
+# System message + chat framing around the user prompt
+MESSAGE_OVERHEAD = 12
+
+SECTION_NAMES = frozenset("""
+summary|profile|professional summary|career summary|objective|career objective|about|about me|
+experience|work experience|professional experience|employment|employment history|work history|
+education|academic background|qualifications|skills|technical skills|core skills|key skills|
+core competencies|competencies|technologies|tools|projects|personal projects|key projects|
+certifications|certificates|licenses|achievements|accomplishments|awards|honors|publications|
+languages|interests|hobbies|volunteer|volunteering|volunteer experience|references|courses|
+coursework|training|leadership|activities|extracurricular activities|contact|contact information
+""".replace("\n", "").split("|"))
+
+_PIECE_RE = re.compile(r"[A-Za-z]+|\d{1,3}|\n+|[^\sA-Za-z\d]")
+_SPACES_RE = re.compile(r"[ \t\u00a0\u200b]+")
+_PAGE_NUMBER_RE = re.compile(r"^(page\s*)?\d+(\s*(of|/)\s*\d+)?$", re.IGNORECASE)
+_DIGITS_RE = re.compile(r"\d+")
+
+
+# =============================
+# TOKEN COUNT (approximation)
+# =============================
+# No tokenizer dependency: BPE vocabularies keep common words whole, split
+# long/rare words every ~7 letters and numbers every 3 digits, and give
+# punctuation and line breaks a token each.
+
+def count_tokens(text):
+    tokens = 0
+    for piece in _PIECE_RE.findall(text or ""):
+        if piece[0].isalpha():
+            tokens += 1 + (len(piece) - 1) // 7
+        else:
+            tokens += 1
+    return tokens
+
+
+# =============================
+# CLEANUP
+# =============================
+
+def _line_key(line):
+    # "Page 2 of 5" and "Jane Doe | jane@x.com | 2" repeat with different digits
+    return _DIGITS_RE.sub("#", line.lower())
+
+
+def clean_lines(text):
+    lines = [_SPACES_RE.sub(" ", line).strip() for line in (text or "").splitlines()]
+    lines = [line for line in lines if line and not _PAGE_NUMBER_RE.match(line)]
+
+    counts = {}
+    for line in lines:
+        if len(line) <= REPEAT_MAX_CHARS:
+            key = _line_key(line)
+            counts[key] = counts.get(key, 0) + 1
+
+    # Running headers / footers: keep the first copy (often name + contact)
+    seen = set()
+    cleaned = []
+    for line in lines:
+        key = _line_key(line)
+        if counts.get(key, 0) >= REPEAT_MIN:
+            if key in seen:
+                continue
+            seen.add(key)
+        if cleaned and cleaned[-1] == line:
+            continue
+        cleaned.append(line)
+    return cleaned
+
+
+def is_heading(line):
+    if len(line) > 40:
+        return False
+    name = line.rstrip(":").strip().lower()
+    if name in SECTION_NAMES:
+        return True
+    letters = [c for c in line if c.isalpha()]
+    return len(letters) >= 3 and line.isupper() and len(line.split()) <= 4
+
+
+# =============================
+# SECTIONS
+# =============================
+
+class Section:
+    __slots__ = ("index", "lines", "tokens", "relevance")
+
+    def __init__(self, index, lines, job):
+        self.index = index
+        self.lines = lines
+        text = "\n".join(lines)
+        self.tokens = count_tokens(text)
+        # Summed BM25 weight of the JD terms this section mentions
+        self.relevance = sum(
+            job.weights[job.position[term]]
+            for term in scoring.term_set(text)
+            if term in job.position
+        )
+
+    @property
+    def density(self):
+        return self.relevance / max(self.tokens, 1)
+
+
+def split_sections(lines, job):
+    # Everything before the first heading (name, contact, summary) is section 0
+    groups = [[]]
+    for line in lines:
+        if is_heading(line) and groups[-1]:
+            groups.append([])
+        groups[-1].append(line)
+    return [Section(index, group, job) for index, group in enumerate(groups) if group]
+
+
+def cut_lines(lines, budget):
+    kept = []
+    used = 0
+    for line in lines:
+        tokens = count_tokens(line) + 1
+        if used + tokens > budget:
+            words = line.split()
+            while words and used + count_tokens(" ".join(words)) + 1 > budget:
+                words = words[:max(len(words) - max(len(words) // 4, 1), 0)]
+            if words:
+                kept.append(" ".join(words))
+                used += count_tokens(kept[-1]) + 1
+            break
+        kept.append(line)
+        used += tokens
+    return kept, used
+
+
+def fit_sections(sections, budget):
+    # Most relevant tokens first; the opening section (contact, summary)
+    # always goes in. Output keeps the resume's own order.
+    ranked = sorted(sections, key=lambda s: (s.index != 0, -s.density, s.index))
+    chosen = {}
+    remaining = budget
+
+    for section in ranked:
+        if section.tokens + 1 <= remaining:
+            chosen[section.index] = section.lines
+            remaining -= section.tokens + 1
+        elif remaining >= MIN_PARTIAL_TOKENS:
+            lines, used = cut_lines(section.lines, remaining)
+            if lines:
+                chosen[section.index] = lines
+                remaining -= used
+
+    return [chosen[index] for index in sorted(chosen)]
+
+
+# =============================
+# PROMPT
+# =============================
+
+@lru_cache(maxsize=32)
+def prepare(resume_text, job_description):
+    # Model-independent work, shared by every attempt of one analysis
+    resume_lines = clean_lines(resume_text)
+    jd_lines = clean_lines(job_description)
+    job = scoring.vectorize_job_description(job_description or "")
+    return {
+        "original_tokens": count_tokens(openrouter.build_prompt(resume_text, job_description)),
+        "overhead": count_tokens(openrouter.build_prompt("", "")) + MESSAGE_OVERHEAD,
+        "resume_lines": resume_lines,
+        "resume_tokens": count_tokens("\n".join(resume_lines)),
+        "jd_lines": jd_lines,
+        "jd_tokens": count_tokens("\n".join(jd_lines)),
+        "sections": split_sections(resume_lines, job),
+    }
+
+
+def budget_for(model):
+    return openrouter.OPENROUTER_MODELS.get(model, DEFAULT_BUDGET)
+
+
+def build_prompt(model, resume_text, job_description):
+    with instrumentation.stage("prompt", model=model) as stage:
+        prepared = prepare(resume_text or "", job_description or "")
+        budget = budget_for(model)
+        jd_lines = prepared["jd_lines"]
+        resume_lines = prepared["resume_lines"]
+        trimmed = False
+
+        if budget > 0:
+            jd_budget = int(budget * JD_SHARE)
+            if prepared["jd_tokens"] > jd_budget:
+                jd_lines, jd_tokens = cut_lines(jd_lines, jd_budget)
+                trimmed = True
+            else:
+                jd_tokens = prepared["jd_tokens"]
+
+            resume_budget = max(budget - prepared["overhead"] - jd_tokens, 0)
+            if prepared["resume_tokens"] > resume_budget:
+                sections = fit_sections(prepared["sections"], resume_budget)
+                resume_lines = [line for lines in sections for line in lines]
+                trimmed = True
+
+        prompt = openrouter.build_prompt("\n".join(resume_lines), "\n".join(jd_lines))
+
+        tokens = count_tokens(prompt)
+        saved = max(prepared["original_tokens"] - tokens, 0)
+        stage.set(tokens=tokens, saved=saved, budget=budget, outcome="trimmed" if trimmed else "ok")
+        instrumentation.prompt_tokens(model, tokens, saved)
+    return prompt
@@ -0,0 +1,167 @@
+import hashlib
+import zipfile
+
+from django.conf import settings
+from django.db import transaction
+
+from . import extraction_cache, report_results, scoring, stats
+from .extraction import ExtractionError, read_upload
+from .models import ResumeReport
+from .parsing import parse_stream
+from .uploads import hash_file
+
+
+# =============================
+# BATCH LIMITS
+# =============================
+
+MAX_FILES = getattr(settings, "RANK_MAX_FILES", 500)
+# Refuse zip members larger than this once decompressed
+MAX_MEMBER_BYTES = getattr(settings, "RANK_MAX_MEMBER_BYTES", 10 * 1024 * 1024)
+# All uploaded files of one request together (an archive counts as one)
+MAX_BATCH_BYTES = getattr(settings, "RANK_MAX_BATCH_BYTES", 50 * 1024 * 1024)
+BATCH_TOO_LARGE = f"Batch is too large. The limit is {MAX_BATCH_BYTES // (1024 * 1024)} MB."
+
+SUPPORTED = {".pdf": "pdf", ".docx": "docx"}
+
+
+class RankingError(Exception):
+    pass
+
+
+def document_kind(name):
+    for suffix, kind in SUPPORTED.items():
+        if name.lower().endswith(suffix):
+            return kind
+    return None
+
+
+# =============================
+# INPUT COLLECTION
+# =============================
+# Documents are (name, digest, data, error) and produced lazily: a zip
+# member is only decompressed when the parser is ready to take it.
+
+def failed_document(name, error):
+    return name, None, None, error
+
+
+def iter_zip(archive):
+    try:
+        with zipfile.ZipFile(archive) as zf:
+            for info in zf.infolist():
+                name = info.filename.rsplit("/", 1)[-1]
+                if info.is_dir() or name.startswith(".") or not document_kind(name):
+                    continue
+                if info.file_size > MAX_MEMBER_BYTES:
+                    yield failed_document(name, "File too large")
+                    continue
+                # The header's size can lie; never inflate past the limit
+                with zf.open(info) as member:
+                    data = member.read(MAX_MEMBER_BYTES + 1)
+                if len(data) > MAX_MEMBER_BYTES:
+                    yield failed_document(name, "File too large")
+                    continue
+                yield name, hashlib.sha256(data).hexdigest(), data, None
+    except zipfile.BadZipFile:
+        raise RankingError("Archive is not a valid zip file.")
+
+
+def iter_documents(files):
+    # files: iterable of (name, file-like) — zips are expanded in place
+    count = 0
+    for name, file in files:
+        if name.lower().endswith(".zip"):
+            documents = iter_zip(file)
+        elif document_kind(name):
+            # Spooled uploads go to the parser by path (read_upload)
+            documents = [(name, hash_file(file), read_upload(file), None)]
+        else:
+            documents = [failed_document(name, "Only PDF or DOCX supported")]
+
+        for document in documents:
+            count += 1
+            if count > MAX_FILES:
+                raise RankingError(f"At most {MAX_FILES} resumes per batch.")
+            yield document
+
+
+# =============================
+# PARSE → SCORE → PERSIST
+# =============================
+
+def extract_all(documents):
+    # → [(name, extraction dict or ExtractionError)] in input order
+    names = []
+    extractions = []
+
+    def to_parse():
+        for name, digest, data, error in documents:
+            names.append(name)
+            extractions.append(ExtractionError(error) if error else None)
+            if error:
+                continue
+            kind = document_kind(name)
+            cached = extraction_cache.read(digest, kind)
+            if cached is not None:
+                extractions[-1] = cached
+            else:
+                yield (len(extractions) - 1, digest, kind), kind, data
+
+    for (index, digest, kind), extraction in parse_stream(to_parse()):
+        extractions[index] = extraction
+        if not isinstance(extraction, Exception) and not extraction["timed_out"]:
+            extraction_cache.write(digest, kind, extraction)
+
+    return list(zip(names, extractions))
+
+
+def rank_resumes(user, job_description, documents):
+    if not (job_description or "").strip():
+        raise RankingError("Job description is required.")
+
+    extractions = extract_all(documents)
+
+    parsed = [(name, e) for name, e in extractions if not isinstance(e, Exception)]
+    failed = [{"name": name, "error": str(e)} for name, e in extractions if isinstance(e, Exception)]
+
+    # One JD vector, one matrix product for the whole batch
+    results = scoring.score_resumes(job_description, [e["text"] for _, e in parsed])
+
+    with transaction.atomic():
+        stats.record_completed(user.id, [r["ats_score"] for r in results], created=True)
+        reports = ResumeReport.objects.bulk_create([
+            ResumeReport(
+                user=user,
+                name=name[:255],
+                score=result["ats_score"],
+                analysis_status="Completed"
+            )
+            for (name, _), result in zip(parsed, results)
+        ])
+        for (_, extraction), result in zip(parsed, results):
+            result["extraction_truncated"] = extraction["truncated"]
+        report_results.store_many(reports, results)
+
+    ranked = sorted(
+        zip(parsed, results, reports),
+        key=lambda row: row[1]["ats_score"],
+        reverse=True
+    )
+
+    return {
+        "ranked": [
+            {
+                "rank": position,
+                "name": name,
+                "report_id": report.id,
+                "ats_score": result["ats_score"],
+                "keyword_match_percentage": result["keyword_match_percentage"],
+                "matched_keywords": result["matched_keywords"],
+                "missing_keywords": result["missing_keywords"],
+                "truncated": extraction["truncated"],
+            }
+            for position, ((name, extraction), result, report) in enumerate(ranked, start=1)
+        ],
+        "failed": failed,
+    }
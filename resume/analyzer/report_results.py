@@ -0,0 +1,74 @@
+import json
+import zlib
+
+from django.conf import settings
+
+from .models import ReportResult, ResumeReport
+
+
+# =============================
+# STORAGE CONFIG
+# =============================
+
+# Short results are stored as plain JSON; zlib only pays off on long
+# keyword lists and suggestion text
+COMPRESS_MIN_BYTES = getattr(settings, "REPORT_RESULT_COMPRESS_MIN_BYTES", 512)
+COMPRESS_LEVEL = 6
+
+
+# =============================
+# ENCODE / DECODE
+# =============================
+
+def pack(report_id, result):
+    raw = json.dumps(result, separators=(",", ":")).encode("utf-8")
+    compressed = len(raw) >= COMPRESS_MIN_BYTES
+    return ReportResult(
+        report_id=report_id,
+        data=zlib.compress(raw, COMPRESS_LEVEL) if compressed else raw,
+        compressed=compressed,
+        size=len(raw)
+    )
+
+
+def unpack(row):
+    raw = bytes(row.data)
+    if row.compressed:
+        raw = zlib.decompress(raw)
+    return json.loads(raw)
+
+
+# =============================
+# WRITE (inside the caller's transaction)
+# =============================
+
+def store(report, result):
+    pack(report.id, result).save(force_insert=True)
+
+
+def store_many(reports, results):
+    ReportResult.objects.bulk_create([
+        pack(report.id, result) for report, result in zip(reports, results)
+    ])
+
+
+# =============================
+# READ
+# =============================
+
+def load(user, report_id):
+    # One query: the report and its stored result (LEFT JOIN)
+    report = (
+        ResumeReport.objects
+        .select_related("stored_result")
+        .filter(id=report_id, user=user)
+        .first()
+    )
+    if report is None:
+        return None, None
+
+    try:
+        stored = report.stored_result
+    except ReportResult.DoesNotExist:
+        return report, None
+    return report, unpack(stored)
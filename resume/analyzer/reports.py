@@ -0,0 +1,224 @@
+import base64
+import hashlib
+from datetime import datetime, time, timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from . import stats
+from .models import ResumeReport
+
+
+# =============================
+# PAGINATION CONFIG
+# =============================
+
+PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Full results live in ReportResult and are never read by listings
+LIST_FIELDS = ("id", "name", "score", "analysis_status", "analyzed_date")
+
+# Serialized API pages, keyed on the user's stats version
+RESPONSE_CACHE_TTL = getattr(settings, "REPORTS_API_CACHE_TTL", 300)
+
+
+# Upper bound on explicit ids per bulk request
+MAX_BULK_IDS = 1000
+
+
+class InvalidCursor(ValueError):
+    pass
+
+
+class InvalidFilter(ValueError):
+    pass
+
+
+# =============================
+# KEYSET CURSORS on (analyzed_date, id)
+# =============================
+
+def encode_cursor(analyzed_date, report_id):
+    raw = f"{analyzed_date.isoformat()}|{report_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        date_part, id_part = base64.urlsafe_b64decode(padded).decode().split("|")
+        return datetime.fromisoformat(date_part), int(id_part)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursor("Invalid cursor") from e
+
+
+def page_size(raw):
+    try:
+        size = int(raw or PAGE_SIZE)
+    except ValueError:
+        size = PAGE_SIZE
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+# =============================
+# QUERIES
+# =============================
+
+def report_page(user, cursor=None, limit=PAGE_SIZE):
+    reports = ResumeReport.objects.filter(user=user)
+
+    if cursor:
+        analyzed_date, report_id = decode_cursor(cursor)
+        reports = reports.filter(
+            Q(analyzed_date__lt=analyzed_date)
+            | Q(analyzed_date=analyzed_date, id__lt=report_id)
+        )
+
+    rows = list(
+        reports
+        .order_by("-analyzed_date", "-id")
+        .values(*LIST_FIELDS)[:limit + 1]
+    )
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1]["analyzed_date"], rows[-1]["id"])
+
+    return rows, next_cursor
+
+
+def report_stats(user):
+    # Materialized row kept up to date by analyzer.stats: one PK lookup
+    row = stats.get_stats(user)
+    return {
+        "total": row.total,
+        "completed": row.completed,
+        "average": row.average_score(),
+        "best": row.best,
+        "ratings": {
+            "excellent": row.excellent,
+            "good": row.good,
+            "average": row.average,
+            "poor": row.poor,
+        },
+    }
+
+
+def serialize_report(row):
+    return {
+        "id": row["id"],
+        "name": row["name"],
+        "score": row["score"],
+        "status": row["analysis_status"],  # Completed / Pending / Failed
+        "analyzed_date": timezone.localtime(
+            row["analyzed_date"]
+        ).strftime("%d %b %Y, %I:%M %p")
+    }
+
+
+# =============================
+# BULK SELECTION
+# =============================
+# {"ids": [..]} or {"filter": {"date_from", "date_to", "status",
+# "score_below", "all"}} → queryset scoped to the user, never unbounded
+# unless "all" is asked for explicitly.
+
+def _is_int(value):
+    # bool is an int subclass; JSON true must not pass as 1
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def _day_start(raw, field):
+    try:
+        # parse_date raises ValueError for well-formed impossible dates (2024-02-30)
+        day = parse_date(str(raw)) if raw else None
+    except ValueError:
+        day = None
+    if raw and day is None:
+        raise InvalidFilter(f"{field} must be YYYY-MM-DD")
+    if day is None:
+        return None
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def select_reports(user, payload):
+    reports = ResumeReport.objects.filter(user=user)
+
+    ids = payload.get("ids")
+    if ids is not None:
+        if not isinstance(ids, list) or not all(_is_int(i) for i in ids):
+            raise InvalidFilter("ids must be a list of integers")
+        if len(ids) > MAX_BULK_IDS:
+            raise InvalidFilter(f"At most {MAX_BULK_IDS} ids per request")
+        return reports.filter(id__in=ids)
+
+    criteria = payload.get("filter")
+    if not isinstance(criteria, dict) or not criteria:
+        raise InvalidFilter("Provide ids or a filter")
+
+    if criteria.get("all") is True:
+        return reports
+
+    date_from = _day_start(criteria.get("date_from"), "date_from")
+    date_to = _day_start(criteria.get("date_to"), "date_to")
+    status = criteria.get("status")
+    score_below = criteria.get("score_below")
+
+    if date_from:
+        reports = reports.filter(analyzed_date__gte=date_from)
+    if date_to:
+        # Inclusive of the whole end day
+        reports = reports.filter(analyzed_date__lt=date_to + timedelta(days=1))
+    if status is not None:
+        if not isinstance(status, str) or status not in dict(ResumeReport.STATUS_CHOICES):
+            raise InvalidFilter("Unknown status")
+        reports = reports.filter(analysis_status=status)
+    if score_below is not None:
+        if not _is_int(score_below):
+            raise InvalidFilter("score_below must be an integer")
+        reports = reports.filter(score__lt=score_below)
+
+    if not (date_from or date_to or status is not None or score_below is not None):
+        raise InvalidFilter("Filter has no criteria")
+
+    return reports
+
+
+# =============================
+# VERSIONED RESPONSES
+# =============================
+# Every report create / complete / delete bumps UserReportStats.version,
+# so (user, version, page) fully identifies an API response.
+
+def report_etag(user_id, version, cursor, limit):
+    raw = f"{user_id}:{version}:{cursor or 0}:{limit}"
+    return '"' + hashlib.sha1(raw.encode()).hexdigest() + '"'
+
+
+def build_page(user, cursor, limit):
+    rows, next_cursor = report_page(user, cursor=cursor, limit=limit)
+    data = {
+        "reports": [serialize_report(row) for row in rows],
+        "next_cursor": next_cursor,
+    }
+
+    # Stats only with the first page; later pages stay a single query
+    if not cursor:
+        data["stats"] = report_stats(user)
+
+    return data
+
+
+def cached_page(user, version, cursor, limit):
+    key = f"reports-api:{user.id}:{version}:{cursor or 0}:{limit}"
+    data = cache.get(key) if RESPONSE_CACHE_TTL > 0 else None
+    if data is None:
+        data = build_page(user, cursor, limit)
+        if RESPONSE_CACHE_TTL > 0:
+            cache.set(key, data, RESPONSE_CACHE_TTL)
+    return data
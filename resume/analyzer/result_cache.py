@@ -0,0 +1,201 @@
+import copy
+import hashlib
+import re
+import threading
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F
+from django.utils import timezone
+
+from . import instrumentation
+from .models import AnalysisCacheEntry
+
+
+# =============================
+# CACHE CONFIG
+# =============================
+
+LRU_SIZE = getattr(settings, "ANALYSIS_CACHE_LRU_SIZE", 256)
+TTL = getattr(settings, "ANALYSIS_CACHE_TTL", 7 * 24 * 3600)
+MAX_ENTRIES = getattr(settings, "ANALYSIS_CACHE_MAX_ENTRIES", 5000)
+
+_WHITESPACE = re.compile(r"\s+")
+
+_lru = OrderedDict()
+_lock = threading.Lock()
+_counters = {
+    "memory_hits": 0,
+    "shared_hits": 0,
+    "db_hits": 0,
+    "misses": 0,
+    "stores": 0,
+    "evictions": 0,
+}
+
+
+# =============================
+# KEYS
+# =============================
+
+def normalize(text):
+    return _WHITESPACE.sub(" ", (text or "").casefold()).strip()
+
+
+def cache_key(resume_text, job_description, model):
+    digest = hashlib.sha256()
+    for part in (normalize(resume_text), normalize(job_description), model):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def shared_key(key):
+    return f"analysis-result:{key}"
+
+
+# =============================
+# LOOKUP / STORE
+# =============================
+# Per-process LRU → shared Django cache (every worker) → AnalysisCacheEntry
+
+def get(resume_text, job_description, model):
+    key = cache_key(resume_text, job_description, model)
+    now = timezone.now()
+
+    with _lock:
+        cached = _lru.get(key)
+        if cached is not None:
+            result, expires_at = cached
+            if expires_at > now:
+                _lru.move_to_end(key)
+                result = copy.deepcopy(result)
+            else:
+                del _lru[key]
+                cached = None
+    if cached is not None:
+        _bump("memory_hits")
+        return result
+
+    shared = cache.get(shared_key(key))
+    if shared is not None:
+        result, expires_at = shared
+        if expires_at > now:
+            _remember(key, result, expires_at)
+            _bump("shared_hits")
+            return copy.deepcopy(result)
+
+    entry = (
+        AnalysisCacheEntry.objects
+        .filter(key=key, created_at__gt=now - timedelta(seconds=TTL))
+        .values("result", "created_at")
+        .first()
+    )
+
+    if entry is None:
+        _bump("misses")
+        return None
+
+    AnalysisCacheEntry.objects.filter(key=key).update(
+        hits=F("hits") + 1,
+        last_used_at=now
+    )
+    expires_at = entry["created_at"] + timedelta(seconds=TTL)
+    _share(key, entry["result"], expires_at, now)
+    _remember(key, entry["result"], expires_at)
+    _bump("db_hits")
+    return copy.deepcopy(entry["result"])
+
+
+def set(resume_text, job_description, model, result):
+    key = cache_key(resume_text, job_description, model)
+    now = timezone.now()
+
+    AnalysisCacheEntry.objects.update_or_create(
+        key=key,
+        defaults={
+            "model": model,
+            "result": result,
+            "created_at": now,
+            "last_used_at": now,
+        }
+    )
+    _share(key, result, now + timedelta(seconds=TTL), now)
+    _remember(key, copy.deepcopy(result), now + timedelta(seconds=TTL))
+    _bump("stores")
+
+    if AnalysisCacheEntry.objects.count() > MAX_ENTRIES:
+        prune()
+
+
+def _share(key, result, expires_at, now):
+    cache.set(shared_key(key), (result, expires_at), int((expires_at - now).total_seconds()))
+
+
+def _remember(key, result, expires_at):
+    with _lock:
+        _lru[key] = (result, expires_at)
+        _lru.move_to_end(key)
+        while len(_lru) > LRU_SIZE:
+            _lru.popitem(last=False)
+
+
+def _bump(counter, amount=1):
+    # stats() for this process; /metrics (analyzer_cache_events_total) too
+    with _lock:
+        _counters[counter] += amount
+    instrumentation.cache_event("analysis", counter, amount)
+
+
+# =============================
+# EVICTION & STATS
+# =============================
+
+def prune(max_entries=None):
+    max_entries = MAX_ENTRIES if max_entries is None else max_entries
+    cutoff = timezone.now() - timedelta(seconds=TTL)
+
+    keys = list(AnalysisCacheEntry.objects.filter(created_at__lte=cutoff).values_list("key", flat=True))
+
+    overflow = AnalysisCacheEntry.objects.count() - len(keys) - max_entries
+    if overflow > 0:
+        keys += (
+            AnalysisCacheEntry.objects
+            .filter(created_at__gt=cutoff)
+            .order_by("last_used_at")
+            .values_list("key", flat=True)[:overflow]
+        )
+
+    if not keys:
+        return 0
+    # Other workers' LRUs age out on their own (TTL, LRU_SIZE); the shared
+    # copy would otherwise keep serving an evicted result
+    removed, _ = AnalysisCacheEntry.objects.filter(key__in=keys).delete()
+    cache.delete_many([shared_key(key) for key in keys])
+    with _lock:
+        for key in keys:
+            _lru.pop(key, None)
+
+    _bump("evictions", removed)
+    return removed
+
+
+def clear():
+    with _lock:
+        _lru.clear()
+    keys = AnalysisCacheEntry.objects.values_list("key", flat=True)
+    cache.delete_many([shared_key(key) for key in keys])
+    AnalysisCacheEntry.objects.all().delete()
+
+
+def stats():
+    with _lock:
+        counters = dict(_counters)
+        counters["memory_entries"] = len(_lru)
+
+    hits = counters["memory_hits"] + counters["shared_hits"] + counters["db_hits"]
+    lookups = hits + counters["misses"]
+    counters["hit_ratio"] = round(hits / lookups, 3) if lookups else 0.0
+    return counters
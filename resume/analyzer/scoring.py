@@ -0,0 +1,278 @@
+import json
+import math
+import re
+import threading
+from functools import lru_cache
+from pathlib import Path
+
+from django.conf import settings
+
+
+# =============================
+# SCORER CONFIG
+# =============================
+
+VOCABULARY_PATH = Path(getattr(
+    settings,
+    "ATS_VOCABULARY_PATH",
+    settings.BASE_DIR / "analyzer" / "data" / "ats_vocabulary.json"
+))
+
+# BM25 saturation for repeated job description terms
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+MAX_SCORE = 95
+KEYWORD_LIMIT = 15
+
+TOKEN_RE = re.compile(r"\b[a-z]{3,}\b")
+
+STOPWORDS = frozenset("""
+about above after again against all also and any are because been before being
+below between both but can could did does doing down during each etc few for
+from further had has have having her here hers him his how into its itself just
+more most must not now off once only other our ours out over own same she should
+some such than that the their theirs them then there these they this those
+through too under until very was were what when where which while who whom why
+will with within without would you your yours able ability across along among
+including like per plus via well within work working looking join role candidate
+candidates team teams strong excellent good great year years experience preferred
+required requirements responsibilities responsible opportunity company position
+""".split())
+
+SUFFIXES = (
+    ("ational", "ate"), ("ization", "ize"), ("ements", ""), ("ement", ""),
+    ("ments", ""), ("ment", ""), ("ations", "ate"), ("ation", "ate"),
+    ("ships", ""), ("ship", ""), ("ness", ""), ("ities", ""), ("ity", ""),
+    ("ings", ""), ("ing", ""), ("ers", ""), ("er", ""), ("ies", "y"),
+    ("ied", "y"), ("ed", ""), ("es", ""), ("ly", ""), ("s", ""),
+)
+# Part of the vocabulary file: IDF tables built with other stems are ignored
+STEMMER_VERSION = 2
+
+
+# =============================
+# TOKENIZER
+# =============================
+
+@lru_cache(maxsize=65536)
+def stem(word):
+    # Suffixes are stripped until none applies, so stacked ones meet the
+    # same stem: "engineer" / "engineering" → "engin", "leader" /
+    # "leadership" → "lead", "managed" / "management" → "manag"
+    stripped = True
+    while stripped and not word.endswith("ss"):
+        stripped = False
+        for suffix, replacement in SUFFIXES:
+            if word.endswith(suffix) and len(word) - len(suffix) >= 3:
+                word = word[: len(word) - len(suffix)] + replacement
+                stripped = True
+                break
+    if word.endswith("e") and len(word) > 3:
+        word = word[:-1]
+    return word
+
+
+def tokenize(text):
+    return [
+        word for word in TOKEN_RE.findall((text or "").lower())
+        if word not in STOPWORDS
+    ]
+
+
+def term_set(text):
+    words = set(TOKEN_RE.findall((text or "").lower()))
+    words -= STOPWORDS
+    return {stem(word) for word in words}
+
+
+# =============================
+# VOCABULARY / IDF TABLE
+# =============================
+
+class Vocabulary:
+    def __init__(self, doc_count=0, avg_length=0.0, df=None):
+        self.doc_count = doc_count
+        self.avg_length = avg_length
+        self.df = df or {}
+        self.default_idf = self._idf(0)
+
+    def _idf(self, df):
+        if not self.doc_count:
+            return 1.0
+        return math.log(1 + (self.doc_count - df + 0.5) / (df + 0.5))
+
+    def idf(self, term):
+        df = self.df.get(term)
+        return self.default_idf if df is None else self._idf(df)
+
+    @classmethod
+    def build(cls, documents):
+        df = {}
+        total_length = 0
+        count = 0
+        for text in documents:
+            tokens = tokenize(text)
+            total_length += len(tokens)
+            count += 1
+            for term in {stem(t) for t in tokens}:
+                df[term] = df.get(term, 0) + 1
+        return cls(count, total_length / count if count else 0.0, df)
+
+    def save(self, path=None):
+        path = Path(path or VOCABULARY_PATH)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps({
+            "stemmer": STEMMER_VERSION,
+            "doc_count": self.doc_count,
+            "avg_length": self.avg_length,
+            "df": self.df,
+        }))
+
+    @classmethod
+    def load(cls, path=None):
+        path = Path(path or VOCABULARY_PATH)
+        try:
+            data = json.loads(path.read_text())
+        except (OSError, ValueError):
+            return cls()
+        if data.get("stemmer") != STEMMER_VERSION:
+            # Rebuild with `python manage.py build_ats_vocabulary`
+            return cls()
+        return cls(data["doc_count"], data["avg_length"], data["df"])
+
+
+_vocabulary = None
+_vocabulary_lock = threading.Lock()
+
+
+def get_vocabulary():
+    global _vocabulary
+    with _vocabulary_lock:
+        if _vocabulary is None:
+            _vocabulary = Vocabulary.load()
+        return _vocabulary
+
+
+def set_vocabulary(vocabulary):
+    global _vocabulary
+    with _vocabulary_lock:
+        _vocabulary = vocabulary
+    vectorize_job_description.cache_clear()
+
+
+# =============================
+# JOB DESCRIPTION VECTORS
+# =============================
+
+class JobVector:
+    # Sparse BM25 vector over the job description's own terms
+    def __init__(self, terms, surface, weights):
+        self.terms = terms
+        self.surface = surface
+        self.weights = weights
+        self.weight_list = weights.tolist()
+        self.total_weight = float(weights.sum())
+        self.position = {term: i for i, term in enumerate(terms)}
+        self.order = (-weights).argsort(kind="stable").tolist()
+
+
+@lru_cache(maxsize=256)
+def vectorize_job_description(job_description):
+    vocabulary = get_vocabulary()
+    tokens = tokenize(job_description)
+
+    counts = {}
+    surface = {}
+    for token in tokens:
+        term = stem(token)
+        counts[term] = counts.get(term, 0) + 1
+        surface.setdefault(term, token)
+
+    import numpy as np   # only paid for once something is scored
+
+    terms = list(counts)
+    tf = np.fromiter((counts[t] for t in terms), dtype=np.float64, count=len(terms))
+    idf = np.fromiter((vocabulary.idf(t) for t in terms), dtype=np.float64, count=len(terms))
+
+    avg_length = vocabulary.avg_length or len(tokens) or 1
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * len(tokens) / avg_length)
+    weights = idf * tf * (BM25_K1 + 1) / (tf + norm)
+
+    return JobVector(terms, [surface[t] for t in terms], weights)
+
+
+# =============================
+# SCORING
+# =============================
+
+def match_matrix(job, resume_term_sets):
+    import numpy as np
+
+    matrix = np.zeros((len(resume_term_sets), len(job.terms)), dtype=np.float64)
+    position = job.position
+    for row, terms in enumerate(resume_term_sets):
+        columns = [position[t] for t in terms if t in position]
+        matrix[row, columns] = 1.0
+    return matrix
+
+
+def score_matrix(job, matrix):
+    if not job.terms:
+        import numpy as np
+
+        return np.zeros(matrix.shape[0]), np.zeros(matrix.shape[0])
+    weighted = matrix @ job.weights / job.total_weight * 100
+    coverage = matrix.sum(axis=1) / len(job.terms) * 100
+    return weighted, coverage
+
+
+def build_result(job, flags, weighted, coverage):
+    # flags: one bool per job term, in job.terms order
+    ats_score = min(int(weighted), MAX_SCORE)
+
+    matched = [job.surface[i] for i in job.order if flags[i]]
+    missing = [job.surface[i] for i in job.order if not flags[i]]
+
+    if ats_score < 60:
+        suggestions = ["Improve skills and include more job-specific keywords."]
+        if missing:
+            suggestions.append("Consider covering: " + ", ".join(missing[:5]) + ".")
+    else:
+        suggestions = ["Your resume is well aligned with the job description."]
+
+    return {
+        "ats_score": ats_score,
+        "keyword_match_percentage": int(coverage),
+        "matched_keywords": matched[:KEYWORD_LIMIT],
+        "missing_keywords": missing[:KEYWORD_LIMIT],
+        "improvement_suggestions": suggestions,
+        "evaluation_mode": "local",
+        "analysis_status": "Completed",
+        "explanation": "ATS score calculated using local TF-IDF weighted keyword matching."
+    }
+
+
+def score_resumes(job_description, resume_texts):
+    # Batches: one matrix product for every resume
+    job = vectorize_job_description(job_description or "")
+    matrix = match_matrix(job, [term_set(text) for text in resume_texts])
+    weighted, coverage = score_matrix(job, matrix)
+    return [
+        build_result(job, flags, weighted[i], coverage[i])
+        for i, flags in enumerate(matrix.tolist())
+    ]
+
+
+def score_resume(resume_text, job_description):
+    # One resume: a plain weighted sum beats building a 1×N matrix
+    job = vectorize_job_description(job_description or "")
+    if not job.terms:
+        return build_result(job, [], 0.0, 0.0)
+
+    terms = term_set(resume_text)
+    flags = [term in terms for term in job.terms]
+    matched_weight = sum(w for w, flag in zip(job.weight_list, flags) if flag)
+    weighted = matched_weight / job.total_weight * 100
+    coverage = sum(flags) / len(job.terms) * 100
+    return build_result(job, flags, weighted, coverage)
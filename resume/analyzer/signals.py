@@ -0,0 +1,29 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.signals import request_started
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .backends import user_cache_key
+
+
+# =============================
+# CACHED USER INVALIDATION
+# =============================
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    cache.delete(user_cache_key(instance.pk))
+
+
+# =============================
+# ANALYSIS JOB RECOVERY
+# =============================
+
+@receiver(request_started)
+def start_job_sweeper(sender, **kwargs):
+    # Web processes only: recovers jobs lost in a restart even if no new
+    # analysis is ever submitted to this process
+    from .jobs import start_sweeper
+    start_sweeper()
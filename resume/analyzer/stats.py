@@ -0,0 +1,183 @@
+from django.db import transaction
+from django.db.models import Count, F, Max, Q, Sum
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import ResumeReport, UserReportStats
+
+
+# =============================
+# RATING BUCKETS
+# =============================
+# Mirrors ResumeReport.ats_rating() for Completed reports
+
+BUCKETS = ("excellent", "good", "average", "poor")
+
+
+def rating_bucket(score):
+    if score >= 85:
+        return "excellent"
+    elif score >= 70:
+        return "good"
+    elif score >= 50:
+        return "average"
+    return "poor"
+
+
+def _bucket_counts(scores):
+    counts = {}
+    for score in scores:
+        bucket = rating_bucket(score)
+        counts[bucket] = counts.get(bucket, 0) + 1
+    return counts
+
+
+def summary_fields():
+    # Aggregates mirroring the counters, for rebuilds and bulk deletes
+    completed = Q(analysis_status="Completed")
+    return {
+        "total": Count("id"),
+        "completed": Count("id", filter=completed),
+        "score_sum": Sum("score", filter=completed),
+        "best": Max("score", filter=completed),
+        "excellent": Count("id", filter=completed & Q(score__gte=85)),
+        "good": Count("id", filter=completed & Q(score__gte=70, score__lt=85)),
+        "average": Count("id", filter=completed & Q(score__gte=50, score__lt=70)),
+        "poor": Count("id", filter=completed & Q(score__lt=50)),
+    }
+
+
+def lock(user_id):
+    # Row lock on the stats row serializes every report write for the user
+    UserReportStats.objects.get_or_create(user_id=user_id)
+    return UserReportStats.objects.select_for_update().get(user_id=user_id)
+
+
+def _update(user_id, **updates):
+    UserReportStats.objects.get_or_create(user_id=user_id)
+    UserReportStats.objects.filter(user_id=user_id).update(
+        version=F("version") + 1,
+        updated_at=timezone.now(),
+        **updates
+    )
+
+
+def bump_version(user_id):
+    # Report list changed without touching the counters (e.g. a job failed)
+    _update(user_id)
+
+
+# =============================
+# INCREMENTAL UPDATES
+# =============================
+# Each update is a single UPDATE with F() expressions, so concurrent
+# workers never lose increments. Call inside the report write's transaction,
+# before touching ResumeReport, so locks are always taken stats → reports.
+
+def record_created(user_id, count=1):
+    _update(user_id, total=F("total") + count)
+
+
+def record_completed(user_id, scores, created=False):
+    # `created=True` when the reports are new and already Completed
+    if not scores:
+        return
+
+    updates = {
+        "completed": F("completed") + len(scores),
+        "score_sum": F("score_sum") + sum(scores),
+        "best": Greatest(F("best"), max(scores)),
+    }
+    if created:
+        updates["total"] = F("total") + len(scores)
+    for bucket, count in _bucket_counts(scores).items():
+        updates[bucket] = F(bucket) + count
+
+    _update(user_id, **updates)
+
+
+def record_deleted(user_id, summary):
+    # summary: reports.aggregate(**summary_fields()) taken before the delete
+    if not summary["total"]:
+        return
+
+    updates = {
+        "total": F("total") - summary["total"],
+        "completed": F("completed") - summary["completed"],
+        "score_sum": F("score_sum") - (summary["score_sum"] or 0),
+    }
+    for bucket in BUCKETS:
+        if summary[bucket]:
+            updates[bucket] = F(bucket) - summary[bucket]
+
+    _update(user_id, **updates)
+
+    # "best" can't be decremented; re-read it only if the best report went
+    stats = UserReportStats.objects.get(user_id=user_id)
+    if summary["best"] is not None and summary["best"] >= stats.best:
+        best = (
+            ResumeReport.objects
+            .filter(user_id=user_id, analysis_status="Completed")
+            .aggregate(best=Max("score"))["best"]
+        )
+        UserReportStats.objects.filter(user_id=user_id).update(best=best or 0)
+
+
+def delete_reports(user_id, reports):
+    # reports: queryset already scoped to user_id. One transaction,
+    # one aggregate, one set-based DELETE.
+    with transaction.atomic():
+        lock(user_id)
+        summary = reports.aggregate(**summary_fields())
+        if summary["total"]:
+            reports.delete()
+            record_deleted(user_id, summary)
+    return summary
+
+
+# =============================
+# READS & REBUILD
+# =============================
+
+def get_stats(user):
+    stats, _ = UserReportStats.objects.get_or_create(user=user)
+    return stats
+
+
+def rebuild(user_ids=None):
+    reports = ResumeReport.objects.all()
+    if user_ids is not None:
+        reports = reports.filter(user_id__in=user_ids)
+
+    rows = reports.values("user_id").annotate(**summary_fields())
+
+    with transaction.atomic():
+        existing = UserReportStats.objects.select_for_update()
+        if user_ids is not None:
+            existing = existing.filter(user_id__in=user_ids)
+        # Keep versions moving forward so cached API pages can't be reused
+        versions = dict(existing.values_list("user_id", "version"))
+        existing.delete()
+
+        rebuilt = {
+            row["user_id"]: UserReportStats(
+                user_id=row["user_id"],
+                total=row["total"],
+                completed=row["completed"],
+                score_sum=row["score_sum"] or 0,
+                best=row["best"] or 0,
+                excellent=row["excellent"],
+                good=row["good"],
+                average=row["average"],
+                poor=row["poor"],
+            )
+            for row in rows
+        }
+        for user_id in versions:
+            rebuilt.setdefault(user_id, UserReportStats(user_id=user_id))
+        for user_id, row in rebuilt.items():
+            row.version = versions.get(user_id, 0) + 1
+
+        UserReportStats.objects.bulk_create(rebuilt.values())
+
+    return len(rebuilt)
@@ -0,0 +1,188 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+
+from . import instrumentation
+from .openrouter import latency_percentile
+
+
+# =============================
+# STRATEGY CONFIG
+# =============================
+
+SEQUENTIAL = "sequential"   # one model after another (original behaviour)
+HEDGED = "hedged"           # start the next model if the current one is slow
+RACE = "race"               # ask every model at once, first valid answer wins
+
+STRATEGY = getattr(settings, "OPENROUTER_STRATEGY", SEQUENTIAL)
+
+# Seconds to wait before hedging while a model has too few latency samples
+HEDGE_DELAY = getattr(settings, "OPENROUTER_HEDGE_DELAY", 4.0)
+HEDGE_PERCENTILE = 0.95
+
+# Thread pool for hedged / race attempts (sync engine)
+ATTEMPT_THREADS = getattr(settings, "OPENROUTER_ATTEMPT_THREADS", 4)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def hedge_delay(model):
+    observed = latency_percentile(model, HEDGE_PERCENTILE)
+    return observed if observed is not None else HEDGE_DELAY
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=ATTEMPT_THREADS, thread_name_prefix="ai-attempt")
+        return _executor
+
+
+# =============================
+# SYNC ENGINE
+# =============================
+# `attempt(model)` returns an accepted result dict or None, and may raise.
+
+def run_strategy(models, attempt, strategy=None):
+    strategy = strategy or STRATEGY
+    if strategy == SEQUENTIAL or len(models) < 2:
+        return _sequential(models, attempt)
+    return _concurrent(models, attempt, hedged=(strategy == HEDGED))
+
+
+def _safe_attempt(attempt, model):
+    try:
+        return attempt(model)
+    except Exception as e:
+        instrumentation.event("ai_attempt_failed", logging.WARNING, model=model, error=str(e))
+        return None
+
+
+def _sequential(models, attempt):
+    for model in models:
+        try:
+            result = attempt(model)
+            if result:
+                return model, result
+        except Exception as e:
+            instrumentation.event("ai_attempt_failed", logging.WARNING, model=model, error=str(e))
+            time.sleep(1)
+    return None, None
+
+
+def _concurrent(models, attempt, hedged):
+    executor = _get_executor()
+    queue = list(models)
+    running = {}
+
+    def launch():
+        model = queue.pop(0)
+        running[executor.submit(_safe_attempt, attempt, model)] = model
+        return model
+
+    last = launch()
+    while not hedged and queue:
+        last = launch()
+
+    try:
+        while running:
+            timeout = hedge_delay(last) if (hedged and queue) else None
+            done, _ = wait(running, timeout=timeout, return_when=FIRST_COMPLETED)
+
+            if not done:
+                instrumentation.event("ai_hedge_started", model=queue[0])
+                instrumentation.count("ai_hedge", model=queue[0])
+                last = launch()
+                continue
+
+            for future in done:
+                model = running.pop(future)
+                result = future.result()
+                if result:
+                    return model, result
+
+            # A failed attempt hands over to the next model immediately
+            if queue and not running:
+                last = launch()
+    finally:
+        # Threads can't be interrupted; late answers are simply ignored
+        for future in running:
+            future.cancel()
+
+    return None, None
+
+
+# =============================
+# ASYNC ENGINE
+# =============================
+
+async def arun_strategy(models, attempt, strategy=None):
+    strategy = strategy or STRATEGY
+    if strategy == SEQUENTIAL or len(models) < 2:
+        return await _asequential(models, attempt)
+    return await _aconcurrent(models, attempt, hedged=(strategy == HEDGED))
+
+
+async def _asafe_attempt(attempt, model):
+    try:
+        return await attempt(model)
+    except Exception as e:
+        instrumentation.event("ai_attempt_failed", logging.WARNING, model=model, error=str(e))
+        return None
+
+
+async def _asequential(models, attempt):
+    for model in models:
+        try:
+            result = await attempt(model)
+            if result:
+                return model, result
+        except Exception as e:
+            instrumentation.event("ai_attempt_failed", logging.WARNING, model=model, error=str(e))
+            await asyncio.sleep(1)
+    return None, None
+
+
+async def _aconcurrent(models, attempt, hedged):
+    queue = list(models)
+    running = {}
+
+    def launch():
+        model = queue.pop(0)
+        running[asyncio.ensure_future(_asafe_attempt(attempt, model))] = model
+        return model
+
+    last = launch()
+    while not hedged and queue:
+        last = launch()
+
+    try:
+        while running:
+            timeout = hedge_delay(last) if (hedged and queue) else None
+            done, _ = await asyncio.wait(running, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+
+            if not done:
+                instrumentation.event("ai_hedge_started", model=queue[0])
+                instrumentation.count("ai_hedge", model=queue[0])
+                last = launch()
+                continue
+
+            for task in done:
+                model = running.pop(task)
+                result = task.result()
+                if result:
+                    return model, result
+
+            if queue and not running:
+                last = launch()
+    finally:
+        for task in running:
+            task.cancel()
+
+    return None, None
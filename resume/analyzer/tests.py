@@ -1,3 +1,970 @@
-from django.test import TestCase
+import asyncio
+import json
+import random
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.admin.sites import AdminSite
+from django.contrib.auth.models import User
+from django.contrib.messages import get_messages
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.files.uploadhandler import SkipFile
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from . import (
+    backends,
+    benchmarks,
+    circuit,
+    instrumentation,
+    jobs,
+    openrouter,
+    parsing,
+    prompting,
+    result_cache,
+    scoring,
+    stats,
+    strategies,
+    throttling,
+    uploads,
+    views,
+)
+from .admin import ResumeReportAdmin
+from .extraction import collect, extract_data
+from .models import AnalysisCacheEntry, AnalysisJob, ResumeReport, UserReportStats
+from .reports import InvalidCursor, InvalidFilter, decode_cursor, page_size, report_page, select_reports
+
+
+# =============================
+# BULK SELECTION
+# =============================
+
+class SelectReportsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("alice", "alice@example.com", "pw-123456")
+        self.report = ResumeReport.objects.create(user=self.user, name="a.pdf", score=40, analysis_status="Completed")
+
+    def test_ids_and_filters(self):
+        self.assertEqual(list(select_reports(self.user, {"ids": [self.report.id]})), [self.report])
+        self.assertEqual(select_reports(self.user, {"filter": {"score_below": 50}}).count(), 1)
+        self.assertEqual(select_reports(self.user, {"filter": {"status": "Pending"}}).count(), 0)
+
+    def test_invalid_filters(self):
+        for payload in (
+            {"filter": {"date_from": "2024-13-45"}},
+            {"filter": {"date_to": "2024-02-30"}},
+            {"filter": {"date_from": "yesterday"}},
+            {"filter": {"status": ["Completed"]}},
+            {"filter": {"status": "Done"}},
+            {"filter": {"score_below": True}},
+            {"filter": {"score_below": "50"}},
+            {"ids": [True]},
+            {"ids": "1,2"},
+            {"filter": {}},
+        ):
+            with self.subTest(payload=payload), self.assertRaises(InvalidFilter):
+                select_reports(self.user, payload)
+
+    def test_bulk_delete_rejects_impossible_date(self):
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse("bulk_delete_reports"),
+            json.dumps({"filter": {"date_from": "2024-02-30"}}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(ResumeReport.objects.filter(id=self.report.id).exists())
+
+
+# =============================
+# JOB RECOVERY SWEEP
+# =============================
+
+class SweepTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("bob", "bob@example.com", "pw-123456")
+
+    def make_job(self, status, age, attempts=0):
+        report = ResumeReport.objects.create(user=self.user, name="cv.pdf")
+        job = AnalysisJob.objects.create(report=report, resume_text="python", job_description="python", attempts=attempts)
+        then = timezone.now() - timedelta(seconds=age)
+        AnalysisJob.objects.filter(pk=job.pk).update(status=status, created_at=then, started_at=then)
+        return job
+
+    @mock.patch("analyzer.jobs.submit_local")
+    def test_resubmits_orphaned_pending_jobs(self, submit):
+        orphan = self.make_job("Pending", jobs.ORPHAN_AFTER + 10)
+        self.make_job("Pending", 0)   # just enqueued, its own submit is on the way
+
+        jobs.sweep()
+
+        submit.assert_called_once_with(orphan.id)
+
+    @mock.patch("analyzer.jobs.submit_local")
+    def test_requeues_stale_running_jobs(self, submit):
+        stale = self.make_job("Running", jobs.STALE_AFTER + 10, attempts=1)
+        exhausted = self.make_job("Running", jobs.STALE_AFTER + 10, attempts=jobs.MAX_ATTEMPTS)
+
+        self.assertEqual(jobs.sweep(), 1)
+
+        self.assertEqual(AnalysisJob.objects.get(pk=stale.pk).status, "Pending")
+        submit.assert_called_once_with(stale.id)
+        self.assertEqual(AnalysisJob.objects.get(pk=exhausted.pk).status, "Failed")
+        self.assertEqual(ResumeReport.objects.get(pk=exhausted.report_id).analysis_status, "Failed")
+
+    @mock.patch("analyzer.jobs.submit_local")
+    def test_worker_sweep_does_not_submit(self, submit):
+        self.make_job("Pending", jobs.ORPHAN_AFTER + 10)
+        jobs.sweep(submit=False)
+        submit.assert_not_called()
+
+
+class WorkerLoopTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user("erin", "erin@example.com", "pw-123456")
+        self.reports = [jobs.enqueue_analysis(user, f"cv{i}.pdf", "python", "python") for i in range(2)]
+
+    def test_keeps_running_after_a_job_crashes(self):
+        results = [RuntimeError("db went away"), None]
+        with mock.patch("analyzer.jobs.run_job", side_effect=results) as run_job:
+            jobs.worker_loop(threading.Event(), once=True)
+        self.assertEqual(run_job.call_count, 2)
+
+    def test_local_thread_logs_crashes(self):
+        with mock.patch("analyzer.jobs.run_job", side_effect=RuntimeError("boom")), \
+                mock.patch("analyzer.jobs.instrumentation.event") as event:
+            jobs._run_in_thread(self.reports[0].job.id)
+        self.assertEqual(event.call_args.args[0], "analysis_job_crashed")
+        self.assertNotIn(self.reports[0].job.id, jobs._queued)
+
+# =============================
+# REPORT STATS INVARIANTS
+# =============================
+# UserReportStats must always equal aggregate(summary_fields()) over the
+# user's reports, and every change to the list must bump the version.
+
+class ReportStatsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("carol", "carol@example.com", "pw-123456")
+        self.admin = ResumeReportAdmin(ResumeReport, AdminSite())
+        self.request = RequestFactory().post("/admin/")
+
+    def add(self, score, user=None):
+        return jobs.record_analysis(user or self.user, "cv.pdf", "python", "python", {"ats_score": score})
+
+    def version(self, user=None):
+        return stats.get_stats(user or self.user).version
+
+    def assertStatsMatch(self, user=None):
+        user = user or self.user
+        row = UserReportStats.objects.get(user=user)
+        expected = ResumeReport.objects.filter(user=user).aggregate(**stats.summary_fields())
+        expected["score_sum"] = expected["score_sum"] or 0
+        expected["best"] = expected["best"] or 0
+        for field, value in expected.items():
+            self.assertEqual(getattr(row, field), value, field)
+
+    def test_counters_follow_pipeline_writes(self):
+        for score in (90, 72, 55, 40):
+            self.add(score)
+        report = jobs.enqueue_analysis(self.user, "pending.pdf", "python", "python")
+        self.assertStatsMatch()
+
+        with mock.patch("analyzer.jobs.run_analysis", return_value={"ats_score": 95}):
+            jobs.process_job(report.job.id)
+        self.assertStatsMatch()
+        self.assertEqual(stats.get_stats(self.user).best, 95)
+
+    def test_failed_job_bumps_version_only(self):
+        report = jobs.enqueue_analysis(self.user, "pending.pdf", "python", "python")
+        before = self.version()
+        with mock.patch("analyzer.jobs.run_analysis", side_effect=RuntimeError("boom")):
+            jobs.process_job(report.job.id)
+        self.assertGreater(self.version(), before)
+        self.assertStatsMatch()
+
+    def test_report_deleted_while_job_runs(self):
+        self.add(60)
+        report = jobs.enqueue_analysis(self.user, "pending.pdf", "python", "python")
+
+        def delete_then_answer(*args):
+            stats.delete_reports(self.user.id, ResumeReport.objects.filter(pk=report.pk))
+            return {"ats_score": 95}
+
+        with mock.patch("analyzer.jobs.run_analysis", side_effect=delete_then_answer):
+            jobs.process_job(report.job.id)
+        self.assertFalse(ResumeReport.objects.filter(pk=report.pk).exists())
+        self.assertEqual(stats.get_stats(self.user).best, 60)
+        self.assertStatsMatch()
+
+        # Gone before the worker even loaded it
+        jobs.run_job(report.job.id)
+
+    def test_deleting_best_report_recomputes_best(self):
+        best = self.add(90)
+        self.add(72)
+        before = self.version()
+
+        stats.delete_reports(self.user.id, ResumeReport.objects.filter(pk=best.pk))
+
+        self.assertEqual(stats.get_stats(self.user).best, 72)
+        self.assertGreater(self.version(), before)
+        self.assertStatsMatch()
+
+    def test_admin_deletes_go_through_stats(self):
+        other = User.objects.create_user("dave", "dave@example.com", "pw-123456")
+        first = self.add(90)
+        self.add(60)
+        self.add(80, user=other)
+        before = self.version(), self.version(other)
+
+        self.admin.delete_model(self.request, first)
+        self.assertStatsMatch()
+        self.admin.delete_queryset(self.request, ResumeReport.objects.all())
+
+        self.assertStatsMatch()
+        self.assertStatsMatch(other)
+        self.assertEqual(stats.get_stats(other).total, 0)
+        self.assertGreater(self.version(), before[0])
+        self.assertGreater(self.version(other), before[1])
+
+    def test_admin_edit_bumps_version(self):
+        report = self.add(70)
+        before = self.version()
+        report.name = "renamed.pdf"
+        self.admin.save_model(self.request, report, None, True)
+        self.assertGreater(self.version(), before)
+        self.assertIn("score", self.admin.get_readonly_fields(self.request, report))
+
+    def test_admin_delete_invalidates_api_cache_and_etag(self):
+        self.client.force_login(self.user)
+        report = self.add(70)
+        first = self.client.get(reverse("reports_api"))
+        self.assertEqual(len(first.json()["reports"]), 1)
+
+        self.admin.delete_model(self.request, report)
+
+        again = self.client.get(reverse("reports_api"), HTTP_IF_NONE_MATCH=first["ETag"])
+        self.assertEqual(again.status_code, 200)
+        self.assertEqual(again.json()["reports"], [])
+        self.assertEqual(again.json()["stats"]["total"], 0)
+
+    def test_rebuild_matches_and_moves_version_forward(self):
+        self.add(90)
+        self.add(30)
+        UserReportStats.objects.filter(user=self.user).update(total=99, best=1)
+        before = self.version()
+
+        stats.rebuild([self.user.id])
+
+        self.assertStatsMatch()
+        self.assertGreater(self.version(), before)
+
+
+# =============================
+# CURSOR PAGINATION
+# =============================
+
+class ReportPaginationTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("erin", "erin@example.com", "pw-123456")
+        for i in range(7):
+            ResumeReport.objects.create(user=self.user, name=f"{i}.pdf")
+        # Ties on analyzed_date must still page by id without gaps or repeats
+        same = timezone.now()
+        ResumeReport.objects.filter(user=self.user).update(analyzed_date=same)
+        ResumeReport.objects.create(user=User.objects.create_user("frank"), name="other.pdf")
+
+    def test_pages_cover_every_report_once_in_order(self):
+        seen = []
+        cursor = None
+        while True:
+            rows, cursor = report_page(self.user, cursor=cursor, limit=3)
+            seen.extend(row["id"] for row in rows)
+            if cursor is None:
+                break
+        expected = list(ResumeReport.objects.filter(user=self.user).order_by("-analyzed_date", "-id").values_list("id", flat=True))
+        self.assertEqual(seen, expected)
+
+    def test_invalid_cursor(self):
+        for cursor in ("not-base64!", "Zm9v", ""):
+            if cursor:
+                with self.subTest(cursor=cursor), self.assertRaises(InvalidCursor):
+                    decode_cursor(cursor)
+
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("reports_api"), {"cursor": "Zm9v"})
+        self.assertEqual(response.status_code, 400)
+
+    def test_page_size_is_clamped(self):
+        self.assertEqual(page_size(None), 20)
+        self.assertEqual(page_size("abc"), 20)
+        self.assertEqual(page_size("0"), 1)
+        self.assertEqual(page_size("100000"), 100)
+
+
+# =============================
+# UPLOAD SNIFFING & LIMITS
+# =============================
+
+class UploadGuardTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("gina", "gina@example.com", "pw-123456")
+        self.client.force_login(self.user)
+
+    def test_sniff(self):
+        self.assertEqual(uploads.sniff(b"%PDF-1.7\n..."), "pdf")
+        self.assertEqual(uploads.sniff(b"\x00junk before the header %PDF-1.4"), "pdf")
+        self.assertEqual(uploads.sniff(b"PK\x03\x04rest-of-zip"), "docx")
+        self.assertIsNone(uploads.sniff(b"MZ\x90\x00"))
+        self.assertIsNone(uploads.sniff(b"x" * uploads.SNIFF_BYTES + b"%PDF-"))
+
+    def handler(self, max_bytes=100):
+        request = RequestFactory().post("/")
+        handler = uploads.GuardedUploadHandler(request, max_bytes=max_bytes)
+        return request, handler
+
+    def test_handler_rejects_bad_magic_on_first_chunk(self):
+        request, handler = self.handler()
+        handler.new_file("resume", "cv.pdf", "application/pdf")
+        with self.assertRaises(SkipFile):
+            handler.receive_data_chunk(b"hello world", 0)
+        self.assertEqual(request.upload_errors, {"resume": "unsupported"})
+
+    def test_handler_rejects_oversized_while_streaming(self):
+        request, handler = self.handler(max_bytes=100)
+        handler.new_file("resume", "cv.pdf", "application/pdf")
+        self.assertEqual(handler.receive_data_chunk(b"%PDF-" + b"0" * 50, 0)[:5], b"%PDF-")
+        with self.assertRaises(SkipFile):
+            handler.receive_data_chunk(b"0" * 60, 55)
+        self.assertEqual(request.upload_errors, {"resume": "too_large"})
+
+    def test_handler_rejects_declared_length(self):
+        request, handler = self.handler(max_bytes=100)
+        with self.assertRaises(SkipFile):
+            handler.new_file("resume", "cv.pdf", "application/pdf", content_length=101)
+
+    def test_handler_records_sniffed_kind_and_ignores_other_fields(self):
+        request, handler = self.handler()
+        handler.new_file("resume", "cv.pdf", "application/pdf")
+        handler.receive_data_chunk(b"PK\x03\x04", 0)
+        handler.file_complete(4)
+        self.assertEqual(request.upload_kinds, {"resume": "docx"})
+
+        handler.new_file("photo", "me.png", "image/png")
+        self.assertEqual(handler.receive_data_chunk(b"\x89PNG", 0), b"\x89PNG")
+
+    def analyze(self, data=None, name="cv.pdf", **extra):
+        files = {"resume": SimpleUploadedFile(name, data)} if data is not None else {}
+        response = self.client.post(reverse("analyze"), {"job_description": "python", **files}, **extra)
+        return response, [str(m) for m in get_messages(response.wsgi_request)]
+
+    def test_analyze_rejections(self):
+        for data, reason in ((b"hello world" * 20, "unsupported"), (b"", "empty"), (None, "missing")):
+            with self.subTest(reason=reason):
+                response, messages = self.analyze(data)
+                self.assertRedirects(response, reverse("upload"), fetch_redirect_response=False)
+                self.assertEqual(messages[-1], uploads.MESSAGES[reason])
+        self.assertFalse(ResumeReport.objects.filter(user=self.user).exists())
+
+    def test_analyze_rejects_oversized_body_before_reading_it(self):
+        with mock.patch.object(uploads, "MAX_UPLOAD_BYTES", 10), mock.patch.object(uploads, "FORM_OVERHEAD_BYTES", 10):
+            response, messages = self.analyze(b"%PDF-" + b"0" * 100)
+        self.assertRedirects(response, reverse("upload"), fetch_redirect_response=False)
+        self.assertEqual(messages, [uploads.MESSAGES["too_large"]])
+        self.assertFalse(hasattr(response.wsgi_request, "_files"))
+
+    def test_stream_endpoint_returns_json_errors(self):
+        response = self.client.post(reverse("analyze_stream"), {"resume": SimpleUploadedFile("cv.docx", b"MZ" * 100)})
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.json()["error"], uploads.MESSAGES["unsupported"])
+
+
+# =============================
+# CIRCUIT BREAKER
+# =============================
+
+class CircuitBreakerTests(TestCase):
+    model = "test/model"
+
+    def setUp(self):
+        cache.clear()
+        self.now = 1000.0
+        patcher = mock.patch.object(circuit, "time", mock.Mock(time=lambda: self.now))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(cache.clear)
+
+    def trip(self):
+        for _ in range(circuit.FAILURE_THRESHOLD):
+            circuit.record_failure(self.model)
+
+    def test_opens_after_threshold(self):
+        for _ in range(circuit.FAILURE_THRESHOLD - 1):
+            circuit.record_failure(self.model)
+        self.assertTrue(circuit.allow(self.model))
+        self.assertEqual(circuit.state(self.model), {"state": "closed", "failures": circuit.FAILURE_THRESHOLD - 1})
+
+        circuit.record_failure(self.model)
+        self.assertFalse(circuit.allow(self.model))
+        self.assertEqual(circuit.state(self.model)["state"], "open")
+
+    def test_success_resets_failures(self):
+        for _ in range(circuit.FAILURE_THRESHOLD - 1):
+            circuit.record_failure(self.model)
+        circuit.record_success(self.model)
+        circuit.record_failure(self.model)
+        self.assertTrue(circuit.allow(self.model))
+        self.assertEqual(circuit.state(self.model)["failures"], 1)
+
+    def test_half_open_admits_one_probe(self):
+        self.trip()
+        self.now += circuit.COOLDOWN + 1
+        self.assertEqual(circuit.state(self.model)["state"], "half-open")
+        self.assertTrue(circuit.allow(self.model))
+        self.assertFalse(circuit.allow(self.model))
+
+    def test_probe_success_closes(self):
+        self.trip()
+        self.now += circuit.COOLDOWN + 1
+        self.assertTrue(circuit.allow(self.model))
+        circuit.record_success(self.model)
+        self.assertEqual(circuit.state(self.model), {"state": "closed", "failures": 0})
+        self.assertTrue(circuit.allow(self.model))
+
+    def test_probe_failure_reopens_for_a_full_cooldown(self):
+        self.trip()
+        self.now += circuit.COOLDOWN + 1
+        self.assertTrue(circuit.allow(self.model))
+        circuit.record_failure(self.model)
+        self.assertFalse(circuit.allow(self.model))
+        self.now += circuit.COOLDOWN - 1
+        self.assertFalse(circuit.allow(self.model))
+        self.now += 2
+        self.assertTrue(circuit.allow(self.model))
+
+    def test_circuits_are_per_model(self):
+        self.trip()
+        self.assertTrue(circuit.allow("other/model"))
+
+    def test_open_circuit_skips_the_request(self):
+        self.trip()
+        with mock.patch.object(openrouter, "get_session") as get_session:
+            self.assertIsNone(openrouter.request_model(self.model, "prompt"))
+        get_session.assert_not_called()
+
+    def test_request_errors_count_as_failures(self):
+        session = mock.Mock()
+        session.post.side_effect = ConnectionError("down")
+        with mock.patch.object(openrouter, "get_session", return_value=session):
+            for _ in range(circuit.FAILURE_THRESHOLD):
+                with self.assertRaises(ConnectionError):
+                    openrouter.request_model(self.model, "prompt")
+        self.assertEqual(circuit.state(self.model)["state"], "open")
+
+
+# =============================
+# BATCH RANKING LIMITS
+# =============================
+
+class RankingLimitTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user("hana", "hana@example.com", "pw-123456")
+        self.client.force_login(self.user)
+
+    def rank(self, **files):
+        return self.client.post(reverse("rank_resumes"), {"job_description": "python", **files})
+
+    def test_batch_over_the_cap_is_refused(self):
+        with mock.patch.object(views, "MAX_BATCH_BYTES", 100):
+            # Declared body size alone
+            response = self.rank(archive=SimpleUploadedFile("batch.zip", b"PK\x03\x04" + b"0" * 500_000))
+            self.assertEqual(response.status_code, 413)
+            # Several small files adding up past the cap while streaming
+            with mock.patch.object(uploads, "FORM_OVERHEAD_BYTES", 10_000):
+                response = self.rank(resumes=[SimpleUploadedFile(f"{i}.pdf", b"%PDF-" + b"0" * 60) for i in range(3)])
+            self.assertEqual(response.status_code, 413)
+
+    def test_rejected_uploads_are_reported_per_file(self):
+        response = self.rank(resumes=[
+            SimpleUploadedFile("a.pdf", b"MZ not a pdf"),
+            SimpleUploadedFile("b.pdf", b""),
+        ])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["failed"], [
+            {"name": "a.pdf", "error": uploads.MESSAGES["unsupported"]},
+            {"name": "b.pdf", "error": uploads.MESSAGES["empty"]},
+        ])
+
+    def test_documents_are_read_as_the_parser_takes_them(self):
+        produced = []
+
+        def documents():
+            for i in range(10):
+                produced.append(i)
+                yield i, "pdf", b"%PDF-"
+
+        def fake_submit(kind, data):
+            future = parsing.Future()
+            future.set_result({"text": ""})
+            return future
+
+        with mock.patch.object(parsing, "POOL_SIZE", 2), mock.patch.object(parsing, "get_pool") as get_pool:
+            get_pool.return_value.submit.side_effect = fake_submit
+            stream = parsing.parse_stream(documents(), window=3)
+            self.assertEqual(next(stream), (0, {"text": ""}))
+            self.assertEqual(produced, [0, 1, 2])
+            self.assertEqual([key for key, _ in stream], list(range(1, 10)))
+
+
+# =============================
+# LOGIN THROTTLE
+# =============================
+
+class LoginThrottleTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        # One fixed window for the whole test
+        patcher = mock.patch.object(throttling, "time", mock.Mock(time=lambda: 1000.0))
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def request(self, **meta):
+        return RequestFactory().post("/login/", REMOTE_ADDR="10.0.0.1", **meta)
+
+    def test_ip_limit_is_off_by_default(self):
+        self.assertEqual(throttling.IP_RATE_LIMIT, 0)
+        for i in range(60):
+            self.assertEqual(throttling.check_login(self.request(), f"user{i}"), 0)
+
+    def test_client_ip_reads_trusted_header(self):
+        request = self.request(HTTP_X_FORWARDED_FOR="1.2.3.4, 203.0.113.7")
+        self.assertEqual(throttling.client_ip(request), "10.0.0.1")
+        with mock.patch.object(throttling, "IP_HEADER", "X-Forwarded-For"):
+            self.assertEqual(throttling.client_ip(request), "203.0.113.7")
+            self.assertEqual(throttling.client_ip(self.request()), "10.0.0.1")
+
+    def test_ip_limit_when_enabled(self):
+        with mock.patch.object(throttling, "IP_RATE_LIMIT", 3), mock.patch.object(throttling, "IP_HEADER", "X-Real-IP"):
+            for i in range(3):
+                self.assertEqual(throttling.check_login(self.request(HTTP_X_REAL_IP="203.0.113.7"), f"u{i}"), 0)
+            self.assertGreater(throttling.check_login(self.request(HTTP_X_REAL_IP="203.0.113.7"), "u9"), 0)
+            self.assertEqual(throttling.check_login(self.request(HTTP_X_REAL_IP="203.0.113.8"), "u9"), 0)
+
+
+# =============================
+# ANALYSIS RESULT CACHE
+# =============================
+
+class ResultCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        result_cache.clear()
+        self.addCleanup(result_cache.clear)
+
+    def metric(self, result):
+        labels = (("cache", "analysis"), ("result", result))
+        return instrumentation.CACHE_EVENTS.series.get(labels, 0)
+
+    def test_hits_and_misses_reach_metrics(self):
+        misses, memory_hits = self.metric("misses"), self.metric("memory_hits")
+        self.assertIsNone(result_cache.get("cv", "jd", "m"))
+        result_cache.set("cv", "jd", "m", {"score": 1})
+        self.assertEqual(result_cache.get("cv", "jd", "m"), {"score": 1})
+        self.assertEqual(self.metric("misses"), misses + 1)
+        self.assertEqual(self.metric("memory_hits"), memory_hits + 1)
+        self.assertIn('analyzer_cache_events_total{cache="analysis",result="misses"}', instrumentation.render_metrics())
+
+    def test_prune_drops_the_shared_copy(self):
+        for i in range(3):
+            result_cache.set(f"cv{i}", "jd", "m", {"score": i})
+        keys = [result_cache.cache_key(f"cv{i}", "jd", "m") for i in range(3)]
+        AnalysisCacheEntry.objects.filter(key=keys[0]).update(last_used_at=timezone.now() - timedelta(days=1))
+
+        self.assertEqual(result_cache.prune(max_entries=2), 1)
+        self.assertIsNone(cache.get(result_cache.shared_key(keys[0])))
+        self.assertIsNotNone(cache.get(result_cache.shared_key(keys[1])))
+        self.assertIsNone(result_cache.get("cv0", "jd", "m"))
+        self.assertEqual(result_cache.get("cv1", "jd", "m"), {"score": 1})
+
+    def test_prune_drops_expired_entries(self):
+        result_cache.set("old", "jd", "m", {"score": 1})
+        key = result_cache.cache_key("old", "jd", "m")
+        AnalysisCacheEntry.objects.filter(key=key).update(
+            created_at=timezone.now() - timedelta(seconds=result_cache.TTL + 1)
+        )
+        self.assertEqual(result_cache.prune(), 1)
+        self.assertIsNone(cache.get(result_cache.shared_key(key)))
+
+
+# =============================
+# TEXT EXTRACTION LIMITS
+# =============================
+
+class ExtractionLimitTests(TestCase):
+    def test_page_limit(self):
+        extraction = collect(iter(["p1", "p2", "p3"]), "\n", 2, 1000)
+        self.assertEqual(extraction["text"], "p1\np2")
+        self.assertEqual(extraction["pages"], 2)
+        self.assertTrue(extraction["truncated"])
+
+    def test_char_limit_counts_separators(self):
+        for chunks, max_chars, text in (
+            (["a" * 10, "b" * 50], 10, "a" * 10),
+            (["a" * 10, "b" * 50], 11, "a" * 10),
+            (["a" * 10, "b" * 50], 15, "a" * 10 + "\n" + "b" * 4),
+            (["a" * 10, "b" * 50], 200, "a" * 10 + "\n" + "b" * 50),
+        ):
+            with self.subTest(max_chars=max_chars):
+                extraction = collect(iter(chunks), "\n", 50, max_chars)
+                self.assertEqual(extraction["text"], text)
+                self.assertLessEqual(len(extraction["text"]), max_chars)
+                self.assertEqual(extraction["truncated"], max_chars < 61)
+
+    def test_unlimited_chunks(self):
+        extraction = collect(iter(["x"] * 80), "\n", None, 1000)
+        self.assertEqual(extraction["pages"], 80)
+        self.assertFalse(extraction["truncated"])
+
+    def test_docx_paragraphs_are_not_pages(self):
+        data = benchmarks.make_docx([f"Bullet {i}" for i in range(80)] + [""] * 20)
+        extraction = extract_data("docx", data, max_pages=50, budget=0)
+        self.assertIsNone(extraction["pages"])
+        self.assertFalse(extraction["truncated"])
+        self.assertIn("Bullet 79", extraction["text"])
+
+        extraction = extract_data("docx", data, max_chars=100, budget=0)
+        self.assertTrue(extraction["truncated"])
+        self.assertLessEqual(len(extraction["text"]), 100)
+
+    def test_pdf_page_cap(self):
+        data = benchmarks.make_pdf([f"Page {i}" for i in range(5)])
+        extraction = extract_data("pdf", data, max_pages=3, budget=0)
+        self.assertEqual(extraction["pages"], 3)
+        self.assertTrue(extraction["truncated"])
+        self.assertIn("Page 2", extraction["text"])
+        self.assertNotIn("Page 3", extraction["text"])
+
+
+# =============================
+# CACHED USER LOOKUP
+# =============================
+
+class UserCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user("finn", "finn@example.com", "pw-123456")
+        self.backend = backends.EmailBackend()
+
+    def test_off_by_default_with_locmem(self):
+        self.assertEqual(backends.USER_CACHE_TTL, 0)
+        self.assertEqual(self.backend.get_user(self.user.pk), self.user)
+        # update() sends no signal; without the cache it is seen at once
+        User.objects.filter(pk=self.user.pk).update(is_active=False)
+        self.assertIsNone(self.backend.get_user(self.user.pk))
+        self.assertIsNone(cache.get(backends.user_cache_key(self.user.pk)))
+
+    def test_cached_when_enabled_and_dropped_on_save(self):
+        with mock.patch.object(backends, "USER_CACHE_TTL", 300):
+            self.backend.get_user(self.user.pk)
+            self.assertIsNotNone(cache.get(backends.user_cache_key(self.user.pk)))
+            self.user.is_active = False
+            self.user.save()
+            self.assertIsNone(self.backend.get_user(self.user.pk))
+
+
+# =============================
+# ATS SCORER
+# =============================
+
+class ScorerTests(TestCase):
+    JD = (
+        "Senior Python engineer with Django, PostgreSQL and Kubernetes. "
+        "Leadership of a small group, building scalable services."
+    )
+
+    def setUp(self):
+        scoring.set_vocabulary(scoring.Vocabulary())
+        self.addCleanup(scoring.set_vocabulary, None)
+
+    def test_stacked_suffixes_share_a_stem(self):
+        for words in (
+            ("engineer", "engineering", "engineers", "engineered"),
+            ("leader", "leaders", "leadership"),
+            ("managed", "manager", "management"),
+            ("developer", "development", "developing"),
+        ):
+            with self.subTest(words=words):
+                self.assertEqual(len({scoring.stem(word) for word in words}), 1)
+        self.assertEqual(scoring.stem("process"), "process")
+
+    def test_word_forms_match(self):
+        result = scoring.score_resume("Software engineer", "Software engineering")
+        self.assertEqual(result["ats_score"], scoring.MAX_SCORE)
+        self.assertEqual(result["missing_keywords"], [])
+
+        result = scoring.score_resume("Team leader", "Leadership")
+        self.assertEqual(result["matched_keywords"], ["leadership"])
+
+    def test_single_matches_batch(self):
+        resumes = [
+            "Python developer using Django and Postgres, led a group",
+            "Java engineer",
+            "",
+            "Kubernetes services, leadership, Python, Django, PostgreSQL, scalable",
+        ]
+        self.assertEqual(
+            scoring.score_resumes(self.JD, resumes),
+            [scoring.score_resume(text, self.JD) for text in resumes],
+        )
+        self.assertEqual(scoring.score_resume("python", "")["ats_score"], 0)
+
+    def test_vocabulary_from_other_stemmer_is_ignored(self):
+        vocabulary = scoring.Vocabulary(doc_count=2, avg_length=10.0, df={"engin": 1})
+        with tempfile.TemporaryDirectory() as tmp:
+            path = f"{tmp}/vocabulary.json"
+            vocabulary.save(path)
+            self.assertEqual(scoring.Vocabulary.load(path).doc_count, 2)
+
+            with open(path) as fh:
+                data = json.load(fh)
+            data["stemmer"] = scoring.STEMMER_VERSION - 1
+            with open(path, "w") as fh:
+                json.dump(data, fh)
+            self.assertEqual(scoring.Vocabulary.load(path).doc_count, 0)
+
+
+# =============================
+# MODEL STRATEGIES
+# =============================
+
+class StrategyTests(TestCase):
+    # Fake attempts: "slow" blocks until the test ends, "none" is rejected,
+    # "fail" raises, anything else answers at once
+    def setUp(self):
+        self.calls = []
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+
+    def attempt(self, model):
+        self.calls.append(model)
+        if model.startswith("slow"):
+            self.release.wait(5)
+        elif model.startswith("none"):
+            return None
+        elif model.startswith("fail"):
+            raise RuntimeError("upstream error")
+        return {"model": model}
+
+    def run_strategy(self, models, strategy, delay=0.01):
+        with mock.patch.object(strategies, "hedge_delay", return_value=delay):
+            return strategies.run_strategy(models, self.attempt, strategy)
+
+    def test_sequential_skips_rejected_and_failed_models(self):
+        with mock.patch.object(strategies, "time") as fake_time:
+            result = self.run_strategy(["fail", "none", "ok", "later"], strategies.SEQUENTIAL)
+        self.assertEqual(result, ("ok", {"model": "ok"}))
+        self.assertEqual(self.calls, ["fail", "none", "ok"])
+        fake_time.sleep.assert_called_once_with(1)
+
+    def test_hedged_waits_for_a_fast_model(self):
+        result = self.run_strategy(["ok", "backup"], strategies.HEDGED, delay=5)
+        self.assertEqual(result, ("ok", {"model": "ok"}))
+        self.assertEqual(self.calls, ["ok"])
+
+    def test_hedged_starts_next_model_when_slow(self):
+        result = self.run_strategy(["slow", "backup"], strategies.HEDGED)
+        self.assertEqual(result, ("backup", {"model": "backup"}))
+        self.assertEqual(self.calls, ["slow", "backup"])
+
+    def test_hedged_failure_hands_over_without_delay(self):
+        started = time.monotonic()
+        result = self.run_strategy(["fail", "none", "backup"], strategies.HEDGED, delay=60)
+        self.assertEqual(result, ("backup", {"model": "backup"}))
+        self.assertLess(time.monotonic() - started, 5)
+
+    def test_race_first_accepted_answer_wins(self):
+        result = self.run_strategy(["none", "slow", "ok"], strategies.RACE)
+        self.assertEqual(result, ("ok", {"model": "ok"}))
+        self.assertCountEqual(self.calls, ["none", "slow", "ok"])
+
+    def test_race_cancels_attempts_still_pending(self):
+        # Only "ok" runs; the other attempts stay queued behind it
+        class QueuedExecutor:
+            futures = []
+
+            def submit(self, fn, attempt, model):
+                future = Future()
+                if model == "ok":
+                    future.set_result(fn(attempt, model))
+                self.futures.append(future)
+                return future
+
+        executor = QueuedExecutor()
+        with mock.patch.object(strategies, "_executor", executor):
+            result = self.run_strategy(["ok", "a", "b"], strategies.RACE)
+        self.assertEqual(result, ("ok", {"model": "ok"}))
+        self.assertEqual(self.calls, ["ok"])
+        self.assertEqual([f.cancelled() for f in executor.futures], [False, True, True])
+
+    def test_nothing_accepted(self):
+        for strategy in (strategies.HEDGED, strategies.RACE):
+            with self.subTest(strategy=strategy):
+                self.calls = []
+                self.assertEqual(self.run_strategy(["none", "fail"], strategy), (None, None))
+                self.assertCountEqual(self.calls, ["none", "fail"])
+
+
+class AsyncStrategyTests(TestCase):
+    def setUp(self):
+        self.calls = []
+        self.cancelled = []
+
+    async def attempt(self, model):
+        self.calls.append(model)
+        try:
+            if model.startswith("slow"):
+                await asyncio.sleep(5)
+            elif model.startswith("none"):
+                return None
+            elif model.startswith("fail"):
+                raise RuntimeError("upstream error")
+            else:
+                await asyncio.sleep(0.01)
+        except asyncio.CancelledError:
+            self.cancelled.append(model)
+            raise
+        return {"model": model}
+
+    def run_strategy(self, models, strategy, delay=0.01):
+        async def main():
+            result = await strategies.arun_strategy(models, self.attempt, strategy)
+            # Let cancelled attempts unwind before the loop closes
+            await asyncio.sleep(0)
+            return result
+
+        with mock.patch.object(strategies, "hedge_delay", return_value=delay):
+            return asyncio.run(main())
+
+    def test_sequential_skips_rejected_models(self):
+        result = self.run_strategy(["none", "ok", "later"], strategies.SEQUENTIAL)
+        self.assertEqual(result, ("ok", {"model": "ok"}))
+        self.assertEqual(self.calls, ["none", "ok"])
+
+    def test_hedged_cancels_the_slow_model(self):
+        result = self.run_strategy(["slow", "backup"], strategies.HEDGED)
+        self.assertEqual(result, ("backup", {"model": "backup"}))
+        self.assertEqual(self.cancelled, ["slow"])
+
+    def test_hedged_failure_hands_over_without_delay(self):
+        started = time.monotonic()
+        result = self.run_strategy(["fail", "none", "backup"], strategies.HEDGED, delay=60)
+        self.assertEqual(result, ("backup", {"model": "backup"}))
+        self.assertLess(time.monotonic() - started, 5)
+
+    def test_race_cancels_losing_attempts(self):
+        result = self.run_strategy(["none", "slow-a", "ok", "slow-b"], strategies.RACE)
+        self.assertEqual(result, ("ok", {"model": "ok"}))
+        self.assertCountEqual(self.calls, ["none", "slow-a", "ok", "slow-b"])
+        self.assertCountEqual(self.cancelled, ["slow-a", "slow-b"])
+
+    def test_nothing_accepted(self):
+        self.assertEqual(self.run_strategy(["none", "fail"], strategies.RACE), (None, None))
+        self.assertEqual(self.cancelled, [])
+
+
+# =============================
+# PROMPT BUDGETS
+# =============================
+
+class PromptingTests(TestCase):
+    MODELS = {"big/model": 6000, "small/model": 3000}
+    HOBBIES = "sailing chess gardening hiking painting cooking travel photography".split()
+
+    def setUp(self):
+        scoring.set_vocabulary(scoring.Vocabulary())
+        self.addCleanup(scoring.set_vocabulary, None)
+        prompting.prepare.cache_clear()
+        self.addCleanup(prompting.prepare.cache_clear)
+        patcher = mock.patch.object(openrouter, "OPENROUTER_MODELS", self.MODELS)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        rng = random.Random(7)
+        body = ["Jane Doe", "jane@example.com"]
+        body += ["EXPERIENCE"] + [benchmarks.make_text(rng, 12) for _ in range(150)]
+        body += ["HOBBIES"] + [" ".join(rng.choice(self.HOBBIES) for _ in range(12)) for _ in range(150)]
+        body += ["SKILLS"] + [benchmarks.make_text(rng, 12) for _ in range(40)]
+
+        # 45 lines per page between a running header and a page number
+        lines = []
+        for start in range(0, len(body), 45):
+            page = start // 45 + 1
+            lines += [f"Jane Doe | Resume | {page}"] + body[start:start + 45] + [f"Page {page}"]
+        self.resume = "\n".join(lines)
+        self.jd = "\n".join(benchmarks.make_text(rng, 12) for _ in range(400))
+
+    def build(self, model):
+        return prompting.build_prompt(model, self.resume, self.jd)
+
+    def test_count_tokens(self):
+        self.assertEqual(prompting.count_tokens(""), 0)
+        self.assertEqual(prompting.count_tokens(None), 0)
+        self.assertEqual(prompting.count_tokens("hello world"), 2)
+        # Long words split every 7 letters, numbers every 3 digits
+        self.assertEqual(prompting.count_tokens("internationalization"), 3)
+        self.assertEqual(prompting.count_tokens("2024"), 2)
+        self.assertEqual(prompting.count_tokens("a, b.\n\nc"), 6)
+
+    def test_clean_lines_drops_headers_footers_and_page_numbers(self):
+        text = "\n".join([
+            "Jane  Doe | jane@x.com | 1", "Summary", "Page 1 of 3",
+            "Jane Doe | jane@x.com | 2", "Built  things", "Built things", "2",
+            "Jane Doe | jane@x.com | 3", "Shipped things", "3 / 3",
+        ])
+        self.assertEqual(prompting.clean_lines(text), [
+            "Jane Doe | jane@x.com | 1", "Summary", "Built things", "Shipped things",
+        ])
+
+    def test_short_lines_seen_twice_are_kept(self):
+        text = "Skills\nPython\nTools\nPython"
+        self.assertEqual(prompting.clean_lines(text), ["Skills", "Python", "Tools", "Python"])
+
+    def test_prompt_fits_each_model_budget(self):
+        original = prompting.count_tokens(openrouter.build_prompt(self.resume, self.jd))
+        for model, budget in (("big/model", 6000), ("small/model", 3000), ("other/model", 4000)):
+            with self.subTest(model=model):
+                self.assertEqual(prompting.budget_for(model), budget)
+                self.assertGreater(original, budget)
+
+                prompt = self.build(model)
+                tokens = prompting.count_tokens(prompt)
+                self.assertLessEqual(tokens + prompting.MESSAGE_OVERHEAD, budget)
+                self.assertGreater(tokens, budget * 0.95)
+
+                jd = prompt.split("JOB DESCRIPTION:")[1].strip()
+                self.assertLessEqual(prompting.count_tokens(jd), int(budget * prompting.JD_SHARE))
+
+    def test_no_trimming_without_a_budget(self):
+        with mock.patch.object(prompting, "DEFAULT_BUDGET", 0):
+            prompt = self.build("other/model")
+        self.assertIn("HOBBIES", prompt)
+        self.assertEqual(prompt.count("Jane Doe | Resume |"), 1)
+        self.assertNotIn("Page 2", prompt)
+
+    def test_trimmed_sections_keep_resume_order(self):
+        prompt = self.build("small/model")
+        # Irrelevant hobbies go first; the opening section always stays
+        self.assertNotIn("HOBBIES", prompt)
+        positions = [prompt.index(text) for text in (
+            "RESUME:", "Jane Doe", "EXPERIENCE", "SKILLS", "JOB DESCRIPTION:",
+        )]
+        self.assertEqual(positions, sorted(positions))
@@ -0,0 +1,70 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+
+# =============================
+# LOGIN THROTTLE CONFIG
+# =============================
+
+RATE_LIMIT = getattr(settings, "LOGIN_RATE_LIMIT", 10)
+IP_RATE_LIMIT = getattr(settings, "LOGIN_IP_RATE_LIMIT", 0)
+WINDOW = getattr(settings, "LOGIN_RATE_WINDOW", 60)
+
+# Header a trusted reverse proxy puts the client address in ("" = REMOTE_ADDR)
+IP_HEADER = getattr(settings, "LOGIN_IP_HEADER", "")
+
+
+# =============================
+# FIXED-WINDOW COUNTERS
+# =============================
+# Counters live in the Django cache (add + incr), so every worker sharing
+# the cache sees the same counts. Costs two cache calls, no DB, no hash.
+
+def _hit(scope, value, limit):
+    if limit <= 0:
+        return 0
+
+    window = int(time.time() // WINDOW)
+    key = f"login-throttle:{scope}:{value}:{window}"
+
+    cache.add(key, 0, timeout=WINDOW)
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        # Expired between add() and incr()
+        cache.set(key, 1, timeout=WINDOW)
+        count = 1
+
+    if count > limit:
+        return WINDOW - int(time.time() % WINDOW)
+    return 0
+
+
+def _identifier_key(identifier):
+    # Hashed: raw identifiers may hold characters some cache backends reject
+    return hashlib.sha1(identifier.strip().lower().encode()).hexdigest()
+
+
+def client_ip(request):
+    if IP_HEADER:
+        # Last entry: the address our proxy saw; earlier ones come from the client
+        value = request.headers.get(IP_HEADER, "").rsplit(",", 1)[-1].strip()
+        if value:
+            return value
+    return request.META.get("REMOTE_ADDR", "")
+
+
+def check_login(request, identifier):
+    # Seconds until the caller may retry, or 0 when the attempt may proceed
+    return max(
+        _hit("ip", client_ip(request), IP_RATE_LIMIT),
+        _hit("id", _identifier_key(identifier), RATE_LIMIT),
+    )
+
+
+def reset_login(identifier):
+    window = int(time.time() // WINDOW)
+    cache.delete(f"login-throttle:id:{_identifier_key(identifier)}:{window}")
@@ -0,0 +1,195 @@
+import hashlib
+import logging
+
+from django.conf import settings
+from django.core.files.uploadhandler import FileUploadHandler, SkipFile
+
+from . import instrumentation
+
+
+# =============================
+# UPLOAD LIMITS
+# =============================
+
+MAX_UPLOAD_BYTES = getattr(settings, "RESUME_MAX_UPLOAD_BYTES", 10 * 1024 * 1024)
+# Room for the other form fields (job description) and multipart framing
+FORM_OVERHEAD_BYTES = 256 * 1024
+
+# PDF allows junk before the header; real files have it at offset 0 or close
+SNIFF_BYTES = 1024
+SIGNATURES = (
+    (b"%PDF-", "pdf"),
+    (b"PK\x03\x04", "docx"),   # zip container
+)
+
+MESSAGES = {
+    "too_large": f"File is too large. The limit is {MAX_UPLOAD_BYTES // (1024 * 1024)} MB.",
+    "unsupported": "Only PDF or DOCX supported.",
+    "empty": "The uploaded file is empty.",
+    "missing": "Please choose a PDF or DOCX resume.",
+}
+
+
+def sniff(head):
+    for signature, kind in SIGNATURES:
+        if kind == "pdf" and signature in head[:SNIFF_BYTES]:
+            return kind
+        if head.startswith(signature):
+            return kind
+    return None
+
+
+def kind_from_name(name):
+    name = (name or "").lower()
+    if name.endswith(".pdf"):
+        return "pdf"
+    if name.endswith(".docx"):
+        return "docx"
+    return None
+
+
+# =============================
+# EARLY REJECTION
+# =============================
+# Installed first on the analyze views. A file that is too large or does
+# not start like a PDF / DOCX is dropped at the first bad chunk (SkipFile):
+# Django discards the rest of it without buffering or spooling, and the
+# other form fields still parse. The reason is left on the request.
+
+class GuardedUploadHandler(FileUploadHandler):
+    # max_total caps the bytes of all guarded files in the request together
+    def __init__(self, request=None, fields=("resume",), max_bytes=None, max_total=None):
+        super().__init__(request)
+        self.fields = fields
+        self.max_bytes = MAX_UPLOAD_BYTES if max_bytes is None else max_bytes
+        self.max_total = max_total
+        self.total = 0
+
+    def new_file(self, field_name, file_name, content_type, content_length=None, charset=None, content_type_extra=None):
+        super().new_file(field_name, file_name, content_type, content_length, charset, content_type_extra)
+        self.guarded = field_name in self.fields
+        self.head = b""
+        self.kind = None
+        self.received = 0
+
+        if self.guarded and content_length and content_length > self.max_bytes:
+            self.reject("too_large")
+
+    def receive_data_chunk(self, raw_data, start):
+        if not self.guarded:
+            return raw_data
+
+        self.received += len(raw_data)
+        self.total += len(raw_data)
+        if self.received > self.max_bytes or (self.max_total and self.total > self.max_total):
+            self.reject("too_large")
+
+        if self.kind is None:
+            self.head += raw_data[:SNIFF_BYTES - len(self.head)]
+            self.kind = sniff(self.head)
+            if self.kind is None and len(self.head) >= min(SNIFF_BYTES, self.received):
+                # A whole chunk (or the whole sniff window) without a signature
+                self.reject("unsupported")
+        return raw_data
+
+    def file_complete(self, file_size):
+        if self.guarded:
+            if file_size == 0:
+                self.record_error("empty")
+            elif self.kind is None:
+                self.record_error("unsupported")
+            else:
+                _on_request(self.request, "upload_kinds")[self.field_name] = self.kind
+        return None
+
+    def record_error(self, reason):
+        _on_request(self.request, "upload_errors")[self.field_name] = reason
+        # Every rejected file, for fields that carry several
+        _on_request(self.request, "upload_rejections", list).append((self.field_name, self.file_name, reason))
+        instrumentation.event("upload_rejected", logging.WARNING, field=self.field_name, file=self.file_name, reason=reason)
+        instrumentation.count("upload_rejected", reason=reason)
+
+    def reject(self, reason):
+        self.record_error(reason)
+        raise SkipFile()
+
+
+def _on_request(request, name, factory=dict):
+    if not hasattr(request, name):
+        setattr(request, name, factory())
+    return getattr(request, name)
+
+
+def oversized(request, limit=None):
+    # Judged from Content-Length before the body is touched at all
+    limit = MAX_UPLOAD_BYTES if limit is None else limit
+    try:
+        length = int(request.META.get("CONTENT_LENGTH") or 0)
+    except ValueError:
+        return False
+    return length > limit + FORM_OVERHEAD_BYTES
+
+
+def install_handlers(request, fields=("resume",), max_bytes=None, max_total=None, digests=True):
+    # Must run before anything reads request.POST / request.FILES.
+    # digests=False for fields with several files (digests are per field).
+    if digests:
+        request.upload_handlers.insert(0, HashingUploadHandler(request))
+    request.upload_handlers.insert(0, GuardedUploadHandler(request, fields, max_bytes, max_total))
+
+
+def get_upload(request, field_name):
+    # (file, kind, None) or (None, None, reason); MESSAGES[reason] for the user.
+    # request.FILES first: the body is parsed lazily and the guard only
+    # records its errors while that happens.
+    file = request.FILES.get(field_name)
+    error = getattr(request, "upload_errors", {}).get(field_name)
+    if error:
+        return None, None, error
+    if file is None:
+        return None, None, "missing"
+
+    kind = getattr(request, "upload_kinds", {}).get(field_name) or kind_from_name(file.name)
+    if kind is None:
+        return None, None, "unsupported"
+    return file, kind, None
+
+
+# =============================
+# HASH WHILE STREAMING
+# =============================
+
+class HashingUploadHandler(FileUploadHandler):
+    # Sits in front of Django's default handlers: every chunk is hashed on
+    # its way through, so the digest is ready as soon as the upload ends.
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.digest = hashlib.sha256()
+        self.stage = instrumentation.stage("upload", field=self.field_name)
+        self.stage.__enter__()
+
+    def receive_data_chunk(self, raw_data, start):
+        self.digest.update(raw_data)
+        return raw_data
+
+    def file_complete(self, file_size):
+        if not hasattr(self.request, "upload_digests"):
+            self.request.upload_digests = {}
+        self.request.upload_digests[self.field_name] = self.digest.hexdigest()
+        self.stage.set(bytes=file_size)
+        self.stage.__exit__(None, None, None)
+        return None
+
+
+def hash_file(file):
+    digest = hashlib.sha256()
+    for chunk in file.chunks():
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def upload_digest(request, file, field_name):
+    digests = getattr(request, "upload_digests", {})
+    return digests.get(field_name) or hash_file(file)
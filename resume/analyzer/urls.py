@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.urls import path
 from django.shortcuts import redirect
 from . import views
@@ -22,11 +23,26 @@ urlpatterns = [
     # Main Pages
     path("dashboard/", views.dashboard_view, name="dashboard"),
     path("upload/", views.upload_resume, name="upload"),
-    path("analyze/", views.analyze_resume, name="analyze"),
+    path(
+        "analyze/",
+        views.analyze_resume_async if settings.ANALYZE_ASYNC_VIEW else views.analyze_resume,
+        name="analyze"
+    ),
+    path("analyze/stream/", views.analyze_stream, name="analyze_stream"),
+    path("analyze/<int:report_id>/", views.analysis_result, name="analysis_result"),
     path("profile/", views.profile_view, name="profile"),
 
+    # Batch ranking (one JD vs many resumes)
+    path("api/rank/", views.rank_resumes_api, name="rank_resumes"),
+
     # Reports
     path("reports/", views.reports_page, name="reports"),
     path("api/reports/", views.reports_api, name="reports_api"),
+    path("api/reports/delete/", views.bulk_delete_reports, name="bulk_delete_reports"),
     path("api/reports/<int:report_id>/", views.delete_report, name="delete_report"),
+    path("api/reports/<int:report_id>/status/", views.report_status, name="report_status"),
+    path("api/reports/<int:report_id>/result/", views.report_result_api, name="report_result"),
+
+    # Observability
+    path("metrics", views.metrics_view, name="metrics"),
 ]
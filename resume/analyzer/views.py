@@ -1,3 +1,8 @@
+import itertools
+import json
+import logging
+import time
+
 from django.shortcuts import render, redirect
 from django.contrib.auth.models import User
 from django.contrib.auth.hashers import make_password
@@ -6,161 +11,41 @@ from django.contrib.auth import authenticate, login, logout
 from django.contrib.auth.decorators import login_required
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError
-from django.db.models import Q
 from .models import PasswordResetRequest
-from django.http import JsonResponse
+from django.conf import settings
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
+from django.urls import reverse
 from django.utils import timezone
-
-import PyPDF2
-import docx
-import json
-import requests
-import os
-import time
-import re
-
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from django.views.decorators.http import require_POST
+from asgiref.sync import sync_to_async
+
+from . import extraction_cache, instrumentation, report_results, stats, throttling
+from .backends import find_user
+from .extraction import ExtractionError
+from .parsing import aparse_document, extract_text_from_docx, extract_text_from_pdf
+from .analysis import arun_analysis, stream_analysis
+from .jobs import enqueue_analysis, record_analysis
+from .ranking import (
+    BATCH_TOO_LARGE,
+    MAX_BATCH_BYTES,
+    RankingError,
+    failed_document,
+    iter_documents,
+    rank_resumes,
+)
+from .reports import (
+    InvalidCursor,
+    InvalidFilter,
+    cached_page,
+    page_size,
+    report_etag,
+    report_stats,
+    select_reports,
+)
 from .models import ResumeReport
-
-
-# =============================
-# OPENROUTER CONFIG
-# =============================
-
-OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
-OPENROUTER_URL = "https://openrouter.ai/api/v1/chat/completions"
-
-OPENROUTER_MODELS = [
-    "openai/gpt-4o-mini",        # ✅ Fast & always available
-    "mistralai/mistral-7b-instruct",  # ✅ Good backup
-]
-
-
-print("OPENROUTER KEY LOADED:", bool(OPENROUTER_API_KEY))
-
-
-# =============================
-# LOCAL ATS (FALLBACK – ALWAYS WORKS)
-# =============================
-
-def local_ats_analysis(resume_text, job_description):
-    resume_words = set(re.findall(r"\b[a-zA-Z]{3,}\b", resume_text.lower()))
-    jd_words = set(re.findall(r"\b[a-zA-Z]{3,}\b", job_description.lower()))
-
-    matched = sorted(resume_words & jd_words)
-    missing = sorted(jd_words - resume_words)
-
-    match_percentage = int((len(matched) / len(jd_words)) * 100) if jd_words else 0
-    ats_score = min(match_percentage, 95)
-
-    suggestions = (
-        ["Improve skills and include more job-specific keywords."]
-        if ats_score < 60
-        else ["Your resume is well aligned with the job description."]
-    )
-
-    return {
-        "ats_score": ats_score,
-        "keyword_match_percentage": match_percentage,
-        "matched_keywords": matched[:15],
-        "missing_keywords": missing[:15],
-        "improvement_suggestions": suggestions,
-        "evaluation_mode": "local",
-        "analysis_status": "Completed",
-        "explanation": "ATS score calculated using local keyword-matching logic."
-    }
-
-
-# =============================
-# JSON PARSER (SAFE)
-# =============================
-
-def safe_json_parse(text):
-    try:
-        text = text.replace("```json", "").replace("```", "").strip()
-        start = text.find("{")
-        end = text.rfind("}") + 1
-        if start == -1 or end == -1:
-            return None
-        return json.loads(text[start:end])
-    except Exception:
-        return None
-
-
-# =============================
-# AI ANALYSIS (WITH BACKUPS)
-# =============================
-
-def analyze_resume_text(resume_text, job_description):
-    if not OPENROUTER_API_KEY:
-        return None
-
-    headers = {
-        "Authorization": f"Bearer {OPENROUTER_API_KEY}",
-        "Content-Type": "application/json",
-        "Referer": "http://localhost:8000",   # ✅ REQUIRED
-        "X-Title": "AI Resume Analyzer"
-    }
-
-    prompt = f"""
-Return ONLY valid JSON.
-
-{{
-  "ats_score": 0-100,
-  "keyword_match_percentage": 0-100,
-  "matched_keywords": [],
-  "missing_keywords": [],
-  "improvement_suggestions": []
-}}
-
-RESUME:
-{resume_text}
-
-JOB DESCRIPTION:
-{job_description}
-"""
-
-    for model in OPENROUTER_MODELS:
-        try:
-            print("🔍 Trying AI model:", model)
-
-            response = requests.post(
-                OPENROUTER_URL,
-                headers=headers,
-                json={
-                    "model": model,
-                    "messages": [
-                        {"role": "system", "content": "Return valid JSON only"},
-                        {"role": "user", "content": prompt}
-                    ],
-                    "temperature": 0.1
-                },
-                timeout=25
-            )
-
-            if response.status_code != 200:
-                print("❌ OpenRouter error:", response.status_code, response.text)
-                continue
-
-            content = response.json()["choices"][0]["message"]["content"]
-            result = safe_json_parse(content)
-
-            if (
-                result
-                and isinstance(result.get("ats_score"), (int, float))
-                and result["ats_score"] > 0
-                ):
-                result["evaluation_mode"] = "ai"
-                result["analysis_status"] = "Completed"
-                result["explanation"] = "ATS score calculated using AI-based resume analysis."
-                print("✅ AI RESULT ACCEPTED:", result["ats_score"])
-                return result
-
-        except Exception as e:
-            print("❌ AI failed:", model, e)
-            time.sleep(1)
-
-    print("⚠️ AI unavailable → fallback to local ATS")
-    return None
+from .uploads import get_upload, install_handlers, oversized, upload_digest, MESSAGES as UPLOAD_MESSAGES
 
 
 # =============================
@@ -175,19 +60,19 @@ def login_view(request):
             messages.error(request, "Please enter username/email and password")
             return redirect("login")
 
-        # 🔥 Find user by username OR email
-        user_obj = User.objects.filter(
-            Q(username__iexact=identifier) | Q(email__iexact=identifier)
-        ).first()
-
-        if not user_obj:
-            messages.error(request, "Invalid login credentials")
-            return redirect("login")
+        # Reject floods before any user lookup or password hashing
+        retry_after = throttling.check_login(request, identifier)
+        if retry_after:
+            messages.error(request, f"Too many login attempts. Try again in {retry_after} seconds.")
+            response = render(request, "login.html", status=429)
+            response["Retry-After"] = str(retry_after)
+            return response
 
-        # Authenticate using the actual username stored in DB
-        user = authenticate(request, username=user_obj.username, password=password)
+        # 🔥 EmailBackend resolves username OR email in one indexed query
+        user = authenticate(request, username=identifier, password=password)
 
         if user is not None:
+            throttling.reset_login(identifier)
             login(request, user)
             return redirect("dashboard")
 
@@ -216,7 +101,7 @@ def signup_view(request):
         )
 
         # ✅ Explicit backend (THIS FIXES YOUR ERROR)
-        login(request, user, backend='django.contrib.auth.backends.ModelBackend')
+        login(request, user, backend='analyzer.backends.EmailBackend')
 
         return redirect("dashboard")
 
@@ -226,9 +111,7 @@ def forgot_password_view(request):
     if request.method == "POST":
         identifier = request.POST.get("identifier")
 
-        user = User.objects.filter(
-            Q(username__iexact=identifier) | Q(email__iexact=identifier)
-        ).first()
+        user = find_user(identifier)
 
         if not user:
             messages.error(request, "User not found")
@@ -273,16 +156,8 @@ def dashboard_view(request):
 
 @login_required
 def profile_view(request):
-    reports = ResumeReport.objects.filter(user=request.user).order_by("-analyzed_date")
-    total_reports = reports.count()
-
-    completed = reports.filter(analysis_status="Completed")
-    avg_score = round(sum(r.score for r in completed) / completed.count(), 1) if completed else 0
-
     return render(request, "profile.html", {
-        "reports": reports,
-        "total_reports": total_reports,   # ✅ ADD THIS
-        "avg_score": avg_score
+        "stats": report_stats(request.user)
     })
 
 
@@ -293,47 +168,294 @@ def profile_view(request):
 
 @login_required
 def upload_resume(request):
-    return render(request, "upload.html")
+    return render(request, "upload.html", {"streaming": settings.ANALYZE_STREAMING})
 
 
-def extract_text_from_pdf(file):
-    reader = PyPDF2.PdfReader(file)
-    return " ".join(page.extract_text() or "" for page in reader.pages)
+def extract_resume_text(resume, kind, digest):
+    extractor = extract_text_from_pdf if kind == "pdf" else extract_text_from_docx
 
+    with instrumentation.stage("extraction", kind=kind, bytes=resume.size) as stage:
+        parsed = []
 
-def extract_text_from_docx(file):
-    return "\n".join(p.text for p in docx.Document(file).paragraphs)
+        def extract():
+            parsed.append(True)
+            return extractor(resume)
+
+        # Same file bytes → cached extraction, PyPDF2 / python-docx never run
+        extraction = extraction_cache.get_or_extract(digest, kind, extract)
+        stage.set(
+            outcome="parsed" if parsed else "cached",
+            pages=extraction["pages"],
+            chars=len(extraction["text"]),
+            truncated=extraction["truncated"],
+        )
+    return extraction
 
 
+# Upload handlers must be installed before CSRF middleware reads request.POST.
+# A body over the size limit is turned away before any of it is read.
+@csrf_exempt
 @login_required
 def analyze_resume(request):
+    if oversized(request):
+        messages.error(request, UPLOAD_MESSAGES["too_large"])
+        return redirect("upload")
+    install_handlers(request)
+    return _analyze_resume(request)
+
+
+@csrf_protect
+def _analyze_resume(request):
     if request.method != "POST":
         return redirect("upload")
 
-    resume = request.FILES.get("resume")
+    resume, kind, error = get_upload(request, "resume")
+    if error:
+        messages.error(request, UPLOAD_MESSAGES[error])
+        return redirect("upload")
     job_description = request.POST.get("job_description")
 
-    if resume.name.endswith(".pdf"):
-        resume_text = extract_text_from_pdf(resume)
-    elif resume.name.endswith(".docx"):
-        resume_text = extract_text_from_docx(resume)
-    else:
-        messages.error(request, "Only PDF or DOCX supported.")
+    try:
+        extraction = extract_resume_text(resume, kind, upload_digest(request, resume, "resume"))
+    except ExtractionError as e:
+        instrumentation.event("extraction_failed", logging.WARNING, file=resume.name, error=str(e))
+        messages.error(request, "Could not read this file. Please upload a different PDF or DOCX.")
         return redirect("upload")
 
-    # AI → Local fallback
-    result = analyze_resume_text(resume_text, job_description)
-    if not result:
-        result = local_ats_analysis(resume_text, job_description)
-
-    ResumeReport.objects.create(
+    # AI → Local fallback runs in the background job queue
+    report = enqueue_analysis(
         user=request.user,
         name=resume.name,
-        score=result["ats_score"],
-        analysis_status="Completed"
+        resume_text=extraction["text"],
+        job_description=job_description,
+        extraction={
+            "pages": extraction["pages"],
+            "truncated": extraction["truncated"],
+        }
     )
 
-    return render(request, "analyze.html", result)
+    return redirect("analysis_result", report_id=report.id)
+
+
+# ASGI: extraction, AI call and DB write are awaited, no thread is held
+@csrf_exempt
+@login_required
+async def analyze_resume_async(request):
+    if oversized(request):
+        messages.error(request, UPLOAD_MESSAGES["too_large"])
+        return redirect("upload")
+    install_handlers(request)
+    return await _analyze_resume_async(request)
+
+
+@csrf_protect
+async def _analyze_resume_async(request):
+    if request.method != "POST":
+        return redirect("upload")
+
+    resume, kind, error = await sync_to_async(get_upload)(request, "resume")
+    if error:
+        messages.error(request, UPLOAD_MESSAGES[error])
+        return redirect("upload")
+    job_description = request.POST.get("job_description")
+
+    digest = upload_digest(request, resume, "resume")
+    extraction = await sync_to_async(extraction_cache.read)(digest, kind)
+
+    with instrumentation.stage("extraction", kind=kind, bytes=resume.size) as stage:
+        stage.set(outcome="cached")
+        if extraction is None:
+            try:
+                extraction = await aparse_document(kind, resume)
+            except ExtractionError as e:
+                stage.set(outcome="failed")
+                instrumentation.event("extraction_failed", logging.WARNING, file=resume.name, error=str(e))
+                messages.error(request, "Could not read this file. Please upload a different PDF or DOCX.")
+                return redirect("upload")
+            stage.set(outcome="parsed")
+            if not extraction["timed_out"]:
+                await sync_to_async(extraction_cache.write)(digest, kind, extraction)
+        stage.set(pages=extraction["pages"], chars=len(extraction["text"]), truncated=extraction["truncated"])
+
+    result = await arun_analysis(extraction["text"], job_description)
+
+    report = await sync_to_async(record_analysis)(
+        user=await request.auser(),
+        name=resume.name,
+        resume_text=extraction["text"],
+        job_description=job_description,
+        result=result,
+        extraction={
+            "pages": extraction["pages"],
+            "truncated": extraction["truncated"],
+        }
+    )
+
+    return redirect("analysis_result", report_id=report.id)
+
+
+# =============================
+# STREAMING ANALYSIS (SSE)
+# =============================
+# POST the upload form here and read the response as text/event-stream:
+#   progress → local (instant score) → progress (model attempts) → ai → done
+# "done" carries the stored report's URL; "error" ends the stream early.
+
+def sse(event, data):
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+
+def analysis_events(user, resume, kind, digest, job_description):
+    started = time.monotonic()
+    yield sse("progress", {"stage": "received", "file": resume.name})
+
+    try:
+        extraction = extract_resume_text(resume, kind, digest)
+    except ExtractionError as e:
+        instrumentation.event("extraction_failed", logging.WARNING, file=resume.name, error=str(e))
+        yield sse("error", {"message": "Could not read this file. Please upload a different PDF or DOCX."})
+        return
+    yield sse("progress", {"stage": "extraction", "pages": extraction["pages"], "truncated": extraction["truncated"]})
+
+    first_result_ms = None
+    result = None
+    for event, data in stream_analysis(extraction["text"], job_description):
+        if event == "local":
+            result = data
+            first_result_ms = round((time.monotonic() - started) * 1000)
+        elif event == "ai":
+            if data is None:
+                yield sse("progress", {"stage": "ai_unavailable"})
+                continue
+            result = data
+        yield sse(event, data)
+
+    report = record_analysis(
+        user=user,
+        name=resume.name,
+        resume_text=extraction["text"],
+        job_description=job_description,
+        result=result,
+        extraction={
+            "pages": extraction["pages"],
+            "truncated": extraction["truncated"],
+        }
+    )
+    instrumentation.event(
+        "analysis_streamed",
+        report_id=report.id,
+        first_result_ms=first_result_ms,
+        total_ms=round((time.monotonic() - started) * 1000),
+        mode=result.get("evaluation_mode"),
+    )
+    yield sse("done", {"report_id": report.id, "url": reverse("analysis_result", args=[report.id])})
+
+
+async def _aiter_events(events):
+    # ASGI would buffer a sync iterator whole; pull it one event at a time
+    # on the request's thread instead
+    done = object()
+    while True:
+        chunk = await sync_to_async(next)(events, done)
+        if chunk is done:
+            return
+        yield chunk
+
+
+@csrf_exempt
+@login_required
+def analyze_stream(request):
+    if oversized(request):
+        return JsonResponse({"error": UPLOAD_MESSAGES["too_large"]}, status=413)
+    install_handlers(request)
+    return _analyze_stream(request)
+
+
+@csrf_protect
+@require_POST
+def _analyze_stream(request):
+    resume, kind, error = get_upload(request, "resume")
+    if error:
+        status = 413 if error == "too_large" else 400
+        return JsonResponse({"error": UPLOAD_MESSAGES[error]}, status=status)
+
+    events = analysis_events(
+        request.user,
+        resume,
+        kind,
+        upload_digest(request, resume, "resume"),
+        request.POST.get("job_description", "")
+    )
+    if settings.ANALYZE_ASYNC_VIEW:
+        events = _aiter_events(events)
+
+    response = StreamingHttpResponse(events, content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    response["X-Accel-Buffering"] = "no"   # nginx: don't buffer the stream
+    return response
+
+
+@login_required
+def analysis_result(request, report_id):
+    # Served from the stored result: re-opening a report never re-analyzes
+    report, result = report_results.load(request.user, report_id)
+    if report is None:
+        raise Http404("Report not found")
+
+    if report.analysis_status != "Completed":
+        return render(request, "analysis_pending.html", {"report": report})
+    if result is None:
+        messages.error(request, "The full result for this report is no longer available.")
+        return redirect("reports")
+
+    return render(request, "analyze.html", {**result, "report": report})
+
+
+# =============================
+# BATCH RANKING API
+# =============================
+
+# Same early rejection as the analyze views, with one cap for the whole
+# batch; files are read and parsed one window at a time (ranking.py).
+@csrf_exempt
+@login_required
+def rank_resumes_api(request):
+    if request.method != "POST":
+        return JsonResponse({"error": "POST required"}, status=405)
+    if oversized(request, MAX_BATCH_BYTES):
+        return JsonResponse({"error": BATCH_TOO_LARGE}, status=413)
+    install_handlers(request, ("resumes", "archive"), max_bytes=MAX_BATCH_BYTES, max_total=MAX_BATCH_BYTES, digests=False)
+    return _rank_resumes_api(request)
+
+
+@csrf_protect
+def _rank_resumes_api(request):
+    job_description = request.POST.get("job_description", "")
+    rejected = getattr(request, "upload_rejections", [])
+    # Empty files are flagged by the guard but still reach request.FILES
+    skip = {(field, name) for field, name, _ in rejected}
+    files = [
+        (f.name, f)
+        for field in ("resumes", "archive")
+        for f in request.FILES.getlist(field)
+        if (field, f.name) not in skip
+    ]
+
+    if any(reason == "too_large" for _, _, reason in rejected):
+        return JsonResponse({"error": BATCH_TOO_LARGE}, status=413)
+    if not files and not rejected:
+        return JsonResponse({"error": "Upload resumes or a zip archive."}, status=400)
+
+    documents = itertools.chain(
+        (failed_document(name, UPLOAD_MESSAGES[reason]) for _, name, reason in rejected),
+        iter_documents(files),
+    )
+    try:
+        ranking = rank_resumes(request.user, job_description, documents)
+    except RankingError as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    return JsonResponse(ranking)
 
 
 # =============================
@@ -347,41 +469,109 @@ def reports_page(request):
 
 @login_required
 def reports_api(request):
-    reports = (
+    cursor = request.GET.get("cursor") or None
+    limit = page_size(request.GET.get("limit"))
+    version = stats.get_stats(request.user).version
+    etag = report_etag(request.user.id, version, cursor, limit)
+
+    # Nothing changed since the client's copy: skip the query entirely
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        try:
+            data = cached_page(request.user, version, cursor, limit)
+        except InvalidCursor:
+            return JsonResponse({"error": "Invalid cursor"}, status=400)
+        response = JsonResponse(data)
+
+    response["ETag"] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+# =============================
+# METRICS (Prometheus text format)
+# =============================
+
+def metrics_view(request):
+    # METRICS_TOKEN set → bearer token required; unset → only staff or DEBUG
+    token = getattr(settings, "METRICS_TOKEN", "")
+    if token:
+        allowed = request.headers.get("Authorization") == f"Bearer {token}"
+    else:
+        allowed = settings.DEBUG or request.user.is_staff
+    if not allowed:
+        return HttpResponse(status=404)
+
+    return HttpResponse(
+        instrumentation.render_metrics(),
+        content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
+
+
+@login_required
+def report_status(request, report_id):
+    report = (
         ResumeReport.objects
-        .filter(user=request.user)
-        .order_by("-analyzed_date")
+        .filter(id=report_id, user=request.user)
+        .values("id", "score", "analysis_status")
+        .first()
     )
 
-    # Collect valid scores only
-    scores = [r.score for r in reports if isinstance(r.score, (int, float))]
+    if not report:
+        return JsonResponse({"error": "Report not found"}, status=404)
 
-    total = len(scores)
-    average = round(sum(scores) / total, 1) if total else 0
-    best = max(scores) if total else 0
+    return JsonResponse({
+        "id": report["id"],
+        "status": report["analysis_status"],  # Pending / Completed / Failed
+        "score": report["score"],
+    })
+
+
+@login_required
+def report_result_api(request, report_id):
+    report, result = report_results.load(request.user, report_id)
+    if report is None:
+        return JsonResponse({"error": "Report not found"}, status=404)
 
     return JsonResponse({
-        "stats": {
-            "total": total,
-            "average": average,
-            "best": best,
-        },
-        "reports": [
-            {
-                "id": r.id,
-                "name": r.name,
-                "score": r.score,
-                "status": r.analysis_status,  # Completed / Pending
-                "analyzed_date": timezone.localtime(
-                    r.analyzed_date
-                ).strftime("%d %b %Y, %I:%M %p")
-            }
-            for r in reports
-        ]
+        "id": report.id,
+        "name": report.name,
+        "status": report.analysis_status,
+        "score": report.score,
+        "analyzed_date": report.analyzed_date.isoformat(),
+        "result": result,   # None until the analysis completes
     })
 
 
 @login_required
 def delete_report(request, report_id):
-    ResumeReport.objects.filter(id=report_id, user=request.user).delete()
+    stats.delete_reports(
+        request.user.id,
+        ResumeReport.objects.filter(id=report_id, user=request.user)
+    )
     return JsonResponse({"success": True})
+
+
+@login_required
+@require_POST
+def bulk_delete_reports(request):
+    try:
+        payload = json.loads(request.body or b"{}")
+        if not isinstance(payload, dict):
+            raise ValueError
+    except ValueError:
+        return JsonResponse({"error": "Invalid JSON body"}, status=400)
+
+    try:
+        reports = select_reports(request.user, payload)
+    except InvalidFilter as e:
+        return JsonResponse({"error": str(e)}, status=400)
+
+    summary = stats.delete_reports(request.user.id, reports)
+
+    return JsonResponse({
+        "success": True,
+        "deleted": summary["total"],
+        "deleted_completed": summary["completed"],
+        "stats": report_stats(request.user),
+    })
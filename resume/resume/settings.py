@@ -4,6 +4,7 @@ Generated by 'django-admin startproject' using Django 5.2.8.
 """
 
 from pathlib import Path
+import importlib.util
 import os
 from dotenv import load_dotenv
 
@@ -90,13 +91,153 @@ WSGI_APPLICATION = 'resume.wsgi.application'
 # =============================
 # DATABASE
 # =============================
-DATABASES = {
+# DB_ENGINE=sqlite (default) or postgres
+DB_ENGINE = os.getenv("DB_ENGINE", "sqlite").lower()
+
+if DB_ENGINE == "postgres":
+    # DB_POOL=True uses psycopg 3's pool (pip install "psycopg[binary,pool]");
+    # otherwise connections persist for DB_CONN_MAX_AGE seconds.
+    DB_POOL = os.getenv("DB_POOL", "True") == "True"
+
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.getenv("POSTGRES_DB", "resume"),
+            'USER': os.getenv("POSTGRES_USER", "postgres"),
+            'PASSWORD': os.getenv("POSTGRES_PASSWORD", ""),
+            'HOST': os.getenv("POSTGRES_HOST", "localhost"),
+            'PORT': os.getenv("POSTGRES_PORT", "5432"),
+            # Pooling and persistent connections are mutually exclusive
+            'CONN_MAX_AGE': 0 if DB_POOL else int(os.getenv("DB_CONN_MAX_AGE", "60")),
+            'CONN_HEALTH_CHECKS': True,
+            'OPTIONS': {
+                'pool': {
+                    'min_size': int(os.getenv("DB_POOL_MIN", "2")),
+                    'max_size': int(os.getenv("DB_POOL_MAX", "10")),
+                    'timeout': float(os.getenv("DB_POOL_TIMEOUT", "10")),
+                } if DB_POOL else False,
+            },
+        }
+    }
+else:
+    # WAL lets readers run alongside the single writer; IMMEDIATE takes the
+    # write lock at BEGIN so busy_timeout applies instead of failing with
+    # "database is locked" when a read transaction tries to upgrade.
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000")),
+        "mmap_size": int(os.getenv("SQLITE_MMAP_SIZE", str(128 * 1024 * 1024))),
+        "cache_size": int(os.getenv("SQLITE_CACHE_SIZE", "-20000")),
+        "temp_store": "MEMORY",
+    }
+
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'NAME': os.getenv("SQLITE_PATH", BASE_DIR / 'db.sqlite3'),
+            'OPTIONS': {
+                'init_command': ";".join(
+                    f"PRAGMA {name}={value}" for name, value in SQLITE_PRAGMAS.items()
+                ),
+                'transaction_mode': os.getenv("SQLITE_TRANSACTION_MODE", "IMMEDIATE"),
+            },
+        }
+    }
+
+# =============================
+# CACHES, SESSIONS & MESSAGES
+# =============================
+# CACHE_BACKEND=locmem (default, per process) | file | db | redis | fakeredis.
+# Sessions, the cached user lookup, login throttling, circuit breakers,
+# AI results and reports API pages all share this cache.
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "locmem").lower()
+CACHE_TIMEOUT = int(os.getenv("CACHE_TIMEOUT", "300"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0")
+
+if CACHE_BACKEND == "file":
+    _cache = {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv("CACHE_DIR", BASE_DIR / ".cache" / "django"),
+    }
+elif CACHE_BACKEND == "db":
+    # Run `python manage.py createcachetable` once
+    _cache = {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'django_cache',
+    }
+elif CACHE_BACKEND in ("redis", "fakeredis"):
+    _cache = {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': REDIS_URL,
+    }
+    if CACHE_BACKEND == "fakeredis":
+        # In-process Redis stand-in for local runs (pip install fakeredis)
+        import fakeredis
+        _cache['OPTIONS'] = {'connection_class': fakeredis.FakeConnection}
+else:
+    _cache = {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'resume-analyzer',
+    }
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'db.sqlite3',
+        **_cache,
+        'TIMEOUT': CACHE_TIMEOUT,
+        'KEY_PREFIX': os.getenv("CACHE_KEY_PREFIX", "resume"),
     }
 }
 
+# Session reads hit the cache; the DB row is only written on change
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
+# Flash messages ride in a signed cookie instead of the session
+MESSAGE_STORAGE = 'django.contrib.messages.storage.cookie.CookieStorage'
+
+# Seconds an authenticated user's row stays cached (see analyzer.backends).
+# Off by default with locmem: the save/delete signals only clear the copy in
+# the process that made the change (QuerySet.update() none at all), so other
+# workers would keep a deactivated user or an old password hash until the TTL.
+USER_CACHE_TTL = int(os.getenv("USER_CACHE_TTL", "0" if CACHE_BACKEND == "locmem" else "300"))
+
+# =============================
+# PASSWORD HASHING
+# =============================
+# argon2 (pip install argon2-cffi) | scrypt | pbkdf2. Hashes made with the
+# other algorithms or another cost are upgraded on the user's next login.
+# argon2 without argon2-cffi falls back to scrypt (system check analyzer.W001).
+PASSWORD_HASHER = os.getenv("PASSWORD_HASHER", "pbkdf2").lower()
+_hasher = PASSWORD_HASHER
+if _hasher == "argon2" and importlib.util.find_spec("argon2") is None:
+    _hasher = "scrypt"
+
+_TUNED_HASHERS = {
+    "argon2": "analyzer.hashers.TunedArgon2PasswordHasher",
+    "scrypt": "analyzer.hashers.TunedScryptPasswordHasher",
+    "pbkdf2": "analyzer.hashers.TunedPBKDF2PasswordHasher",
+}
+PASSWORD_HASHERS = [_TUNED_HASHERS.pop(_hasher)] + list(_TUNED_HASHERS.values()) + [
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+]
+
+PASSWORD_PBKDF2_ITERATIONS = int(os.getenv("PASSWORD_PBKDF2_ITERATIONS", "1000000"))
+PASSWORD_SCRYPT_WORK_FACTOR = int(os.getenv("PASSWORD_SCRYPT_WORK_FACTOR", str(2 ** 14)))
+PASSWORD_SCRYPT_BLOCK_SIZE = int(os.getenv("PASSWORD_SCRYPT_BLOCK_SIZE", "8"))
+PASSWORD_SCRYPT_PARALLELISM = int(os.getenv("PASSWORD_SCRYPT_PARALLELISM", "5"))
+PASSWORD_ARGON2_TIME_COST = int(os.getenv("PASSWORD_ARGON2_TIME_COST", "2"))
+PASSWORD_ARGON2_MEMORY_COST = int(os.getenv("PASSWORD_ARGON2_MEMORY_COST", "102400"))  # KiB
+PASSWORD_ARGON2_PARALLELISM = int(os.getenv("PASSWORD_ARGON2_PARALLELISM", "8"))
+
+# Login throttling, checked before any user lookup or hashing:
+# attempts per window, per identifier and per client IP
+LOGIN_RATE_LIMIT = int(os.getenv("LOGIN_RATE_LIMIT", "10"))
+# Per-IP limit is off (0) by default: behind a reverse proxy REMOTE_ADDR is
+# the proxy, and every user would share one bucket. When enabling it there,
+# set LOGIN_IP_HEADER to the header the proxy sets (X-Forwarded-For, X-Real-IP).
+LOGIN_IP_RATE_LIMIT = int(os.getenv("LOGIN_IP_RATE_LIMIT", "0"))
+LOGIN_IP_HEADER = os.getenv("LOGIN_IP_HEADER", "")
+LOGIN_RATE_WINDOW = int(os.getenv("LOGIN_RATE_WINDOW", "60"))
+
 # =============================
 # PASSWORD VALIDATION
 # =============================
@@ -135,7 +276,162 @@ LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/dashboard/'
 LOGOUT_REDIRECT_URL = '/login/'
 
+# Single backend: username-or-email in one query (a failed login would
+# otherwise be retried by every backend in the list)
 AUTHENTICATION_BACKENDS = [
     'analyzer.backends.EmailBackend',
-    'django.contrib.auth.backends.ModelBackend',
 ]
+
+# =============================
+# ANALYSIS JOB QUEUE
+# =============================
+# Threads in the web process that run queued analyses.
+# Use 0 when `python manage.py run_analysis_worker` runs separately.
+ANALYSIS_LOCAL_WORKERS = int(os.getenv("ANALYSIS_LOCAL_WORKERS", "2"))
+ANALYSIS_JOB_STALE_AFTER = int(os.getenv("ANALYSIS_JOB_STALE_AFTER", "300"))
+ANALYSIS_JOB_MAX_ATTEMPTS = int(os.getenv("ANALYSIS_JOB_MAX_ATTEMPTS", "3"))
+# Seconds between recovery sweeps (stale Running / orphaned Pending jobs)
+ANALYSIS_JOB_SWEEP_INTERVAL = float(os.getenv("ANALYSIS_JOB_SWEEP_INTERVAL", "60"))
+ANALYSIS_JOB_ORPHAN_AFTER = int(os.getenv("ANALYSIS_JOB_ORPHAN_AFTER", "60"))
+
+# =============================
+# ANALYSIS RESULT CACHE
+# =============================
+ANALYSIS_CACHE_TTL = int(os.getenv("ANALYSIS_CACHE_TTL", str(7 * 24 * 3600)))
+ANALYSIS_CACHE_MAX_ENTRIES = int(os.getenv("ANALYSIS_CACHE_MAX_ENTRIES", "5000"))
+ANALYSIS_CACHE_LRU_SIZE = int(os.getenv("ANALYSIS_CACHE_LRU_SIZE", "256"))
+
+# =============================
+# STORED REPORT RESULTS
+# =============================
+# Results at least this many bytes of JSON are zlib-compressed
+REPORT_RESULT_COMPRESS_MIN_BYTES = int(os.getenv("REPORT_RESULT_COMPRESS_MIN_BYTES", "512"))
+
+# =============================
+# EXTRACTION CACHE
+# =============================
+EXTRACTION_CACHE_DIR = Path(os.getenv("EXTRACTION_CACHE_DIR", BASE_DIR / ".cache" / "extraction"))
+EXTRACTION_CACHE_MAX_BYTES = int(os.getenv("EXTRACTION_CACHE_MAX_BYTES", str(200 * 1024 * 1024)))
+
+# =============================
+# UPLOADS
+# =============================
+# Resumes over this size are rejected before / while they are read
+RESUME_MAX_UPLOAD_BYTES = int(os.getenv("RESUME_MAX_UPLOAD_BYTES", str(10 * 1024 * 1024)))
+# Uploads larger than this are spooled to a temp file and memory-mapped
+# for parsing instead of being held in memory
+FILE_UPLOAD_MAX_MEMORY_SIZE = int(os.getenv("FILE_UPLOAD_MAX_MEMORY_SIZE", str(1024 * 1024)))
+FILE_UPLOAD_TEMP_DIR = os.getenv("FILE_UPLOAD_TEMP_DIR") or None
+
+# =============================
+# TEXT EXTRACTION LIMITS
+# =============================
+EXTRACTION_MAX_PAGES = int(os.getenv("EXTRACTION_MAX_PAGES", "50"))
+EXTRACTION_MAX_CHARS = int(os.getenv("EXTRACTION_MAX_CHARS", "100000"))
+# Seconds per document (0 = parse inline, no subprocess)
+EXTRACTION_TIME_BUDGET = float(os.getenv("EXTRACTION_TIME_BUDGET", "15"))
+
+# =============================
+# PARSER PROCESS POOL
+# =============================
+# Warm worker processes for PyPDF2 / python-docx (0 = no pool)
+PARSER_POOL_SIZE = int(os.getenv("PARSER_POOL_SIZE", str(min(4, os.cpu_count() or 1))))
+PARSER_MAX_TASKS_PER_CHILD = int(os.getenv("PARSER_MAX_TASKS_PER_CHILD", "100"))
+
+# =============================
+# OPENROUTER CLIENT
+# =============================
+OPENROUTER_API_KEY = os.getenv("OPENROUTER_API_KEY")
+OPENROUTER_URL = os.getenv("OPENROUTER_URL", "https://openrouter.ai/api/v1/chat/completions")
+# Model → prompt budget in approximate tokens (analyzer/prompting.py).
+# Iteration order is the fallback order.
+OPENROUTER_MODELS = {
+    "openai/gpt-4o-mini": 6000,
+    "mistralai/mistral-7b-instruct": 3000,
+}
+
+# Under ASGI (uvicorn/daphne) set ANALYZE_ASYNC_VIEW=True so /analyze/
+# awaits the AI call directly instead of queueing a background job.
+ANALYZE_ASYNC_VIEW = os.getenv("ANALYZE_ASYNC_VIEW", "False") == "True"
+# Upload page streams results from /analyze/stream/ (SSE); False = plain POST.
+# The stream runs extraction, every AI attempt and the DB write inside the
+# request, so under WSGI it holds a worker for the whole AI round trip (the
+# plain POST hands that to the job queue). Defaults on only with the ASGI view.
+ANALYZE_STREAMING = os.getenv("ANALYZE_STREAMING", str(ANALYZE_ASYNC_VIEW)) == "True"
+
+OPENROUTER_MAX_CONNECTIONS = int(os.getenv("OPENROUTER_MAX_CONNECTIONS", "20"))
+OPENROUTER_MAX_KEEPALIVE = int(os.getenv("OPENROUTER_MAX_KEEPALIVE", "10"))
+OPENROUTER_KEEPALIVE_EXPIRY = float(os.getenv("OPENROUTER_KEEPALIVE_EXPIRY", "30"))
+OPENROUTER_HTTP2 = os.getenv("OPENROUTER_HTTP2", "True") == "True"
+
+# sequential | hedged | race
+OPENROUTER_STRATEGY = os.getenv("OPENROUTER_STRATEGY", "sequential")
+# Threads shared by hedged / race attempts in a process: enough for every
+# job thread to have all models in flight at once
+OPENROUTER_ATTEMPT_THREADS = int(os.getenv(
+    "OPENROUTER_ATTEMPT_THREADS", str(max(ANALYSIS_LOCAL_WORKERS, 1) * len(OPENROUTER_MODELS))
+))
+# Hedge delay until enough latency samples exist for a p95
+OPENROUTER_HEDGE_DELAY = float(os.getenv("OPENROUTER_HEDGE_DELAY", "4"))
+
+# Circuit breaker: open after N consecutive failures, probe again after cooldown
+OPENROUTER_CIRCUIT_THRESHOLD = int(os.getenv("OPENROUTER_CIRCUIT_THRESHOLD", "3"))
+OPENROUTER_CIRCUIT_COOLDOWN = float(os.getenv("OPENROUTER_CIRCUIT_COOLDOWN", "30"))
+# Adaptive per-model timeout bounds (seconds)
+OPENROUTER_TIMEOUT_MIN = float(os.getenv("OPENROUTER_TIMEOUT_MIN", "5"))
+OPENROUTER_TIMEOUT_MAX = float(os.getenv("OPENROUTER_TIMEOUT_MAX", "25"))
+# Prompt token budget for models without one in OPENROUTER_MODELS (0 = no trimming)
+OPENROUTER_PROMPT_BUDGET = int(os.getenv("OPENROUTER_PROMPT_BUDGET", "4000"))
+
+# =============================
+# LOCAL ATS SCORER
+# =============================
+# IDF table written by `python manage.py build_ats_vocabulary`
+ATS_VOCABULARY_PATH = Path(os.getenv("ATS_VOCABULARY_PATH", BASE_DIR / "analyzer" / "data" / "ats_vocabulary.json"))
+
+# =============================
+# BATCH RANKING
+# =============================
+RANK_MAX_FILES = int(os.getenv("RANK_MAX_FILES", "500"))
+# Cap on all files of one /api/rank/ request together (an archive counts as one)
+RANK_MAX_BATCH_BYTES = int(os.getenv("RANK_MAX_BATCH_BYTES", str(50 * 1024 * 1024)))
+
+# =============================
+# REPORTS API
+# =============================
+# Seconds a serialized reports page stays cached (keyed on the user's
+# report version, so writes never serve stale pages). 0 disables.
+REPORTS_API_CACHE_TTL = int(os.getenv("REPORTS_API_CACHE_TTL", "300"))
+
+# =============================
+# INSTRUMENTATION & LOGGING
+# =============================
+# Per-stage timings for the analyze pipeline → structured logs + /metrics.
+# False makes every stage a no-op.
+ANALYZER_METRICS_ENABLED = os.getenv("ANALYZER_METRICS_ENABLED", "True") == "True"
+# Bearer token for Prometheus scrapes of /metrics (unset: staff / DEBUG only)
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
+# LOG_FORMAT=text (key=value lines) or json (one object per line)
+LOG_FORMAT = os.getenv("LOG_FORMAT", "text")
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        'text': {'()': 'analyzer.instrumentation.KeyValueFormatter'},
+        'json': {'()': 'analyzer.instrumentation.JsonFormatter'},
+    },
+    'handlers': {
+        'analyzer': {
+            'class': 'logging.StreamHandler',
+            'formatter': LOG_FORMAT,
+        },
+    },
+    'loggers': {
+        'analyzer': {
+            'handlers': ['analyzer'],
+            'level': os.getenv("ANALYZER_LOG_LEVEL", "INFO"),
+            'propagate': False,
+        },
+    },
+}